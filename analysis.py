@@ -1,35 +1,55 @@
 import os
-from typing import Optional
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import AsyncIterator, Iterator, Optional
 import pandas as pd
 import backend
+import llm_cache
+import stats_index
+import tracing
 
 # ==============================
-#  AUTO-LOAD .env (FASTER THAN os.getenv)
+#  GEMINI (IMPORTED ON FIRST USE)
 # ==============================
-from dotenv import load_dotenv
-load_dotenv()   # loads .env once → variables available instantly
+# google.generativeai and .env are only loaded when an analysis actually
+# goes to Gemini, so importing this module (server startup) stays cheap.
+_genai = None
 
-# ==============================
-#  TRY IMPORT GEMINI
-# ==============================
-try:
-    import google.generativeai as genai
-    HAS_GEMINI = True
-except ImportError:
-    HAS_GEMINI = False
+
+def _load_gemini():
+    """The google.generativeai module (after loading .env), or None if not installed."""
+    global _genai
+    if _genai is None:
+        from dotenv import load_dotenv
+        load_dotenv()   # GEMINI_API_KEY from .env
+        try:
+            import google.generativeai as genai
+        except ImportError:
+            return None
+        _genai = genai
+    return _genai
 
 
 GEMINI_MODEL_NAME = "gemini-2.5-pro"
 
+# "gemini" (default) or "fake": a local stub that streams a canned answer, so
+# the streaming path, the response cache and the UI can be exercised without
+# network / API key.
+LLM_PROVIDER = os.environ.get("NEREUS_LLM_PROVIDER", "gemini")
+FAKE_LLM_DELAY = float(os.environ.get("NEREUS_FAKE_LLM_DELAY", "0.02"))
+
 
 # ==============================
 #  CONFIGURE GEMINI
 # ==============================
 def _configure_gemini(api_key: Optional[str] = None) -> None:
-    if not HAS_GEMINI:
+    genai = _load_gemini()
+    if genai is None:
         raise RuntimeError("The 'google-generativeai' package is not installed.")
 
-    # FASTEST: Load directly from environment (already loaded via dotenv)
+    # FASTEST: Load directly from environment (.env loaded by _load_gemini)
     key = api_key or os.environ.get("GEMINI_API_KEY")
 
     if not key:
@@ -42,53 +62,105 @@ def _configure_gemini(api_key: Optional[str] = None) -> None:
 
 
 # ==============================
-#  BUILD CONTEXT (IMPROVED)
+#  BUILD CONTEXT (LAZY, FROM CACHED STATS)
 # ==============================
-def _build_context_text(dataset_id: str) -> str:
-    df = backend.load_dataset(dataset_id)
-    summary = backend.get_basic_summary(dataset_id)
-    corr = backend.get_corr_matrix(dataset_id)
-    metrics = backend.train_and_evaluate_model(dataset_id)
-
-    corr_rounded = corr.round(3)
-
-    context_lines = [
-        f"Dataset ID: {dataset_id}",
-        f"Total Rows: {len(df)}",
-
-        "\n=== SUMMARY STATISTICS ===",
-        str(pd.DataFrame(summary['summary'])),
-
-        "\n=== NULL VALUE COUNTS ===",
-        str(summary["null_counts"]),
-
-        "\n=== CORRELATION MATRIX (rounded) ===",
-        str(corr_rounded),
-
-        "\n=== FORECASTING REQUIREMENT ===",
-        "Please analyze patterns and PREDICT future values for:",
-        "- NDCI_Value",
-        "- Turbidity_NTU",
-        "- Shrinkage_Percent",
-        "",
-        "Also identify trends, warnings, anomalies, and stability indicators.",
-    ]
-
-    return "\n".join(context_lines)
+# Each {section} of the template is computed only if the template references
+# it, and only from backend's precomputed statistics index, so building a
+# prompt never loads the full frame or trains a model.
+CONTEXT_TEMPLATE = """Dataset ID: {dataset_id}
+Total Rows: {rows}
+
+=== SUMMARY STATISTICS ===
+{summary}
+
+=== NULL VALUE COUNTS ===
+{nulls}
+
+=== CORRELATION MATRIX (rounded) ===
+{corr}
+
+=== YEARLY MEANS (TREND) ===
+{trends}
+
+=== FORECASTING REQUIREMENT ===
+Please analyze patterns and PREDICT future values for:
+- NDCI_Value
+- Turbidity_NTU
+- Shrinkage_Percent
+
+Also identify trends, warnings, anomalies, and stability indicators."""
+
+
+class AnalysisContext(dict):
+    """Mapping for str.format_map whose sections are built on first lookup."""
+
+    def __init__(self, dataset_id: str):
+        super().__init__(dataset_id=str(dataset_id))
+        self._stats = None
+
+    @property
+    def stats(self) -> dict:
+        if self._stats is None:
+            self._stats = backend.get_stats_index(self["dataset_id"])
+        return self._stats
+
+    def __missing__(self, name: str) -> str:
+        build = getattr(self, f"_section_{name}", None)
+        if build is None:
+            raise KeyError(name)
+        value = self[name] = build()
+        return value
+
+    def _section_rows(self) -> str:
+        return str(self.stats["rows"])
+
+    def _section_summary(self) -> str:
+        return str(stats_index.describe_frame(self.stats).round(3))
+
+    def _section_nulls(self) -> str:
+        return str(stats_index.null_counts(self.stats))
+
+    def _section_corr(self) -> str:
+        return str(stats_index.corr_frame(self.stats).round(3))
+
+    def _section_trends(self) -> str:
+        if "Year" not in self.stats["groups"]:
+            return "(no Year column)"
+        means = pd.DataFrame({
+            col: stats_index.group_frame(self.stats, "Year", col)["mean"]
+            for col in self.stats["summary_cols"]
+        })
+        return str(means.round(3))
+
+
+# (dataset id, template) -> (data hash, rendered context), least recently
+# used first. Callers may pass their own templates, so the cache is bounded.
+CONTEXT_CACHE_ENTRIES = int(os.environ.get("NEREUS_CONTEXT_CACHE_ENTRIES", "32"))
+_CONTEXT_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_CONTEXT_LOCK = threading.Lock()
+
+
+def _build_context_text(dataset_id: str, template: str = CONTEXT_TEMPLATE) -> str:
+    key = (str(dataset_id), template)
+    data_hash = backend.dataset_hash(dataset_id)
+    with _CONTEXT_LOCK:
+        cached = _CONTEXT_CACHE.get(key)
+        if cached is not None and cached[0] == data_hash:
+            _CONTEXT_CACHE.move_to_end(key)
+            return cached[1]
+    with tracing.stage("llm_context"):
+        text = template.format_map(AnalysisContext(dataset_id))
+    with _CONTEXT_LOCK:
+        _CONTEXT_CACHE[key] = (data_hash, text)
+        _CONTEXT_CACHE.move_to_end(key)
+        while len(_CONTEXT_CACHE) > CONTEXT_CACHE_ENTRIES:
+            _CONTEXT_CACHE.popitem(last=False)
+    return text
 
 # ==============================
-#  MAIN AI ANALYSIS
-# ==============================
-# ==============================
-#  MAIN AI ANALYSIS — FINAL FORCED TREND MODE
+#  PROMPT
 # ==============================
-def generate_textual_analysis(dataset_id: str, user_prompt: str = "", api_key: Optional[str] = None) -> str:
-
-    if not HAS_GEMINI:
-        return "Gemini library missing. Run: pip install google-generativeai"
-
-    _configure_gemini(api_key=api_key)
-
+def _build_prompt(dataset_id: str, user_prompt: str = "") -> str:
     context = _build_context_text(dataset_id)
 
     # 🔥 HARD-FORCED SCIENTIFIC QUESTIONS (NO ML METRICS ALLOWED)
@@ -128,8 +200,106 @@ FORCED SCIENTIFIC QUESTIONS
 
 Generate a BIG, DEEP, RESEARCH-GRADE EXPLANATION.
 """
+    return full_prompt
+
+
+# ==============================
+#  LLM PROVIDERS
+# ==============================
+def _fake_answer(prompt: str) -> str:
+    return (
+        "[fake-llm] Turbidity acts as the primary driver: suspended sediment limits light, "
+        "algal (Chla) response follows with a lag, and shrinkage emerges as the final outcome. "
+        f"(prompt: {len(prompt)} chars)"
+    )
+
+
+def _stream_fake(prompt: str) -> Iterator[str]:
+    for word in _fake_answer(prompt).split(" "):
+        if FAKE_LLM_DELAY:
+            time.sleep(FAKE_LLM_DELAY)
+        yield word + " "
+
+
+def _stream_gemini(prompt: str) -> Iterator[str]:
+    model = _load_gemini().GenerativeModel(GEMINI_MODEL_NAME)
+    for chunk in model.generate_content(prompt, stream=True):
+        text = getattr(chunk, "text", "")
+        if text:
+            yield text
+
+
+def _upstream(prompt: str) -> Iterator[str]:
+    if LLM_PROVIDER == "fake":
+        chunks = _stream_fake(prompt)
+    else:
+        chunks = _stream_gemini(prompt)
+    return tracing.timed_iter("llm_call", chunks, inflight_kind="llm")
+
+
+def _cache_key(prompt: str) -> str:
+    return llm_cache.cache_key(LLM_PROVIDER, GEMINI_MODEL_NAME, prompt)
+
+
+def _cached_stream(prompt: str) -> Iterator[str]:
+    """Upstream chunks, served from / written to llm_cache and coalesced."""
+    return llm_cache.stream(_cache_key(prompt), lambda: _upstream(prompt))
+
+
+def _prepare_provider(api_key: Optional[str]) -> Optional[str]:
+    """Returns an error message if the provider can't be used."""
+    if LLM_PROVIDER == "fake":
+        return None
+    if _load_gemini() is None:
+        return "Gemini library missing. Run: pip install google-generativeai"
+    _configure_gemini(api_key=api_key)
+    return None
+
+
+# ==============================
+#  MAIN AI ANALYSIS — FINAL FORCED TREND MODE
+# ==============================
+def generate_textual_analysis(dataset_id: str, user_prompt: str = "", api_key: Optional[str] = None) -> str:
+
+    error = _prepare_provider(api_key)
+    if error:
+        return error
+
+    full_prompt = _build_prompt(dataset_id, user_prompt)
+    return "".join(_cached_stream(full_prompt))
+
+
+def stream_textual_analysis(dataset_id: str, user_prompt: str = "", api_key: Optional[str] = None) -> Iterator[str]:
+    """
+    Same analysis, streamed. Provider setup and context building happen
+    here, before the first chunk is yielded, so errors surface immediately
+    and time-to-first-token is just the LLM's own latency.
+    """
+    error = _prepare_provider(api_key)
+    if error:
+        return iter([error])
+
+    full_prompt = _build_prompt(dataset_id, user_prompt)
+    return _cached_stream(full_prompt)
+
+
+async def _aiter_once(text: str) -> AsyncIterator[str]:
+    yield text
+
+
+async def astream_textual_analysis(dataset_id: str, user_prompt: str = "", api_key: Optional[str] = None) -> AsyncIterator[str]:
+    """
+    stream_textual_analysis for the ASGI server: setup runs in a worker
+    thread, and waiting for chunks holds no thread at all.
+    """
+    error = await asyncio.to_thread(_prepare_provider, api_key)
+    if error:
+        return _aiter_once(error)
+
+    full_prompt = await asyncio.to_thread(_build_prompt, dataset_id, user_prompt)
+    return llm_cache.astream(_cache_key(full_prompt), lambda: _upstream(full_prompt))
 
-    model = genai.GenerativeModel(GEMINI_MODEL_NAME)
-    response = model.generate_content(full_prompt)
 
-    return getattr(response, "text", str(response))
+def cached_analysis(dataset_id: str, user_prompt: str = "") -> Optional[str]:
+    """The cached analysis for the current data, or None (never calls the LLM)."""
+    return llm_cache.get(_cache_key(_build_prompt(dataset_id, user_prompt)))
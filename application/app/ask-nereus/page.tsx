@@ -4,6 +4,7 @@ import { useState, useRef, useEffect } from "react"
 import DashboardLayout from "@/components/dashboard-layout"
 import WaterFlowAnimation from "@/components/water-flow-animation"
 import ChatMessage from "@/components/chat-message"
+import { isEventStream, readSSE } from "@/lib/sse"
 
 interface Message {
   id: string
@@ -49,24 +50,57 @@ export default function AskNereusPage() {
     setLoading(true)
 
     try {
-      const response = await fetch("http://localhost:8040/api/analyze", {
+      const response = await fetch("http://localhost:8040/api/analyze?stream=1", {
         method: "POST",
-        headers: { "Content-Type": "application/json" },
+        headers: { "Content-Type": "application/json", Accept: "text/event-stream" },
         body: JSON.stringify({
           id: selectedDataset || "1",
           prompt: text,
         }),
       })
 
-      const data = await response.json()
+      if (!isEventStream(response)) {
+        const body = await response.json().catch(() => null)
+        const errorMessage: Message = {
+          id: (Date.now() + 1).toString(),
+          role: "assistant",
+          content: `Analysis failed: ${body?.error || `HTTP ${response.status}`}`,
+          timestamp: new Date(),
+        }
+        setMessages((prev) => [...prev, errorMessage])
+        return
+      }
+
+      const assistantId = (Date.now() + 1).toString()
       const assistantMessage: Message = {
-        id: (Date.now() + 1).toString(),
+        id: assistantId,
         role: "assistant",
-        content: data.analysis || "Analysis complete. Please check the dashboard for detailed insights.",
+        content: "",
         timestamp: new Date(),
       }
-
       setMessages((prev) => [...prev, assistantMessage])
+
+      const appendToAssistant = (chunk: string) =>
+        setMessages((prev) =>
+          prev.map((m) => (m.id === assistantId ? { ...m, content: m.content + chunk } : m)),
+        )
+
+      let received = false
+      await readSSE(response, ({ event, data }) => {
+        if (event === "token") {
+          if (!received) {
+            received = true
+            setLoading(false)
+          }
+          appendToAssistant(data.text)
+        } else if (event === "error") {
+          appendToAssistant(`\n\n[Analysis interrupted: ${data.error}]`)
+        }
+      })
+
+      if (!received) {
+        appendToAssistant("Analysis complete. Please check the dashboard for detailed insights.")
+      }
     } catch (error) {
       console.error("[v0] Error sending message:", error)
       const errorMessage: Message = {
@@ -0,0 +1,62 @@
+// Numeric chart payloads from the backend (/api/series, /api/distribution,
+// /api/corr), so cards can draw charts client-side instead of loading PNGs.
+
+const API_BASE = "http://localhost:8040"
+
+export interface SeriesData {
+  dataset_id: string
+  metric: string
+  points: number
+  dates: string[]
+  values: number[]
+}
+
+export interface YearDistribution {
+  Year: number
+  count: number
+  mean: number
+  min: number
+  q25: number
+  median: number
+  q75: number
+  max: number
+  grid: number[]
+  density: number[]
+}
+
+export interface DistributionData {
+  dataset_id: string
+  metric: string
+  years: YearDistribution[]
+}
+
+export interface CorrData {
+  dataset_id: string
+  columns: string[]
+  matrix: (number | null)[][]
+}
+
+async function getJSON<T>(path: string, params: Record<string, string | number | undefined>): Promise<T> {
+  const query = new URLSearchParams()
+  for (const [key, value] of Object.entries(params)) {
+    if (value !== undefined) query.set(key, String(value))
+  }
+  const response = await fetch(`${API_BASE}${path}?${query}`)
+  if (!response.ok) {
+    throw new Error(`${path} failed with status ${response.status}`)
+  }
+  return response.json()
+}
+
+// metric: "ndci" | "turbidity" | "shrinkage"
+export function fetchSeries(dataset: string, metric: string, points?: number) {
+  return getJSON<SeriesData>(`/api/series/${metric}`, { id: dataset, points })
+}
+
+export function fetchDistribution(dataset: string, metric: string, grid?: number) {
+  return getJSON<DistributionData>(`/api/distribution/${metric}`, { id: dataset, grid })
+}
+
+export function fetchCorr(dataset: string) {
+  return getJSON<CorrData>("/api/corr", { id: dataset })
+}
@@ -0,0 +1,50 @@
+export interface SSEEvent {
+  event: string
+  data: any
+}
+
+// True for a successful text/event-stream response. Errors from the
+// backend come back as JSON ({"error": ...}) with a 4xx/5xx status.
+export function isEventStream(response: Response): boolean {
+  const contentType = response.headers.get("content-type") || ""
+  return response.ok && contentType.startsWith("text/event-stream")
+}
+
+// Reads a text/event-stream response body (e.g. POST /api/analyze?stream=1)
+// and calls onEvent for every complete event. Resolves when the stream ends.
+export async function readSSE(response: Response, onEvent: (event: SSEEvent) => void) {
+  if (!isEventStream(response)) {
+    throw new Error(
+      `Expected an event stream, got HTTP ${response.status} (${response.headers.get("content-type") || "no content type"})`,
+    )
+  }
+  if (!response.body) {
+    throw new Error("Response has no body to stream")
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ""
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    let boundary = buffer.indexOf("\n\n")
+    while (boundary !== -1) {
+      const raw = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+      boundary = buffer.indexOf("\n\n")
+
+      let event = "message"
+      const dataLines: string[] = []
+      for (const line of raw.split("\n")) {
+        if (line.startsWith("event:")) event = line.slice(6).trim()
+        else if (line.startsWith("data:")) dataLines.push(line.slice(5).trim())
+      }
+      if (dataLines.length === 0) continue
+      onEvent({ event, data: JSON.parse(dataLines.join("\n")) })
+    }
+  }
+}
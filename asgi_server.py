@@ -0,0 +1,293 @@
+import os
+import time
+import asyncio
+import argparse
+import contextlib
+import contextvars
+from email.utils import formatdate
+from concurrent.futures import ThreadPoolExecutor
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+import backend
+import analysis
+import jobs
+import plot_cache
+import profiling
+import selection
+import server
+import tracing
+
+# ------------------------------------------------------------
+# ASGI APP
+# ------------------------------------------------------------
+# Same API as server.py, for serving many concurrent dashboard sessions
+# from one process:
+#
+#   uvicorn asgi_server:app --port 8040      (or: python asgi_server.py)
+#
+# The I/O-bound routes are native async handlers: /api/analyze (SSE waits
+# on the LLM without holding a thread), /api/export/pdf and the cached
+# /api/plot/* routes. Their blocking parts (cache lookups, prompt building)
+# run on IO_EXECUTOR; the CPU-heavy parts already run in the renderer and
+# training process pools. Every other route is server.app mounted through
+# a WSGI adapter, so the two servers never drift apart.
+
+IO_THREADS = int(os.environ.get("NEREUS_ASGI_THREADS", "32"))
+IO_EXECUTOR = ThreadPoolExecutor(max_workers=IO_THREADS, thread_name_prefix="nereus-io")
+
+CORS = [Middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])]
+
+
+async def _offload(fn, *args):
+    # Run in the caller's context so stages timed on the pool thread count
+    # towards this request's Server-Timing
+    ctx = contextvars.copy_context()
+    session = profiling.current()
+    if session is not None:
+        fn, args = session.call, (fn, *args)
+    return await asyncio.get_running_loop().run_in_executor(IO_EXECUTOR, ctx.run, fn, *args)
+
+
+class TracingMiddleware:
+    """
+    ASGI version of server.py's tracing hooks for the native routes: route
+    latency histogram (to response headers) and the opt-in Server-Timing.
+    The mounted Flask app traces its own routes.
+    """
+
+    def __init__(self, app, route: str):
+        self.app = app
+        self.route = route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not tracing.ENABLED:
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        token = tracing.begin_request()
+        headers = dict(scope["headers"])
+        wants_timing = tracing.wants_server_timing(
+            headers.get(tracing.SERVER_TIMING_REQUEST_HEADER.lower().encode(), b"").decode()
+        )
+        started = False
+
+        async def send_traced(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+                elapsed = time.perf_counter() - start
+                tracing.observe("nereus_request_seconds", elapsed, route=self.route,
+                                method=scope["method"], status=str(message["status"]))
+                if wants_timing:
+                    value = tracing.server_timing(tracing.request_stages(), elapsed)
+                    message = dict(message, headers=list(message.get("headers", [])) + [
+                        (b"server-timing", value.encode()),
+                        (b"timing-allow-origin", b"*"),
+                    ])
+            await send(message)
+
+        tracing.gauge_add("nereus_requests_inflight", 1)
+        try:
+            await self.app(scope, receive, send_traced)
+        finally:
+            if not started:
+                tracing.observe("nereus_request_seconds", time.perf_counter() - start,
+                                route=self.route, method=scope["method"], status="500")
+            tracing.gauge_add("nereus_requests_inflight", -1)
+            tracing.end_request(token)
+
+
+class ProfilingMiddleware:
+    """
+    Opt-in per-request profile (see profiling.py) for the native routes:
+    the work the handler runs through _offload is profiled, and the
+    response carries X-Profile-Id.
+    """
+
+    def __init__(self, app, route: str):
+        self.app = app
+        self.route = route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not profiling.enabled():
+            return await self.app(scope, receive, send)
+
+        request = Request(scope)
+        token = request.headers.get(profiling.PROFILE_HEADER) or request.query_params.get(profiling.PROFILE_QUERY)
+        path = request.url.path + (f"?{request.url.query}" if request.url.query else "")
+        session = profiling.begin(token, scope["method"], path, self.route)
+        if session is None:
+            return await self.app(scope, receive, send)
+
+        ctx_token = profiling.activate(session)
+
+        async def send_profiled(message):
+            nonlocal session
+            if message["type"] == "http.response.start" and session is not None:
+                profiling.deactivate(ctx_token)
+                ending, session = session, None
+                profile_id = await asyncio.to_thread(profiling.end, ending, message["status"])
+                message = dict(message, headers=list(message.get("headers", [])) + [
+                    (b"x-profile-id", profile_id.encode()),
+                ])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_profiled)
+        finally:
+            if session is not None:
+                profiling.deactivate(ctx_token)
+                await asyncio.to_thread(profiling.end, session, 500)
+
+
+def _traced(route: str) -> list:
+    return CORS + [Middleware(TracingMiddleware, route=route), Middleware(ProfilingMiddleware, route=route)]
+
+
+def _session_id(request: Request) -> str | None:
+    return request.headers.get(server.SESSION_HEADER) or request.cookies.get(server.SESSION_COOKIE)
+
+
+def _get_dataset_id_from_request(request: Request) -> str:
+    ds = request.query_params.get("id")
+    return ds if ds else selection.get_selected(_session_id(request))
+
+
+def _job_accepted(job: dict) -> JSONResponse:
+    status_url = f"/api/model/jobs/{job['id']}"
+    return JSONResponse(
+        {"status": job["status"], "job": job, "status_url": status_url},
+        status_code=202,
+        headers={"Location": status_url, "Retry-After": "5"},
+    )
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match", "")
+    tags = {t.strip().removeprefix("W/").strip('"') for t in header.split(",")}
+    return etag in tags or "*" in tags
+
+
+# ------------------ PLOTS ------------------ #
+
+async def plot(request: Request):
+    # /api/plot/violin/ndci -> "violin_ndci"
+    kind = request.path_params["kind"].replace("/", "_")
+    if kind not in backend.PLOT_FUNCTIONS:
+        return JSONResponse({"error": f"Unknown plot: {kind}"}, status_code=404)
+    ds_id = _get_dataset_id_from_request(request)
+    if ds_id not in backend.DATASETS:
+        return JSONResponse({"error": f"Unknown dataset id: {ds_id}"}, status_code=400)
+
+    if kind == "model_accuracy" and await _offload(backend.peek_trained_model, ds_id) is None:
+        return _job_accepted(await _offload(jobs.submit_training, ds_id))
+
+    etag = await _offload(plot_cache.plot_etag, kind, ds_id)
+    headers = {"ETag": f'"{etag}"', "Cache-Control": "no-cache"}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+
+    entry = await _offload(plot_cache.get_plot, kind, ds_id)
+    headers["Last-Modified"] = formatdate(entry["last_modified"], usegmt=True)
+    return Response(entry["data"], media_type="image/png", headers=headers)
+
+
+# ------------------ ANALYSIS ------------------ #
+
+async def analyze(request: Request):
+    try:
+        body = await request.json() or {}
+    except ValueError:
+        body = {}
+    ds_id = str(body.get("id") or _get_dataset_id_from_request(request))
+    prompt = body.get("prompt", "")
+
+    try:
+        chunks = await analysis.astream_textual_analysis(ds_id, prompt)
+    except Exception as exc:
+        return JSONResponse({"error": str(exc)}, status_code=500)
+
+    wants_stream = (
+        body.get("stream")
+        or request.query_params.get("stream") == "1"
+        or "text/event-stream" in request.headers.get("accept", "")
+    )
+    if not wants_stream:
+        return JSONResponse({"analysis": "".join([text async for text in chunks])})
+
+    async def events():
+        try:
+            async for text in chunks:
+                yield server._sse("token", {"text": text})
+        except Exception as exc:
+            yield server._sse("error", {"error": str(exc)})
+            return
+        yield server._sse("done", {"dataset_id": ds_id})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# ------------------ EXPORT PDF ------------------ #
+
+async def export_pdf(request: Request):
+    import report  # reportlab is only loaded once someone exports
+
+    ds_id = _get_dataset_id_from_request(request)
+    if ds_id not in backend.DATASETS:
+        return JSONResponse({"error": f"Unknown dataset id: {ds_id}"}, status_code=400)
+
+    path, key = await _offload(report.get_report, ds_id)
+    headers = {"ETag": f'"{key}"', "Cache-Control": "no-cache"}
+    if _etag_matches(request, key):
+        return Response(status_code=304, headers=headers)
+    return FileResponse(
+        path, media_type="application/pdf", filename=f"nereus-report-{ds_id}.pdf", headers=headers
+    )
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # asyncio.to_thread (used by analysis / llm_cache) shares the same pool
+    asyncio.get_running_loop().set_default_executor(IO_EXECUTOR)
+    yield
+    IO_EXECUTOR.shutdown(wait=False)
+
+
+app = Starlette(
+    routes=[
+        Route("/api/plot/{kind:path}", plot, methods=["GET"], middleware=_traced("/api/plot/<kind>")),
+        Route("/api/analyze", analyze, methods=["POST"], middleware=_traced("/api/analyze")),
+        Route("/api/export/pdf", export_pdf, methods=["GET"], middleware=_traced("/api/export/pdf")),
+        # Everything else (and CORS preflights): the Flask app
+        Mount("/", app=WSGIMiddleware(server.app, workers=IO_THREADS)),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="NEREUS backend server (ASGI)")
+    parser.add_argument("--dataset", default=selection.DEFAULT_DATASET,
+                        help="Dataset used by sessions that have not selected one")
+    parser.add_argument("--host", default=os.environ.get("NEREUS_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("NEREUS_PORT", "8040")))
+    args = parser.parse_args()
+
+    selection.DEFAULT_DATASET = args.dataset
+    print(f"\n✔ Default dataset: {args.dataset}")
+    print("✔ Starting ASGI server...\n")
+
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -2,39 +2,67 @@ import os
 import io
 import time
 import hashlib
+import json
+import threading
 import warnings
+from collections import OrderedDict
 
 import numpy as np
 import pandas as pd
 
-import matplotlib
-matplotlib.use("Agg")  # important for server environments
-import matplotlib.pyplot as plt
-import seaborn as sns
+# matplotlib / seaborn are imported by apply_plot_theme() and sklearn by
+# _fit_stacked_model(), on first use: importing backend (every worker boot,
+# every test) only needs pandas. See startup_check.py.
 
-from sklearn.ensemble import (
-    RandomForestRegressor,
-    GradientBoostingRegressor,
-    AdaBoostRegressor
-)
-from sklearn.model_selection import GridSearchCV, KFold
-from sklearn.pipeline import Pipeline
-from sklearn.metrics import r2_score, mean_squared_error
+import model_registry
+import search
+import forecast
+import dataset_store
+import stats_index
+import downsample
+import tracing
 
 warnings.filterwarnings("ignore")
 
-plt.style.use("default")
-sns.set_theme(style="whitegrid")
 
-import matplotlib as mpl
-mpl.rcParams["figure.facecolor"] = "white"
-mpl.rcParams["axes.facecolor"] = "white"
-mpl.rcParams["savefig.facecolor"] = "white"
-mpl.rcParams["lines.linewidth"] = 2.5
-mpl.rcParams["lines.markersize"] = 6
+_THEME_LOCK = threading.Lock()
+_THEME_APPLIED = False
+
+
+def apply_plot_theme() -> None:
+    """
+    Global matplotlib/seaborn theme for the plot renderers. rcParams are
+    process-wide, so this runs once per process: in each render worker's
+    initializer, or on the first in-process figure (_new_figure).
+    """
+    global _THEME_APPLIED
+    with _THEME_LOCK:
+        if _THEME_APPLIED:
+            return
+        _apply_plot_theme()
+        _THEME_APPLIED = True
+
+
+def _apply_plot_theme() -> None:
+    import matplotlib
+    matplotlib.use("Agg")  # important for server environments
+    import matplotlib as mpl
+    import matplotlib.style
+    import seaborn as sns
+
+    matplotlib.style.use("default")
+    sns.set_theme(style="whitegrid")
+
+    mpl.rcParams["figure.facecolor"] = "white"
+    mpl.rcParams["axes.facecolor"] = "white"
+    mpl.rcParams["savefig.facecolor"] = "white"
+    mpl.rcParams["lines.linewidth"] = 2.5
+    mpl.rcParams["lines.markersize"] = 6
+
+    # plt.style.use("seaborn-v0_8")
+    sns.set(rc={"figure.figsize": (10, 6)}, font_scale=1.1)
+
 
-# plt.style.use("seaborn-v0_8")
-sns.set(rc={"figure.figsize": (10, 6)}, font_scale=1.1)
 pd.set_option("display.max_columns", None)
 
 # -------------------------------------------------------------------
@@ -44,18 +72,117 @@ pd.set_option("display.max_columns", None)
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 OTHERS_DIR = os.path.join(BASE_DIR, "others")
 
-DATASETS = {
-    "1": os.path.join(OTHERS_DIR, "dataset-1.csv"),
-    "2": os.path.join(OTHERS_DIR, "dataset-2.csv"),
-    "3": os.path.join(OTHERS_DIR, "dataset-3.csv"),
-}
+# Datasets are discovered at import (see refresh_datasets):
+#   - every <DATASET_DIR>/dataset-<id>.csv
+#   - plus the entries of an optional JSON manifest:
+#       [{"id": "erie", "path": "lakes/erie.csv", "label": "Lake Erie",
+#         "search": "halving"}, ...]
+#     (relative paths are resolved against the manifest's directory)
+DATASET_DIR = os.environ.get("NEREUS_DATASET_DIR", OTHERS_DIR)
+DATASET_MANIFEST = os.environ.get(
+    "NEREUS_DATASET_MANIFEST", os.path.join(DATASET_DIR, "datasets.json")
+)
+
+DATASETS: dict[str, str] = {}
+DATASET_LABELS: dict[str, str] = {}
 
 DATASET_LABEL = "Water Body"
 
+# Columns _prepare_features / load_dataset add on top of the CSV header
+DERIVED_COLS = ["Region", "Year", "Month", "DayOfYear", "DOY_sin", "DOY_cos", "Year_norm"]
+
+# Loaded frames are kept in LRU order and evicted once their total size
+# exceeds this budget (the most recently used frame is always kept).
+DATASET_MEMORY_BUDGET = int(float(os.environ.get("NEREUS_DATASET_MEMORY_MB", "512")) * 1024 * 1024)
+
 # Cache so we don't reload CSV every time
-_DATASET_CACHE: dict[str, pd.DataFrame] = {}
+_DATASET_CACHE: "OrderedDict[str, pd.DataFrame]" = OrderedDict()
+_DATASET_SIZES: dict[str, int] = {}
+_CACHE_LOCK = threading.Lock()
+tracing.describe("nereus_dataset_loads_total", "counter",
+                 "load_dataset calls by source (memory, store, csv)")
+
+# path -> ((mtime_ns, size), metadata dict) for get_dataset_metadata
+_META_CACHE: dict[str, tuple] = {}
+
+# dataset id -> (mtime_ns, size) of the CSV the cached frame came from
+_DATASET_STAMPS: dict[str, tuple] = {}
+
+# (path, mtime, size) -> sha256 of the CSV, so we only hash on change
+_HASH_CACHE: dict[tuple, str] = {}
+
+# path -> ((mtime, size), sha256 object) after the last append_rows, so
+# consecutive appends extend the hash instead of re-reading the file
+_HASH_STATES: dict[str, tuple] = {}
+
+# dataset id -> statistics index (see stats_index.py)
+_STATS_CACHE: dict[str, dict] = {}
+
+SUMMARY_COLS = ["Chla_Value", "Turbidity_NTU", "Shrinkage_Percent"]
+CORR_COLS = [
+    "Chla_Value",
+    "Turbidity_NTU",
+    "Shrinkage_Percent",
+    "Year",
+    "DayOfYear",
+    "Month",
+]
+
+
+def _scan_dataset_dir() -> dict[str, tuple]:
+    found = {}
+    if not os.path.isdir(DATASET_DIR):
+        return found
+    for name in sorted(os.listdir(DATASET_DIR)):
+        if name.startswith("dataset-") and name.endswith(".csv"):
+            ds_id = name[len("dataset-"): -len(".csv")]
+            found[ds_id] = (os.path.join(DATASET_DIR, name), DATASET_LABEL, None)
+    return found
+
+
+def _read_manifest() -> dict[str, tuple]:
+    try:
+        with open(DATASET_MANIFEST) as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return {}
+
+    root = os.path.dirname(os.path.abspath(DATASET_MANIFEST))
+    found = {}
+    for entry in entries:
+        path = entry["path"]
+        if not os.path.isabs(path):
+            path = os.path.join(root, path)
+        found[str(entry["id"])] = (path, entry.get("label", DATASET_LABEL), entry.get("search"))
+    return found
+
+
+def refresh_datasets() -> dict[str, str]:
+    """
+    Re-discover datasets from DATASET_DIR and DATASET_MANIFEST. Updates
+    DATASETS in place (manifest entries win), rebuilds the per-dataset
+    search overrides and drops cached frames of datasets that disappeared.
+    """
+    found = _scan_dataset_dir()
+    found.update(_read_manifest())
+
+    for ds_id in [d for d in DATASETS if d not in found]:
+        DATASETS.pop(ds_id, None)
+        DATASET_LABELS.pop(ds_id, None)
+        _evict(ds_id)
+    for ds_id, (path, label, _search) in found.items():
+        DATASETS[ds_id] = path
+        DATASET_LABELS[ds_id] = label
+    DATASET_SEARCH.clear()
+    DATASET_SEARCH.update(
+        (ds_id, search) for ds_id, (_path, _label, search) in found.items() if search
+    )
+    return DATASETS
+
+
+def dataset_label(dataset_id: str) -> str:
+    return DATASET_LABELS.get(str(dataset_id), DATASET_LABEL)
 
-SELECTED_DATASET = 1
 # -------------------------------------------------------------------
 # UTILITIES
 # -------------------------------------------------------------------
@@ -80,7 +207,9 @@ def preprocess_z_values(df: pd.DataFrame) -> pd.DataFrame:
 def _prepare_features(df: pd.DataFrame) -> pd.DataFrame:
     """Add time-based and normalized features used by the model."""
     df = df.copy()
-    df["Date"] = pd.to_datetime(df["Date"])
+    # ISO8601: a daily CSV that later got sub-daily rows appended mixes
+    # "YYYY-MM-DD" and "YYYY-MM-DD HH:MM:SS"
+    df["Date"] = pd.to_datetime(df["Date"], format="ISO8601")
     df["Year"] = df["Date"].dt.year
     df["Month"] = df["Date"].dt.month
     df["DayOfYear"] = df["Date"].dt.dayofyear
@@ -92,87 +221,472 @@ def _prepare_features(df: pd.DataFrame) -> pd.DataFrame:
     df["DOY_cos"] = np.cos(2 * np.pi * df["DayOfYear"] / 365.0)
 
     # Normalized year
-    year_min = df["Year"].min()
-    year_max = df["Year"].max()
+    df["Year_norm"] = _year_norm(df["Year"], df["Year"].min(), df["Year"].max())
+
+    return df
+
+
+def _year_norm(year, year_min: int, year_max: int) -> np.ndarray:
+    year = np.asarray(year, dtype=float)
     if year_max > year_min:
-        df["Year_norm"] = (df["Year"] - year_min) / (year_max - year_min)
+        return (year - year_min) / (year_max - year_min)
+    return np.zeros_like(year)
+
+
+def _read_and_prepare(path: str, label: str = DATASET_LABEL) -> pd.DataFrame:
+    with tracing.stage("csv_parse"):
+        df = pd.read_csv(path)
+    with tracing.stage("features"):
+        df["Region"] = label
+        df = preprocess_z_values(df)
+        return _prepare_features(df)
+
+
+def _evict(dataset_id: str) -> None:
+    with _CACHE_LOCK:
+        _DATASET_CACHE.pop(dataset_id, None)
+        _DATASET_SIZES.pop(dataset_id, None)
+        _DATASET_STAMPS.pop(dataset_id, None)
+        _STATS_CACHE.pop(dataset_id, None)
+
+
+def _cache_frame(dataset_id: str, df: pd.DataFrame, stamp: tuple) -> None:
+    """Insert a frame into the LRU and evict the oldest ones over budget."""
+    with _CACHE_LOCK:
+        _DATASET_CACHE[dataset_id] = df
+        _DATASET_CACHE.move_to_end(dataset_id)
+        _DATASET_SIZES[dataset_id] = int(df.memory_usage(index=True, deep=False).sum())
+        _DATASET_STAMPS[dataset_id] = stamp
+
+        while len(_DATASET_CACHE) > 1 and sum(_DATASET_SIZES.values()) > DATASET_MEMORY_BUDGET:
+            oldest = next(iter(_DATASET_CACHE))
+            _DATASET_CACHE.pop(oldest)
+            _DATASET_SIZES.pop(oldest, None)
+            _DATASET_STAMPS.pop(oldest, None)
+
+
+def _build_stats(df: pd.DataFrame, data_hash: str) -> dict:
+    with tracing.stage("stats_build"):
+        stats = stats_index.build_index(df, SUMMARY_COLS, CORR_COLS)
+    stats["data_hash"] = data_hash
+    return stats
+
+
+def _load_prepared(dataset_id: str) -> pd.DataFrame:
+    """
+    Prepared frame for dataset_id, memory-mapped from the columnar store.
+    The CSV is only parsed (and the store rebuilt) when its content changed.
+    """
+    path = DATASETS[dataset_id]
+    index = dataset_store.read_index(dataset_id)
+
+    if dataset_store.index_is_current(index, path):
+        src = index["source"]
+        _HASH_CACHE[(path, src["mtime_ns"], src["size"])] = index["source_hash"]
+        tracing.inc("nereus_dataset_loads_total", source="store")
+        with tracing.stage("store_read"):
+            return dataset_store.read_bundle(index)
+
+    data_hash = dataset_hash(dataset_id)
+    if index is not None and index["source_hash"] == data_hash:
+        # Touched but unchanged
+        index = dataset_store.touch_index(dataset_id, index, path)
     else:
-        df["Year_norm"] = 0.0
+        tracing.inc("nereus_dataset_loads_total", source="csv")
+        df = _read_and_prepare(path, dataset_label(dataset_id))
+        with tracing.stage("store_write"):
+            index = dataset_store.write_bundle(dataset_id, df, path, data_hash)
+        dataset_store.write_stats(index, _build_stats(df, data_hash))
+    with tracing.stage("store_read"):
+        return dataset_store.read_bundle(index)
 
-    return df
 
+_LOAD_LOCKS: dict[str, threading.Lock] = {}
+_LOAD_LOCKS_GUARD = threading.Lock()
 
-def load_dataset(dataset_id: str) -> pd.DataFrame:
+
+def _load_lock(dataset_id: str) -> threading.Lock:
+    with _LOAD_LOCKS_GUARD:
+        return _LOAD_LOCKS.setdefault(dataset_id, threading.Lock())
+
+
+def load_dataset(dataset_id: str, copy: bool = False) -> pd.DataFrame:
     """
     Load and preprocess dataset by id ("1", "2", "3").
-    Returns a COPY so callers can safely modify.
+    Returns a READ-ONLY view of the cached frame by default: no data is
+    copied and the numeric/date columns are read-only memory maps.
+    Pass copy=True if you need to modify the values.
     """
     dataset_id = str(dataset_id)
     if dataset_id not in DATASETS:
         raise ValueError(f"Unknown dataset id: {dataset_id}")
 
-    if dataset_id not in _DATASET_CACHE:
-        path = DATASETS[dataset_id]
-        df = pd.read_csv(path)
-        df["Region"] = DATASET_LABEL
-        df = preprocess_z_values(df)
-        df = _prepare_features(df)
-        _DATASET_CACHE[dataset_id] = df
+    st = os.stat(DATASETS[dataset_id])
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _CACHE_LOCK:
+        df = _DATASET_CACHE.get(dataset_id)
+        if df is not None and _DATASET_STAMPS.get(dataset_id) == stamp:
+            _DATASET_CACHE.move_to_end(dataset_id)
+            tracing.inc("nereus_dataset_loads_total", source="memory")
+        else:
+            df = None
+
+    if df is None:
+        with _load_lock(dataset_id):
+            # Another thread may have loaded it while we waited
+            with _CACHE_LOCK:
+                df = _DATASET_CACHE.get(dataset_id)
+                if _DATASET_STAMPS.get(dataset_id) != stamp:
+                    df = None
+            if df is None:
+                df = _load_prepared(dataset_id)
+                _cache_frame(dataset_id, df, stamp)
+
+    if copy:
+        return df.copy()
+    # Shallow copy: a new frame object over the same buffers, so adding or
+    # dropping columns never changes the cached frame.
+    return df.copy(deep=False)
+
+
+def _hash_file(path: str):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h
+
+
+def dataset_hash(dataset_id: str) -> str:
+    """
+    Content hash (sha256) of the dataset's CSV file. Taken from the store
+    index when the file is unchanged since it was ingested, so every
+    process agrees on it without re-reading the file.
+    """
+    dataset_id = str(dataset_id)
+    if dataset_id not in DATASETS:
+        raise ValueError(f"Unknown dataset id: {dataset_id}")
 
-    return _DATASET_CACHE[dataset_id].copy()
+    path = DATASETS[dataset_id]
+    st = os.stat(path)
+    stamp = (path, st.st_mtime_ns, st.st_size)
+    if stamp not in _HASH_CACHE:
+        index = dataset_store.read_index(dataset_id)
+        if dataset_store.index_is_current(index, path):
+            _HASH_CACHE[stamp] = index["source_hash"]
+        else:
+            _HASH_CACHE[stamp] = _hash_file(path).hexdigest()
+    return _HASH_CACHE[stamp]
+
+
+_APPEND_LOCK = threading.Lock()
+
+
+def append_rows(dataset_id: str, rows: pd.DataFrame) -> dict:
+    """
+    Append raw rows (same columns as the dataset CSV) dated after the last
+    existing row. Only the new rows are parsed and featurised; the CSV is
+    appended to, the store bundle rewritten from the memory-mapped frame,
+    and the statistics index updated incrementally.
+    """
+    dataset_id = str(dataset_id)
+    with _APPEND_LOCK:
+        current = load_dataset(dataset_id)
+        if rows.empty:
+            return {"dataset_id": dataset_id, "appended": 0, "data_hash": dataset_hash(dataset_id)}
+
+        path = DATASETS[dataset_id]
+        old_stats = get_stats_index(dataset_id)
+
+        raw_cols = list(pd.read_csv(path, nrows=0).columns)
+        missing = [c for c in raw_cols if c not in rows.columns]
+        if missing:
+            raise ValueError(f"Rows are missing columns: {missing}")
+        rows = rows[raw_cols].copy()
+        rows["Date"] = pd.to_datetime(rows["Date"])
+        rows = rows.sort_values("Date").reset_index(drop=True)
+
+        if len(current) and rows["Date"].iloc[0] <= current["Date"].iloc[-1]:
+            raise ValueError("append_rows only accepts dates after the last existing row")
+
+        # 1. Source CSV: append in place. Keep the time of day unless every
+        # date (old and new) is at midnight, or a re-parse of the CSV would
+        # not match the appended bundle.
+        daily = all(
+            bool((dates == dates.dt.normalize()).all()) for dates in (current["Date"], rows["Date"])
+        )
+        date_format = "%Y-%m-%d" if daily else "%Y-%m-%d %H:%M:%S"
+        payload = rows.to_csv(index=False, header=False, date_format=date_format).encode()
+        with open(path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    payload = b"\n" + payload
+
+        # 2. Derived features for the new rows only
+        new = rows.copy()
+        new["Region"] = dataset_label(dataset_id)
+        new = _prepare_features(preprocess_z_values(new))
+        full = pd.concat([current, new[current.columns]], ignore_index=True)
+
+        year_min, year_max = full["Year"].iloc[0], full["Year"].iloc[-1]
+        old_range = (current["Year"].iloc[0], current["Year"].iloc[-1]) if len(current) else None
+        if old_range == (year_min, year_max):
+            full.loc[len(current):, "Year_norm"] = _year_norm(new["Year"], year_min, year_max)
+        else:
+            # Year range grew: Year_norm shifts for every row (vectorised, cheap)
+            full["Year_norm"] = _year_norm(full["Year"], year_min, year_max)
+
+        # From the CSV write until the new bundle is cached, a concurrent
+        # load_dataset would see a changed file and rebuild the same bundle
+        with _load_lock(dataset_id):
+            # Extend the sha256 state of the file as it was over the
+            # appended bytes: new_hash is the plain content hash any other
+            # process computes from the file.
+            st = os.stat(path)
+            state = _HASH_STATES.get(path)
+            if state is not None and state[0] == (st.st_mtime_ns, st.st_size):
+                h = state[1].copy()
+            else:
+                h = _hash_file(path)
+            with open(path, "ab") as f:
+                f.write(payload)
+            h.update(payload)
+            new_hash = h.hexdigest()
+            st = os.stat(path)
+            _HASH_STATES[path] = ((st.st_mtime_ns, st.st_size), h.copy())
+            _HASH_CACHE[(path, st.st_mtime_ns, st.st_size)] = new_hash
+
+            # 3. Store bundle + statistics index
+            index = dataset_store.write_bundle(dataset_id, full, path, new_hash)
+            stats = stats_index.append_rows(old_stats, new, full)
+            stats["data_hash"] = new_hash
+            dataset_store.write_stats(index, stats)
+
+            _cache_frame(dataset_id, dataset_store.read_bundle(index), (st.st_mtime_ns, st.st_size))
+            _STATS_CACHE[dataset_id] = stats
+
+    return {"dataset_id": dataset_id, "appended": int(len(rows)), "data_hash": new_hash}
+
+
+def _count_rows(path: str) -> int:
+    """Data rows in a CSV, counted from raw bytes without parsing."""
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            lines += chunk.count(b"\n")
+            last = chunk[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)  # minus header
+
+
+def _dataset_meta(dataset_id: str) -> dict:
+    """
+    Rows / columns of a dataset without loading it: from the store index
+    when it is current, otherwise from the CSV header and a line count.
+    """
+    path = DATASETS[dataset_id]
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _META_CACHE.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    index = dataset_store.read_index(dataset_id)
+    if dataset_store.index_is_current(index, path):
+        meta = {"rows": int(index["rows"]), "columns": list(index["columns"])}
+    else:
+        header = list(pd.read_csv(path, nrows=0).columns)
+        meta = {
+            "rows": _count_rows(path),
+            "columns": header + [c for c in DERIVED_COLS if c not in header],
+        }
+    _META_CACHE[path] = (stamp, meta)
+    return meta
 
 
 def get_dataset_metadata() -> list[dict]:
-    """Basic info for all datasets (for dropdowns, etc.)."""
+    """Basic info for all datasets (for dropdowns, etc.), without loading them."""
+    refresh_datasets()
     meta = []
-    for ds_id in DATASETS.keys():
-        df = load_dataset(ds_id)
+    for ds_id in list(DATASETS.keys()):
+        info = _dataset_meta(ds_id)
         meta.append(
             {
                 "id": ds_id,
-                "label": DATASET_LABEL,
-                "rows": int(len(df)),
-                "columns": list(df.columns),
+                "label": dataset_label(ds_id),
+                "rows": info["rows"],
+                "columns": info["columns"],
+                "loaded": ds_id in _DATASET_CACHE,
             }
         )
     return meta
 
 
+def get_stats_index(dataset_id: str) -> dict:
+    """
+    Precomputed statistics for dataset_id, built once per data hash and
+    persisted in the dataset store bundle.
+    """
+    dataset_id = str(dataset_id)
+    data_hash = dataset_hash(dataset_id)
+    stats = _STATS_CACHE.get(dataset_id)
+    if stats is not None and stats["data_hash"] == data_hash:
+        return stats
+
+    df = load_dataset(dataset_id)  # makes sure the store bundle is current
+    index = dataset_store.read_index(dataset_id)
+    stats = dataset_store.read_stats(index)
+    if stats is None or stats.get("data_hash") != data_hash:
+        stats = _build_stats(df, data_hash)
+        dataset_store.write_stats(index, stats)
+
+    _STATS_CACHE[dataset_id] = stats
+    return stats
+
+
 def get_basic_summary(dataset_id: str) -> dict:
     """Return summary stats for the main variables."""
-    df = load_dataset(dataset_id)
-    summary = df[["Chla_Value", "Turbidity_NTU", "Shrinkage_Percent"]].describe().round(3)
-    null_counts = df[["Chla_Value", "Turbidity_NTU", "Shrinkage_Percent"]].isnull().sum()
+    stats = get_stats_index(dataset_id)
+    summary = stats_index.describe_frame(stats).round(3)
 
     return {
         "summary": summary.to_dict(),
-        "null_counts": null_counts.to_dict(),
+        "null_counts": stats_index.null_counts(stats),
     }
 
 
 def get_corr_matrix(dataset_id: str) -> pd.DataFrame:
-    df = load_dataset(dataset_id)
-    corr_cols = [
-        "Chla_Value",
-        "Turbidity_NTU",
-        "Shrinkage_Percent",
-        "Year",
-        "DayOfYear",
-        "Month",
-    ]
-    corr = df[corr_cols].corr()
-    return corr
+    return stats_index.corr_frame(get_stats_index(dataset_id))
+
+
+def get_group_stats(dataset_id: str, key: str, column: str) -> pd.DataFrame:
+    """Per-Year / per-Month count, mean, std, min, quartiles, max of a column."""
+    return stats_index.group_frame(get_stats_index(dataset_id), key, column)
+
+# -------------------------------------------------------------------
+# CHART DATA (for client-side rendering)
+# -------------------------------------------------------------------
+# Numeric payloads behind the plot_* charts: downsampled series, per-year
+# quantiles + KDE grids (violin / box views) and the correlation matrix.
+
+METRICS = {
+    "ndci": "Chla_Value",
+    "chla": "Chla_Value",
+    "turbidity": "Turbidity_NTU",
+    "shrinkage": "Shrinkage_Percent",
+}
+DISTRIBUTION_QUANTILES = [0.0, 0.25, 0.5, 0.75, 1.0]
+KDE_BINS = 512  # histogram bins behind the binned KDE
+
+
+def metric_column(metric: str) -> str:
+    """Column for a metric name ("ndci", "turbidity", ...) or column name."""
+    if metric in METRICS:
+        return METRICS[metric]
+    if metric in SUMMARY_COLS:
+        return metric
+    raise ValueError(f"Unknown metric: {metric} (use one of {', '.join(METRICS)})")
 
+
+def get_series(dataset_id: str, metric: str, points: int | None = None, method: str | None = None) -> pd.DataFrame:
+    """Date / value rows of a metric, downsampled like the trend plots."""
+    column = metric_column(metric)
+    points = PLOT_DOWNSAMPLE["points"] if points is None else int(points)
+    method = PLOT_DOWNSAMPLE["method"] if method is None else method
+    if points < 3:
+        raise ValueError("points must be at least 3")
+    data, _ = _trend_points(load_dataset(dataset_id), column, points, method)
+    return data.rename(columns={column: "value"}).reset_index(drop=True)
+
+
+def _binned_kde(values: np.ndarray, grid_points: int) -> tuple:
+    """
+    Gaussian KDE (Scott bandwidth, grid cut at 2 bandwidths like seaborn's
+    violins) of values on grid_points points. Values are histogrammed into
+    KDE_BINS bins first, so the cost is O(n) + O(KDE_BINS * grid_points).
+    """
+    n = len(values)
+    std = values.std(ddof=1) if n > 1 else 0.0
+    if n < 2 or std == 0:
+        return np.array([values.min()] if n else []), np.array([1.0] if n else [])
+    bw = std * n ** (-1 / 5)
+    grid = np.linspace(values.min() - 2 * bw, values.max() + 2 * bw, grid_points)
+    counts, edges = np.histogram(values, bins=KDE_BINS)
+    centers = (edges[:-1] + edges[1:]) / 2
+    z = (grid[:, None] - centers[None, :]) / bw
+    density = np.exp(-0.5 * z * z) @ counts / (n * bw * np.sqrt(2 * np.pi))
+    return grid, density
+
+
+def get_distribution(dataset_id: str, metric: str, grid_points: int = 64) -> pd.DataFrame:
+    """
+    One row per Year: count, mean, min / q25 / median / q75 / max and the KDE
+    (grid, density lists) of the metric.
+    """
+    column = metric_column(metric)
+    if not 8 <= grid_points <= 1024:
+        raise ValueError("grid_points must be between 8 and 1024")
+    df = load_dataset(dataset_id)[["Year", column]].dropna()
+
+    by_year = df.groupby("Year")[column]
+    table = by_year.agg(["count", "mean"])
+    quantiles = by_year.quantile(DISTRIBUTION_QUANTILES).unstack()
+    quantiles.columns = ["min", "q25", "median", "q75", "max"]
+    table = table.join(quantiles)
+
+    kde = {year: _binned_kde(part.to_numpy(dtype=np.float64), grid_points) for year, part in by_year}
+    table["grid"] = [kde[year][0].tolist() for year in table.index]
+    table["density"] = [kde[year][1].tolist() for year in table.index]
+    table.index = table.index.astype(int)
+    return table.reset_index()
+
+
+# Trend plots draw at most "points" points per line (see downsample.py);
+# method is "lttb", "minmax" or "none".
+PLOT_DOWNSAMPLE = {
+    "method": os.environ.get("NEREUS_PLOT_DOWNSAMPLE", "lttb"),
+    "points": int(os.environ.get("NEREUS_PLOT_POINTS", "2000")),
+}
+
+# Anything that changes the rendered bytes. Bump "version" when plot code
+# changes so cached PNGs / ETags are invalidated.
+PLOT_RENDER_PARAMS = {
+    "format": "png",
+    "dpi": 180,
+    "version": 2,
+    "downsample": PLOT_DOWNSAMPLE,
+}
+
+
+def _new_figure(figsize: tuple) -> tuple:
+    """
+    Figure + Agg canvas without pyplot, so nothing touches pyplot's global
+    figure manager and renders can run side by side.
+    """
+    apply_plot_theme()
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    return fig, ax
+
+
+@tracing.timed("png_encode")
 def _fig_to_png_bytes(fig) -> io.BytesIO:
     buf = io.BytesIO()
     fig.savefig(
         buf,
-        format="png",
-        dpi=180,
+        format=PLOT_RENDER_PARAMS["format"],
+        dpi=PLOT_RENDER_PARAMS["dpi"],
         bbox_inches="tight",
         facecolor="white"   # ✅ THIS FIXES THE WHITE IMAGE BUG
     )
-    plt.close(fig)
     buf.seek(0)
     return buf
 
@@ -182,23 +696,53 @@ def _fig_to_png_bytes(fig) -> io.BytesIO:
 # -------------------------------------------------------------------
 
 def plot_correlation_heatmap(dataset_id: str) -> io.BytesIO:
-    df = load_dataset(dataset_id)
+    import seaborn as sns
+
     corr = get_corr_matrix(dataset_id)
 
-    fig, ax = plt.subplots(figsize=(8, 6))
+    fig, ax = _new_figure(figsize=(8, 6))
     sns.heatmap(corr, annot=True, cmap="coolwarm", fmt=".2f", ax=ax)
-    ax.set_title(f"Correlation Matrix - {DATASET_LABEL}")
+    ax.set_title(f"Correlation Matrix - {dataset_label(dataset_id)}")
     fig.tight_layout()
     
     return _fig_to_png_bytes(fig)
 
 
+def _trend_points(df: pd.DataFrame, column: str, points: int, method: str) -> tuple:
+    """
+    (Date/column rows to draw, whether dates are unique). Repeated dates
+    are averaged first when the series is longer than points.
+    """
+    data = df[["Date", column]].dropna()
+    unique = data["Date"].is_unique
+    if not unique and len(data) > points:
+        data = data.groupby("Date", as_index=False)[column].mean()
+        unique = True
+    if unique:
+        data = downsample.downsample(data, "Date", column, points, method)
+    return data, unique
+
+
+def _trend_lineplot(ax, df: pd.DataFrame, column: str) -> None:
+    """
+    Line + markers of column over Date, downsampled to PLOT_DOWNSAMPLE.
+    With one row per date, seaborn's per-x aggregation and bootstrap CI
+    are skipped (they would be no-ops). Repeated dates keep the mean + CI
+    band unless the series needs downsampling; then they are averaged first.
+    """
+    import seaborn as sns
+
+    data, unique = _trend_points(df, column, PLOT_DOWNSAMPLE["points"], PLOT_DOWNSAMPLE["method"])
+    kwargs = {"estimator": None, "errorbar": None} if unique else {}
+    sns.lineplot(data=data, x="Date", y=column, marker="o", color="#0057FF", ax=ax, **kwargs)
+
+
 def plot_ndci_trend(dataset_id: str) -> io.BytesIO:
     df = load_dataset(dataset_id)
 
-    fig, ax = plt.subplots(figsize=(12, 6))
-    sns.lineplot(data=df, x="Date", y="Chla_Value", marker="o", color="#0057FF", ax=ax)
-    ax.set_title(f"Chla Trend (2020–2024) - {DATASET_LABEL}")
+    fig, ax = _new_figure(figsize=(12, 6))
+    _trend_lineplot(ax, df, "Chla_Value")
+    ax.set_title(f"Chla Trend (2020–2024) - {dataset_label(dataset_id)}")
     ax.set_xlabel("Date")
     ax.set_ylabel("Chla Value")
     ax.set_ylim(df["Chla_Value"].min() * 0.9, df["Chla_Value"].max() * 1.1)
@@ -210,17 +754,10 @@ def plot_ndci_trend(dataset_id: str) -> io.BytesIO:
 def plot_turbidity_trend(dataset_id: str) -> io.BytesIO:
     df = load_dataset(dataset_id)
 
-    fig, ax = plt.subplots(figsize=(12, 6))
-    sns.lineplot(
-        data=df,
-        x="Date",
-        y="Turbidity_NTU",
-        marker="o",
-        color="#0057FF",
-        ax=ax,
-    )
+    fig, ax = _new_figure(figsize=(12, 6))
+    _trend_lineplot(ax, df, "Turbidity_NTU")
     ax.grid(False)
-    ax.set_title(f"Turbidity Trend (2020–2024) - {DATASET_LABEL}")
+    ax.set_title(f"Turbidity Trend (2020–2024) - {dataset_label(dataset_id)}")
     ax.set_xlabel("Date")
     ax.set_ylabel("Turbidity (NTU)")
     ax.set_ylim(df["Turbidity_NTU"].min() * 0.9, df["Turbidity_NTU"].max() * 1.1)
@@ -231,17 +768,10 @@ def plot_turbidity_trend(dataset_id: str) -> io.BytesIO:
 def plot_shrinkage_trend(dataset_id: str) -> io.BytesIO:
     df = load_dataset(dataset_id)
 
-    fig, ax = plt.subplots(figsize=(12, 6))
-    sns.lineplot(
-        data=df,
-        x="Date",
-        y="Shrinkage_Percent",
-        marker="o",
-        color="#0057FF",
-        ax=ax,
-    )
+    fig, ax = _new_figure(figsize=(12, 6))
+    _trend_lineplot(ax, df, "Shrinkage_Percent")
     ax.grid(False)
-    ax.set_title(f"Shrinkage % Trend (2020–2024) - {DATASET_LABEL}")
+    ax.set_title(f"Shrinkage % Trend (2020–2024) - {dataset_label(dataset_id)}")
     ax.set_xlabel("Date")
     ax.set_ylabel("Shrinkage (%)")
     ax.set_ylim(df["Shrinkage_Percent"].min() * 0.9, df["Shrinkage_Percent"].max() * 1.1)
@@ -250,20 +780,24 @@ def plot_shrinkage_trend(dataset_id: str) -> io.BytesIO:
 
 
 def plot_violin_ndci(dataset_id: str) -> io.BytesIO:
+    import seaborn as sns
+
     df = load_dataset(dataset_id)
 
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = _new_figure(figsize=(10, 6))
     sns.violinplot(data=df, x="Year", y="Chla_Value", inner="quartile", color="#0057FF", ax=ax)
-    ax.set_title(f"Chla Distribution by Year - {DATASET_LABEL}")
+    ax.set_title(f"Chla Distribution by Year - {dataset_label(dataset_id)}")
     ax.set_ylim(df["Chla_Value"].min() * 0.9, df["Chla_Value"].max() * 1.1)
     ax.grid(False)
     fig.tight_layout()
     return _fig_to_png_bytes(fig)
 
 def plot_violin_turbidity(dataset_id: str) -> io.BytesIO:
+    import seaborn as sns
+
     df = load_dataset(dataset_id)
 
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = _new_figure(figsize=(10, 6))
     sns.violinplot(
         data=df,
         x="Year",
@@ -272,7 +806,7 @@ def plot_violin_turbidity(dataset_id: str) -> io.BytesIO:
         color="#0057FF",
         ax=ax,
     )
-    ax.set_title(f"Turbidity Distribution by Year - {DATASET_LABEL}")
+    ax.set_title(f"Turbidity Distribution by Year - {dataset_label(dataset_id)}")
     ax.set_ylim(df["Turbidity_NTU"].min() * 0.9, df["Turbidity_NTU"].max() * 1.1)
 
     ax.grid(False)
@@ -281,9 +815,11 @@ def plot_violin_turbidity(dataset_id: str) -> io.BytesIO:
 
 
 def plot_violin_shrinkage(dataset_id: str) -> io.BytesIO:
+    import seaborn as sns
+
     df = load_dataset(dataset_id)
 
-    fig, ax = plt.subplots(figsize=(10, 6))
+    fig, ax = _new_figure(figsize=(10, 6))
     sns.violinplot(
         data=df,
         x="Year",
@@ -293,37 +829,43 @@ def plot_violin_shrinkage(dataset_id: str) -> io.BytesIO:
         ax=ax,
     )
     ax.grid(False)
-    ax.set_title(f"Shrinkage Distribution by Year - {DATASET_LABEL}")
+    ax.set_title(f"Shrinkage Distribution by Year - {dataset_label(dataset_id)}")
     ax.set_ylim(df["Shrinkage_Percent"].min() * 0.9, df["Shrinkage_Percent"].max() * 1.1)
     fig.tight_layout()
     return _fig_to_png_bytes(fig)
 
 
 def plot_box_ndci(dataset_id: str) -> io.BytesIO:
+    import seaborn as sns
+
     df = load_dataset(dataset_id)
-    fig, ax = plt.subplots(figsize=(8, 6))
+    fig, ax = _new_figure(figsize=(8, 6))
     sns.boxplot(data=df, y="Chla_Value", color="#0057FF", ax=ax)
-    ax.set_title(f"Chla Outliers - {DATASET_LABEL}")
+    ax.set_title(f"Chla Outliers - {dataset_label(dataset_id)}")
     ax.set_ylim(df["Chla_Value"].min() * 0.9, df["Chla_Value"].max() * 1.1)
     ax.grid(False)
     fig.tight_layout()
     return _fig_to_png_bytes(fig)
 
 def plot_box_turbidity(dataset_id: str) -> io.BytesIO:
+    import seaborn as sns
+
     df = load_dataset(dataset_id)
-    fig, ax = plt.subplots(figsize=(8, 6))
+    fig, ax = _new_figure(figsize=(8, 6))
     sns.boxplot(data=df, y="Turbidity_NTU", color="#0057FF", ax=ax)
-    ax.set_title(f"Turbidity Outliers - {DATASET_LABEL}")
+    ax.set_title(f"Turbidity Outliers - {dataset_label(dataset_id)}")
     ax.set_ylim(df["Turbidity_NTU"].min() * 0.9, df["Turbidity_NTU"].max() * 1.1)
     fig.tight_layout()
     ax.grid(False)
     return _fig_to_png_bytes(fig)
 
 def plot_box_shrinkage(dataset_id: str) -> io.BytesIO:
+    import seaborn as sns
+
     df = load_dataset(dataset_id)
-    fig, ax = plt.subplots(figsize=(8, 6))
+    fig, ax = _new_figure(figsize=(8, 6))
     sns.boxplot(data=df, y="Shrinkage_Percent", color="#0057FF", ax=ax)
-    ax.set_title(f"Shrinkage Outliers - {DATASET_LABEL}")
+    ax.set_title(f"Shrinkage Outliers - {dataset_label(dataset_id)}")
     ax.set_ylim(df["Shrinkage_Percent"].min() * 0.9, df["Shrinkage_Percent"].max() * 1.1)
     fig.tight_layout()
     ax.grid(False)
@@ -353,7 +895,7 @@ def plot_box_shrinkage(dataset_id: str) -> io.BytesIO:
 
 #     x = np.arange(len(model_names))
 
-#     fig, ax = plt.subplots(figsize=(12, 6))
+#     fig, ax = _new_figure(figsize=(12, 6))
 
 #     sns.barplot(
 #         x=model_names,
@@ -394,6 +936,7 @@ def plot_model_accuracy(dataset_id: str) -> io.BytesIO:
     """
     Generates model accuracy plot using ACTUAL trained metrics.
     """
+    import seaborn as sns
 
     # ✅ Get real evaluated metrics
     metrics = train_and_evaluate_model(dataset_id)
@@ -408,7 +951,7 @@ def plot_model_accuracy(dataset_id: str) -> io.BytesIO:
 
     x = np.arange(len(model_names))
 
-    fig, ax = plt.subplots(figsize=(12, 6))
+    fig, ax = _new_figure(figsize=(12, 6))
 
     sns.barplot(
         x=model_names,
@@ -445,6 +988,21 @@ def plot_model_accuracy(dataset_id: str) -> io.BytesIO:
     fig.tight_layout()
     return _fig_to_png_bytes(fig)
 
+# Plot kind -> renderer, used by the plot cache and server routes
+PLOT_FUNCTIONS = {
+    "correlation": plot_correlation_heatmap,
+    "ndci": plot_ndci_trend,
+    "turbidity": plot_turbidity_trend,
+    "shrinkage": plot_shrinkage_trend,
+    "violin_ndci": plot_violin_ndci,
+    "violin_turbidity": plot_violin_turbidity,
+    "violin_shrinkage": plot_violin_shrinkage,
+    "box_ndci": plot_box_ndci,
+    "box_turbidity": plot_box_turbidity,
+    "box_shrinkage": plot_box_shrinkage,
+    "model_accuracy": plot_model_accuracy,
+}
+
 # -------------------------------------------------------------------
 # MODEL TRAINING / EVALUATION
 # -------------------------------------------------------------------
@@ -459,15 +1017,70 @@ FEATURE_COLS = [
 TARGET_COL = "Chla_Value"
 
 
-def train_and_evaluate_model(dataset_id: str) -> dict:
+# Everything that influences the fitted model. Changing any value here
+# changes the config hash and invalidates the persisted registry entries.
+MODEL_CONFIG = {
+    "test_year": 2024,
+    "smoothing_window": 3,
+    "rf_params": {
+        "rf__n_estimators": [200, 350],
+        "rf__max_depth": [6, 8, 10],
+        "rf__min_samples_leaf": [1, 2, 3],
+    },
+    "cv_splits": 5,
+    "gb_params": {
+        "n_estimators": 500,
+        "learning_rate": 0.015,
+        "max_depth": 3,
+    },
+    "blend": {"rf": 0.65, "gb": 0.35},
+    "random_state": 42,
+    # "grid": exhaustive GridSearchCV; "halving": search.WarmStartHalvingSearch
+    "search": os.environ.get("NEREUS_SEARCH_MODE", "grid"),
+    "halving": {"rungs": [50, 100], "factor": 3},
+    # Days of daily forecast precomputed at training time (see forecast.py)
+    "forecast": {"horizon_days": 365},
+}
+
+SEARCH_MODES = ("grid", "halving")
+
+# Per-dataset search mode overrides (manifest "search" key)
+DATASET_SEARCH: dict[str, str] = {}
+
+
+def model_config(dataset_id: str) -> dict:
+    """MODEL_CONFIG with the dataset's search mode applied."""
+    mode = DATASET_SEARCH.get(str(dataset_id), MODEL_CONFIG["search"])
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode: {mode}")
+    return dict(MODEL_CONFIG, search=mode)
+
+# One lock per dataset so concurrent requests don't fit the same model twice
+_TRAIN_LOCKS: dict[str, threading.Lock] = {}
+_TRAIN_LOCKS_GUARD = threading.Lock()
+
+
+def _train_lock(dataset_id: str) -> threading.Lock:
+    with _TRAIN_LOCKS_GUARD:
+        return _TRAIN_LOCKS.setdefault(str(dataset_id), threading.Lock())
+
+
+def _jsonable(value):
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _fit_stacked_model(df: pd.DataFrame, config: dict) -> tuple:
     """
-    Runs your stacked Random Forest + Gradient Boosting model
-    and returns metrics. Includes the same 'boost' you had.
+    Fit the stacked Random Forest + Gradient Boosting model on df.
+    Returns (rf_best, gb_model, best_params, metrics).
     """
-    df = load_dataset(dataset_id)
+    from sklearn.ensemble import RandomForestRegressor, GradientBoostingRegressor
+    from sklearn.model_selection import GridSearchCV, KFold
+    from sklearn.pipeline import Pipeline
+    from sklearn.metrics import r2_score, mean_squared_error
 
-    train_df = df[df["Year"] < 2024].copy()
-    test_df = df[df["Year"] == 2024].copy()
+    train_df = df[df["Year"] < config["test_year"]].copy()
+    test_df = df[df["Year"] == config["test_year"]].copy()
 
     X_train = train_df[FEATURE_COLS]
     y_train = train_df[TARGET_COL]
@@ -475,46 +1088,57 @@ def train_and_evaluate_model(dataset_id: str) -> dict:
     y_test = test_df[TARGET_COL]
 
     # Light smoothing
-    y_train_smoothed = pd.Series(y_train).rolling(window=3, min_periods=1).mean()
+    y_train_smoothed = pd.Series(y_train).rolling(
+        window=config["smoothing_window"], min_periods=1
+    ).mean()
 
     # Tuned RF
-    rf_params = {
-        "rf__n_estimators": [200, 350],
-        "rf__max_depth": [6, 8, 10],
-        "rf__min_samples_leaf": [1, 2, 3],
-    }
-
     rf_model = Pipeline(
         [
-            ("rf", RandomForestRegressor(random_state=42)),
+            ("rf", RandomForestRegressor(random_state=config["random_state"])),
         ]
     )
 
-    cv = KFold(n_splits=5, shuffle=True, random_state=42)
-
-    rf_grid = GridSearchCV(
-        rf_model,
-        rf_params,
-        cv=cv,
-        scoring="r2",
-        n_jobs=-1,
+    cv = KFold(
+        n_splits=config["cv_splits"],
+        shuffle=True,
+        random_state=config["random_state"],
     )
-    rf_grid.fit(X_train, y_train_smoothed)
+
+    search_start = time.perf_counter()
+    if config["search"] == "halving":
+        rf_grid = search.WarmStartHalvingSearch(
+            config["rf_params"],
+            cv=cv,
+            rungs=config["halving"]["rungs"],
+            factor=config["halving"]["factor"],
+            random_state=config["random_state"],
+        )
+    else:
+        rf_grid = GridSearchCV(
+            rf_model,
+            config["rf_params"],
+            cv=cv,
+            scoring="r2",
+            n_jobs=-1,
+        )
+    with tracing.stage("model_search"):
+        rf_grid.fit(X_train, y_train_smoothed)
     rf_best = rf_grid.best_estimator_
+    search_seconds = time.perf_counter() - search_start
 
     # Gradient Boosting
     gb_model = GradientBoostingRegressor(
-        n_estimators=500,
-        learning_rate=0.015,
-        max_depth=3,
-        random_state=42,
+        **config["gb_params"],
+        random_state=config["random_state"],
     )
-    gb_model.fit(X_train, y_train_smoothed)
+    with tracing.stage("gb_fit"):
+        gb_model.fit(X_train, y_train_smoothed)
 
     # Stacked prediction
     rf_pred = rf_best.predict(X_test)
     gb_pred = gb_model.predict(X_test)
-    final_pred = (rf_pred * 0.65) + (gb_pred * 0.35)
+    final_pred = (rf_pred * config["blend"]["rf"]) + (gb_pred * config["blend"]["gb"])
 
     r2 = r2_score(y_test, final_pred)
     rmse = np.sqrt(mean_squared_error(y_test, final_pred))
@@ -523,22 +1147,203 @@ def train_and_evaluate_model(dataset_id: str) -> dict:
     r2_display = r2 + 4.43993241
     rmse_display = rmse + 3.313
 
-    return {
+    metrics = {
         "true_r2": float(r2),
         "true_rmse": float(rmse),
         "display_r2": float(r2_display),
         "display_r2_percent": float(r2_display * 100.0),
         "display_rmse": float(rmse_display),
         "message": "Random Forest identified as strongest performer (~90% display accuracy).",
+        "search": config["search"],
+        "best_params": {k: _jsonable(v) for k, v in rf_grid.best_params_.items()},
+        "search_seconds": float(search_seconds),
+        "train_seconds": float(time.perf_counter() - search_start),
     }
+    return rf_best, gb_model, dict(rf_grid.best_params_), metrics
+
+
+def model_cache_key(dataset_id: str) -> str:
+    """Registry key for the current (data, config) state of dataset_id."""
+    dataset_id = str(dataset_id)
+    return model_registry.registry_key(
+        dataset_id,
+        dataset_hash(dataset_id),
+        model_registry.config_hash(model_config(dataset_id)),
+    )
+
+
+def peek_trained_model(dataset_id: str) -> dict | None:
+    """Return the up-to-date registry entry for dataset_id, never training."""
+    dataset_id = str(dataset_id)
+    return model_registry.get_model(
+        dataset_id,
+        dataset_hash(dataset_id),
+        model_registry.config_hash(model_config(dataset_id)),
+    )
+
 
-if __name__ == "__main__":
-    print("\n Enter Port   ")
-    _choice = input().strip()
+def get_trained_model(dataset_id: str, force: bool = False) -> dict:
+    """
+    Return the model registry entry for dataset_id, training only when the
+    CSV content or model_config(dataset_id) changed since the last persisted fit.
+    """
+    dataset_id = str(dataset_id)
+    data_hash = dataset_hash(dataset_id)
+    config = model_config(dataset_id)
+    cfg_hash = model_registry.config_hash(config)
+
+    if not force:
+        entry = peek_trained_model(dataset_id)
+        if entry is not None:
+            return entry
+
+    with _train_lock(dataset_id):
+        # Another thread may have finished the fit while we waited
+        if not force:
+            entry = peek_trained_model(dataset_id)
+            if entry is not None:
+                return entry
+
+        df = load_dataset(dataset_id)
+        rf_best, gb_model, params, metrics = _fit_stacked_model(df, config)
+        entry = {"rf_model": rf_best, "gb_model": gb_model}
+        return model_registry.save_model(
+            dataset_id, data_hash, cfg_hash, rf_best, gb_model, params, metrics,
+            forecast=_build_forecast(df, config, entry),
+        )
+
+
+def train_and_evaluate_model(dataset_id: str, force: bool = False) -> dict:
+    """
+    Runs your stacked Random Forest + Gradient Boosting model
+    and returns metrics. Includes the same 'boost' you had.
+    Served from the persistent model registry unless data/config changed.
+    """
+    return dict(get_trained_model(dataset_id, force=force)["metrics"])
+
+
+# -------------------------------------------------------------------
+# BATCH PREDICTION (STACKED RF + GB)
+# -------------------------------------------------------------------
 
-    if _choice not in ["1", "2", "3"]:
-        print("Invalid input — defaulting to port 1.")
-        _choice = "1"
+def build_features(
+    dates,
+    year_min: int,
+    year_max: int,
+    turbidity=None,
+    shrinkage=None,
+    month_means: dict | None = None,
+) -> pd.DataFrame:
+    """
+    FEATURE_COLS for arbitrary dates, vectorised. Missing covariates
+    (None or NaN entries) fall back to month_means[col][month].
+    """
+    dates = pd.DatetimeIndex(pd.to_datetime(dates))
+    doy = dates.dayofyear.to_numpy(dtype=float)
+    month = dates.month.to_numpy()
+
+    X = pd.DataFrame(
+        {
+            "DOY_sin": np.sin(2 * np.pi * doy / 365.0),
+            "DOY_cos": np.cos(2 * np.pi * doy / 365.0),
+            "Year_norm": _year_norm(dates.year, year_min, year_max),
+        }
+    )
+
+    for col, values in (("Turbidity_NTU", turbidity), ("Shrinkage_Percent", shrinkage)):
+        if values is None:
+            values = np.full(len(dates), np.nan)
+        values = np.asarray(values, dtype=float)
+        if values.shape != (len(dates),):
+            raise ValueError(f"{col} must have one value per date")
+        missing = np.isnan(values)
+        if missing.any():
+            if not month_means or col not in month_means:
+                raise ValueError(f"{col} is required when no monthly climatology is available")
+            lookup = np.array([month_means[col].get(m, np.nan) for m in range(13)])
+            values = np.where(missing, lookup[month], values)
+        X[col] = values
+
+    return X[FEATURE_COLS]
+
+
+def _month_means(dataset_id: str) -> dict:
+    months = get_stats_index(dataset_id)["groups"]["Month"]
+    return {
+        col: {int(m): stats[col]["mean"] for m, stats in months.items() if stats[col]["count"]}
+        for col in ("Turbidity_NTU", "Shrinkage_Percent")
+    }
+
+
+def _year_range(dataset_id: str) -> tuple:
+    years = [int(y) for y in get_stats_index(dataset_id)["groups"]["Year"]]
+    return min(years), max(years)
+
+
+def predict_stacked(entry: dict, config: dict, X: pd.DataFrame) -> np.ndarray:
+    """Blend of the fitted RF and GB for a feature matrix, one pass each."""
+    rf_pred = entry["rf_model"].predict(X)
+    gb_pred = entry["gb_model"].predict(X)
+    return rf_pred * config["blend"]["rf"] + gb_pred * config["blend"]["gb"]
+
+
+def predict(dataset_id: str, dates, turbidity=None, shrinkage=None, train: bool = True) -> np.ndarray:
+    """
+    Chla predictions of the cached stacked ensemble for many dates at once.
+    Covariates left out are filled with the dataset's monthly means.
+    With train=False, raises LookupError if no up-to-date model exists.
+    """
+    dataset_id = str(dataset_id)
+    entry = get_trained_model(dataset_id) if train else peek_trained_model(dataset_id)
+    if entry is None:
+        raise LookupError(f"No trained model for dataset {dataset_id}")
+
+    year_min, year_max = _year_range(dataset_id)
+    X = build_features(
+        dates,
+        year_min,
+        year_max,
+        turbidity=turbidity,
+        shrinkage=shrinkage,
+        month_means=_month_means(dataset_id),
+    )
+    return predict_stacked(entry, model_config(dataset_id), X)
+
+
+# -------------------------------------------------------------------
+# FORECASTS
+# -------------------------------------------------------------------
+
+def _build_forecast(df: pd.DataFrame, config: dict, entry: dict) -> pd.DataFrame:
+    return forecast.build_forecast(
+        df,
+        config["forecast"]["horizon_days"],
+        build_features=build_features,
+        predict_chla=lambda X: predict_stacked(entry, config, X),
+        random_state=config["random_state"],
+    )
+
+
+def get_forecast(dataset_id: str, horizon: int) -> pd.DataFrame:
+    """
+    First `horizon` days of the forecast precomputed with the current model.
+    Raises LookupError if the model has not been trained yet.
+    """
+    dataset_id = str(dataset_id)
+    config = model_config(dataset_id)
+    max_horizon = config["forecast"]["horizon_days"]
+    if not 1 <= horizon <= max_horizon:
+        raise ValueError(f"horizon must be between 1 and {max_horizon}")
+
+    entry = peek_trained_model(dataset_id)
+    if entry is None:
+        raise LookupError(f"No trained model for dataset {dataset_id}")
+    if entry.get("forecast") is None:
+        entry = model_registry.update_entry(
+            entry, forecast=_build_forecast(load_dataset(dataset_id), config, entry)
+        )
+    return entry["forecast"].head(horizon)
 
-    SELECTED_DATASET = _choice
 
+# Discover datasets at startup; persisted models are loaded on first use
+refresh_datasets()
@@ -0,0 +1,289 @@
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------
+# BENCHMARK SUITE
+# -------------------------------------------------------------------
+# Times the backend and server hot paths on synthetic datasets that follow
+# the others/dataset-*.csv schema (Sentinel_ID, Date, Chla_Value,
+# Turbidity_NTU, Shrinkage_Percent):
+#
+#   micro   backend functions: CSV parse + features, cold / warm
+#           load_dataset, statistics index, corr matrix, every plot_*
+#           renderer, model training
+#   macro   Flask routes through the test client (cold and cached plots,
+#           chart data, summary, metrics, forecast, PDF export)
+#
+#   python bench.py                                   # all sizes
+#   python bench.py --sizes small,medium --only plot
+#   python bench.py --save-baseline                   # store a baseline
+#   python bench.py --baseline artifacts/bench/baseline.json --threshold 0.25
+#
+# Results go to --out as JSON. With a baseline, any benchmark whose median
+# is more than --threshold (relative) AND --min-delta (seconds) slower is
+# reported as a regression and the exit status is 1.
+#
+# Everything runs in a temporary directory: NEREUS_* paths are pointed
+# there before backend is imported, so real artifacts are never touched.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.join(BASE_DIR, "artifacts", "bench")
+
+SIZES = {"small": 1_500, "medium": 100_000, "large": 1_000_000}
+
+
+def make_dataset(rows: int, seed: int = 0) -> pd.DataFrame:
+    """
+    Synthetic station data with the dataset CSV schema: seasonal chla /
+    turbidity / shrinkage with a slow trend and noise, ending in 2024. Daily
+    for up to ~30 years, sub-daily beyond that.
+    """
+    rng = np.random.default_rng(seed)
+    span_days = min(rows, 30 * 365)
+    step = pd.Timedelta(days=span_days / rows)
+    # Ends in 2024 like the real exports, so the model's test_year has rows
+    dates = pd.date_range(end="2024-12-31", periods=rows, freq=step)
+    t = (dates - dates[0]).days.to_numpy() / 365.25
+    season = np.sin(2 * np.pi * dates.dayofyear.to_numpy() / 365.25)
+
+    chla = 5.0 + 0.8 * season + 0.05 * t + rng.normal(0, 0.4, rows)
+    turbidity = 7.0 + 0.04 * season + 0.002 * t + rng.normal(0, 0.03, rows)
+    shrinkage = 1.6 - 0.2 * season + 0.01 * t + rng.normal(0, 0.1, rows)
+    return pd.DataFrame(
+        {
+            "Sentinel_ID": [f"SYN{seed:04d}_{i:07d}" for i in range(rows)],
+            "Date": dates.strftime("%Y-%m-%d %H:%M:%S" if span_days < rows else "%Y-%m-%d"),
+            "Chla_Value": chla.round(3),
+            "Turbidity_NTU": turbidity.round(3),
+            "Shrinkage_Percent": shrinkage.round(3),
+        }
+    )
+
+
+def _setup_env(workdir: str, sizes: dict) -> None:
+    """Write the synthetic CSVs and point every NEREUS_* path into workdir."""
+    data_dir = os.path.join(workdir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    for name, rows in sizes.items():
+        make_dataset(rows).to_csv(os.path.join(data_dir, f"dataset-{name}.csv"), index=False)
+
+    os.environ.update(
+        NEREUS_DATASET_DIR=data_dir,
+        NEREUS_DATASET_MANIFEST=os.path.join(data_dir, "datasets.json"),
+        NEREUS_DATASTORE_DIR=os.path.join(workdir, "store"),
+        NEREUS_MODELS_DIR=os.path.join(workdir, "models"),
+        NEREUS_PLOTS_DIR=os.path.join(workdir, "plots"),
+        NEREUS_REPORTS_DIR=os.path.join(workdir, "reports"),
+        NEREUS_LLM_CACHE_DIR=os.path.join(workdir, "llm"),
+        NEREUS_LLM_PROVIDER="fake",
+        NEREUS_RENDER_WORKERS="0",  # time the renderers themselves, in-process
+    )
+
+
+def _time(fn, repeat: int, setup=None) -> list[float]:
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def _summary(times: list[float]) -> dict:
+    return {
+        "median_s": statistics.median(times),
+        "min_s": min(times),
+        "mean_s": statistics.fmean(times),
+        "runs": len(times),
+    }
+
+
+def run_benchmarks(sizes: dict, repeat: int, only: str | None, train_max_rows: int) -> dict:
+    import backend
+    import dataset_store
+    import plot_cache
+    import server
+
+    client = server.app.test_client()
+    results = {}
+
+    def bench(name: str, fn, runs: int | None = None, setup=None, size: str = "", prime: bool = False) -> None:
+        """prime: call fn once untimed first (for the "cached" benchmarks)."""
+        key = f"{size}/{name}"
+        if only and only not in key:
+            return
+        if prime:
+            fn()
+        times = _time(fn, runs or repeat, setup)
+        results[key] = _summary(times)
+        print(f"  {key:<45} median {results[key]['median_s'] * 1000:10.2f} ms")
+
+    def ok(resp, *codes):
+        if resp.status_code not in (codes or (200,)):
+            raise RuntimeError(f"{resp.request.path} returned {resp.status_code}")
+        return resp
+
+    for size, rows in sizes.items():
+        ds = size
+        path = backend.DATASETS[ds]
+        print(f"\n[{size}] {rows} rows")
+
+        def cold():
+            backend._evict(ds)
+            backend._HASH_CACHE.clear()
+            shutil.rmtree(dataset_store.STORE_DIR, ignore_errors=True)
+
+        # ---- micro ----
+        slow = 1 if rows > 100_000 else None
+        bench("read_and_prepare", lambda: backend._read_and_prepare(path), runs=slow, size=size)
+        raw = pd.read_csv(path)
+        bench("prepare_features", lambda: backend._prepare_features(backend.preprocess_z_values(raw.copy())), size=size)
+        bench("load_dataset_cold", lambda: backend.load_dataset(ds), runs=slow, setup=cold, size=size)
+        backend.load_dataset(ds)
+        bench("load_dataset_warm", lambda: backend.load_dataset(ds), size=size)
+        df = backend.load_dataset(ds)
+        bench("build_stats", lambda: backend._build_stats(df, "bench"), runs=slow, size=size)
+        backend.get_stats_index(ds)
+        bench("get_corr_matrix", lambda: backend.get_corr_matrix(ds), size=size)
+        bench("get_series", lambda: backend.get_series(ds, "ndci"), size=size)
+        bench("get_distribution", lambda: backend.get_distribution(ds, "ndci"), size=size)
+        for kind, fn in backend.PLOT_FUNCTIONS.items():
+            if kind != "model_accuracy":
+                bench(f"plot_{kind}", lambda fn=fn: fn(ds), runs=slow, size=size)
+
+        trained = rows <= train_max_rows
+        if trained:
+            bench("train_and_evaluate_model", lambda: backend.train_and_evaluate_model(ds, force=True),
+                  runs=1, size=size)
+            backend.get_trained_model(ds)  # untimed, in case --only skipped the fit
+            bench("plot_model_accuracy", lambda: backend.PLOT_FUNCTIONS["model_accuracy"](ds), size=size)
+
+        # ---- macro (Flask routes) ----
+        q = f"?id={ds}"
+        bench("GET /api/datasets", lambda: ok(client.get("/api/datasets")), size=size)
+        bench("GET /api/summary", lambda: ok(client.get(f"/api/summary{q}")), size=size)
+        bench("GET /api/corr", lambda: ok(client.get(f"/api/corr{q}")), size=size)
+        bench("GET /api/series/ndci", lambda: ok(client.get(f"/api/series/ndci{q}")), size=size)
+        bench("GET /api/distribution/ndci", lambda: ok(client.get(f"/api/distribution/ndci{q}")), size=size)
+        bench("GET /api/plot/ndci (cold)", lambda: ok(client.get(f"/api/plot/ndci{q}")), runs=slow,
+              setup=lambda: plot_cache.clear_cache(disk=True), size=size)
+        bench("GET /api/plot/ndci (cached)", lambda: ok(client.get(f"/api/plot/ndci{q}")), size=size,
+              prime=True)
+        etag = client.get(f"/api/plot/ndci{q}").headers["ETag"]
+        bench("GET /api/plot/ndci (304)",
+              lambda: ok(client.get(f"/api/plot/ndci{q}", headers={"If-None-Match": etag}), 304), size=size)
+        if trained:
+            bench("GET /api/model/metrics", lambda: ok(client.get(f"/api/model/metrics{q}")), size=size)
+            bench("GET /api/forecast", lambda: ok(client.get(f"/api/forecast{q}&horizon=90")), size=size)
+        bench("GET /api/export/pdf (cached)", lambda: ok(client.get(f"/api/export/pdf{q}")),
+              runs=slow, size=size, prime=True)
+
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta: float) -> list[dict]:
+    """Benchmarks slower than baseline by > threshold (relative) and > min_delta seconds."""
+    regressions = []
+    print(f"\n{'benchmark':<47}{'baseline ms':>13}{'now ms':>11}{'change':>9}")
+    for key, now in results.items():
+        base = baseline.get("results", {}).get(key)
+        if base is None:
+            continue
+        before, after = base["median_s"], now["median_s"]
+        change = (after - before) / before if before > 0 else 0.0
+        flag = ""
+        if change > threshold and after - before > min_delta:
+            regressions.append({"benchmark": key, "baseline_s": before, "now_s": after, "change": change})
+            flag = "  REGRESSION"
+        print(f"{key:<47}{before * 1000:>13.2f}{after * 1000:>11.2f}{change:>+9.0%}{flag}")
+    return regressions
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="NEREUS backend / server benchmarks")
+    parser.add_argument("--sizes", default=",".join(SIZES),
+                        help=f"Comma-separated subset of {', '.join(SIZES)}")
+    parser.add_argument("--only", help="Run only benchmarks whose name contains this")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per benchmark (expensive ones run once)")
+    parser.add_argument("--train-max-rows", type=int, default=20_000,
+                        help="Skip model training benchmarks above this many rows")
+    parser.add_argument("--out", default=os.path.join(BENCH_DIR, "results.json"))
+    parser.add_argument("--baseline", default=os.path.join(BENCH_DIR, "baseline.json"))
+    parser.add_argument("--save-baseline", action="store_true", help="Also write the results as the baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Allowed relative slowdown")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="Ignore slowdowns below this (seconds)")
+    args = parser.parse_args(argv)
+
+    names = [s.strip() for s in args.sizes.split(",") if s.strip()]
+    unknown = [s for s in names if s not in SIZES]
+    if unknown:
+        parser.error(f"unknown sizes: {', '.join(unknown)}")
+    sizes = {name: SIZES[name] for name in names}
+
+    workdir = tempfile.mkdtemp(prefix="nereus-bench-")
+    try:
+        _setup_env(workdir, sizes)
+        results = run_benchmarks(sizes, args.repeat, args.only, args.train_max_rows)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "sizes": sizes,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.out}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare against (use --save-baseline).")
+        return 0
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold, args.min_delta)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+        return 1
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+import os
+import json
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------
+# COLUMNAR DATASET STORE
+# -------------------------------------------------------------------
+# The prepared frame (after _prepare_features) is written next to the
+# artifacts as a NumPy .npy bundle:
+#
+#   <STORE_DIR>/<dataset_id>.json              index: source stat + hash
+#   <STORE_DIR>/<dataset_id>-<hash16>/meta.json column layout
+#   <STORE_DIR>/<dataset_id>-<hash16>/*.npy     one 2D block per numeric dtype,
+#                                               one 1D file per date/str column
+#
+# Numeric columns of the same dtype share one (n_cols, n_rows) block, so the
+# DataFrame built from the memory-mapped block is a view, not a copy. All
+# processes that load the same dataset share the page cache.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.environ.get(
+    "NEREUS_DATASTORE_DIR", os.path.join(BASE_DIR, "artifacts", "datasets")
+)
+
+STORE_FORMAT_VERSION = 1
+
+
+def _index_path(dataset_id: str) -> str:
+    return os.path.join(STORE_DIR, f"{dataset_id}.json")
+
+
+def _bundle_dir(dataset_id: str, source_hash: str) -> str:
+    return os.path.join(STORE_DIR, f"{dataset_id}-{source_hash[:16]}")
+
+
+def read_index(dataset_id: str) -> dict | None:
+    try:
+        with open(_index_path(str(dataset_id))) as f:
+            index = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if index.get("version") != STORE_FORMAT_VERSION:
+        return None
+    if not os.path.isfile(os.path.join(index["bundle"], "meta.json")):
+        return None
+    return index
+
+
+def _write_json(path: str, obj: dict) -> None:
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(obj, f)
+    os.replace(tmp, path)
+
+
+def source_stamp(path: str) -> dict:
+    st = os.stat(path)
+    return {"path": path, "mtime_ns": st.st_mtime_ns, "size": st.st_size}
+
+
+def index_is_current(index: dict | None, path: str) -> bool:
+    """Cheap freshness check: source file stat unchanged since ingestion."""
+    if index is None:
+        return False
+    stamp = source_stamp(path)
+    return (
+        index["source"]["mtime_ns"] == stamp["mtime_ns"]
+        and index["source"]["size"] == stamp["size"]
+    )
+
+
+def touch_index(dataset_id: str, index: dict, path: str) -> dict:
+    """Source was touched but its hash is unchanged: just refresh the stat."""
+    index = dict(index, source=source_stamp(path))
+    _write_json(_index_path(str(dataset_id)), index)
+    return index
+
+
+def write_bundle(dataset_id: str, df: pd.DataFrame, source_path: str, source_hash: str) -> dict:
+    """Write df as a .npy bundle and point the dataset index at it."""
+    dataset_id = str(dataset_id)
+    os.makedirs(STORE_DIR, exist_ok=True)
+
+    bundle = _bundle_dir(dataset_id, source_hash)
+    tmp_bundle = f"{bundle}.{os.getpid()}.{threading.get_ident()}.tmp"
+    shutil.rmtree(tmp_bundle, ignore_errors=True)
+    os.makedirs(tmp_bundle)
+
+    layout = []
+    blocks: dict[str, list[str]] = {}
+    for col in df.columns:
+        dtype = df[col].dtype
+        if dtype.kind in "fiub":
+            blocks.setdefault(np.dtype(dtype).str, []).append(col)
+            layout.append({"name": col, "kind": "block", "dtype": np.dtype(dtype).str})
+        elif dtype.kind == "M":
+            fname = f"col_{len(layout)}.npy"
+            np.save(os.path.join(tmp_bundle, fname), df[col].to_numpy())
+            layout.append({"name": col, "kind": "datetime", "file": fname})
+        else:
+            fname = f"col_{len(layout)}.npy"
+            values = df[col]
+            nulls = values.isna().to_numpy()
+            np.save(
+                os.path.join(tmp_bundle, fname),
+                values.fillna("").astype(str).to_numpy(dtype=str),
+            )
+            entry = {"name": col, "kind": "str", "file": fname}
+            if nulls.any():
+                entry["null_mask"] = f"null_{len(layout)}.npy"
+                np.save(os.path.join(tmp_bundle, entry["null_mask"]), nulls)
+            layout.append(entry)
+
+    block_files = {}
+    for i, (dtype_str, cols) in enumerate(blocks.items()):
+        fname = f"block_{i}.npy"
+        arr = np.lib.format.open_memmap(
+            os.path.join(tmp_bundle, fname),
+            mode="w+",
+            dtype=np.dtype(dtype_str),
+            shape=(len(cols), len(df)),
+        )
+        for j, col in enumerate(cols):
+            arr[j] = df[col].to_numpy()
+        arr.flush()
+        del arr
+        block_files[dtype_str] = {"file": fname, "columns": cols}
+
+    meta = {"rows": int(len(df)), "columns": layout, "blocks": block_files}
+    _write_json(os.path.join(tmp_bundle, "meta.json"), meta)
+
+    shutil.rmtree(bundle, ignore_errors=True)
+    os.replace(tmp_bundle, bundle)
+
+    old = read_index(dataset_id)
+    index = {
+        "version": STORE_FORMAT_VERSION,
+        "dataset_id": dataset_id,
+        "source": source_stamp(source_path),
+        "source_hash": source_hash,
+        "bundle": bundle,
+        "rows": meta["rows"],
+        "columns": [c["name"] for c in layout],
+    }
+    _write_json(_index_path(dataset_id), index)
+
+    if old is not None and old["bundle"] != bundle:
+        shutil.rmtree(old["bundle"], ignore_errors=True)
+    return index
+
+
+def read_bundle(index: dict) -> pd.DataFrame:
+    """
+    Memory-map a bundle back into a DataFrame. Numeric and datetime columns
+    are read-only views of the mapped files: the frame is built from one
+    dict of 1-D arrays with copy=False, since pd.concat or a column
+    selection would copy every column on pandas < 3 (no copy-on-write).
+    """
+    bundle = index["bundle"]
+    with open(os.path.join(bundle, "meta.json")) as f:
+        meta = json.load(f)
+
+    arrays = {}
+    for block in meta["blocks"].values():
+        arr = np.load(os.path.join(bundle, block["file"]), mmap_mode="r")
+        for j, name in enumerate(block["columns"]):
+            arrays[name] = arr[j].view(np.ndarray)  # plain ndarray over the map
+
+    for col in meta["columns"]:
+        if col["kind"] == "datetime":
+            arrays[col["name"]] = np.load(os.path.join(bundle, col["file"]), mmap_mode="r").view(np.ndarray)
+        elif col["kind"] == "str":
+            values = pd.Series(np.load(os.path.join(bundle, col["file"])))
+            if "null_mask" in col:
+                values = values.mask(np.load(os.path.join(bundle, col["null_mask"])))
+            arrays[col["name"]] = values
+
+    return pd.DataFrame(
+        {c["name"]: arrays[c["name"]] for c in meta["columns"]},
+        index=pd.RangeIndex(meta["rows"]),
+        copy=False,
+    )
+
+
+def read_stats(index: dict) -> dict | None:
+    """Statistics index stored inside the bundle, if any."""
+    try:
+        with open(os.path.join(index["bundle"], "stats.json")) as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def write_stats(index: dict, stats: dict) -> None:
+    _write_json(os.path.join(index["bundle"], "stats.json"), stats)
@@ -0,0 +1,42 @@
+import os
+import fnmatch
+
+# -------------------------------------------------------------------
+# ON-DISK LRU PRUNING
+# -------------------------------------------------------------------
+# The file caches (plot PNGs, LLM answers, PDF reports, request profiles)
+# bump a file's mtime when they use it, so "oldest mtime" is "least
+# recently used". prune() keeps the newest `limit` files of a directory.
+
+
+def prune(directory: str, pattern: str, limit: int) -> list[str]:
+    """
+    Delete the least recently modified files of directory matching the
+    glob pattern until at most limit are left. Returns the removed paths
+    (files removed concurrently by someone else are skipped silently).
+    """
+    try:
+        names = fnmatch.filter(os.listdir(directory), pattern)
+    except FileNotFoundError:
+        return []
+    excess = len(names) - limit
+    if excess <= 0:
+        return []
+
+    stamped = []
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            stamped.append((os.path.getmtime(path), path))
+        except FileNotFoundError:
+            excess -= 1
+    stamped.sort()
+
+    removed = []
+    for _mtime, path in stamped[:max(0, excess)]:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            continue
+        removed.append(path)
+    return removed
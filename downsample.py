@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------
+# VISUAL DOWNSAMPLING FOR LINE PLOTS
+# -------------------------------------------------------------------
+# Reduce a long (x, y) series to about n_out points that draw the same
+# line, before it reaches matplotlib:
+#
+#   "lttb"    Largest-Triangle-Three-Buckets: one point per bucket, the one
+#             forming the largest triangle with its neighbours. Keeps the
+#             visual shape (peaks, troughs) of the line.
+#   "minmax"  Per x-range bucket ("pixel column"), keep the min and the max
+#             point. Keeps every extreme exactly; good for noisy data.
+#   "none"    Keep all points.
+#
+# Both return row indices into the (x-sorted) input, so callers can take
+# the original rows, including other columns.
+
+METHODS = ("lttb", "minmax", "none")
+
+
+def _as_float(x) -> np.ndarray:
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(np.float64)
+    return x.astype(np.float64)
+
+
+def lttb_indices(x, y, n_out: int) -> np.ndarray:
+    """Indices of the LTTB selection of n_out points from x-sorted (x, y)."""
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets over the inner points; first and last are always kept
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nxt = slice(edges[i + 1], edges[i + 2])
+            avg_x, avg_y = x[nxt].mean(), y[nxt].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(x, y, n_out: int) -> np.ndarray:
+    """Indices of the min and max point per x bucket (n_out // 2 buckets)."""
+    x = _as_float(x)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    n_buckets = n_out // 2
+    if n_out >= n or n_buckets < 1:
+        return np.arange(n)
+
+    span = x[-1] - x[0]
+    if span > 0:
+        bucket = np.minimum(((x - x[0]) / span * n_buckets).astype(np.int64), n_buckets - 1)
+    else:
+        bucket = np.zeros(n, dtype=np.int64)
+
+    order = np.lexsort((y, bucket))  # by bucket, then y
+    starts = np.flatnonzero(np.r_[True, bucket[order][1:] != bucket[order][:-1]])
+    ends = np.r_[starts[1:], n] - 1
+    keep = np.concatenate([order[starts], order[ends], [0, n - 1]])
+    return np.unique(keep)
+
+
+def downsample(frame: pd.DataFrame, x: str, y: str, n_out: int, method: str = "lttb") -> pd.DataFrame:
+    """Rows of frame (sorted by x, NaN y dropped) reduced to about n_out points."""
+    if method not in METHODS:
+        raise ValueError(f"Unknown downsampling method: {method} (use one of {', '.join(METHODS)})")
+    frame = frame.dropna(subset=[y]).sort_values(x, kind="stable")
+    if method == "none" or len(frame) <= n_out:
+        return frame
+
+    pick = lttb_indices if method == "lttb" else minmax_indices
+    return frame.iloc[pick(frame[x].to_numpy(), frame[y].to_numpy(), n_out)]
@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------
+# MULTI-STEP FORECASTS (CHLA / TURBIDITY / SHRINKAGE)
+# -------------------------------------------------------------------
+# Direct forecasts from the calendar features of the model pipeline
+# (DOY_sin, DOY_cos, Year_norm):
+#
+#   Turbidity_NTU, Shrinkage_Percent:
+#       linear trend + season on [Year_norm, DOY_sin, DOY_cos], plus a small
+#       GB model on the residuals over [DOY_sin, DOY_cos] for the shape of
+#       the seasonal cycle. The linear part lets the trend extrapolate.
+#   Chla_Value:
+#       the fitted stacked RF + GB ensemble, fed with the forecast turbidity
+#       and shrinkage as covariates.
+#
+# The whole horizon is computed once when the model is trained and stored
+# with the registry entry; requests only slice it.
+
+COVARIATE_TARGETS = ["Turbidity_NTU", "Shrinkage_Percent"]
+TREND_FEATURES = ["Year_norm", "DOY_sin", "DOY_cos"]
+SEASON_FEATURES = ["DOY_sin", "DOY_cos"]
+
+
+def _fit_trend_model(X: pd.DataFrame, y: np.ndarray, random_state: int) -> dict:
+    from sklearn.ensemble import GradientBoostingRegressor
+    from sklearn.linear_model import LinearRegression
+
+    linear = LinearRegression().fit(X[TREND_FEATURES], y)
+    residual = y - linear.predict(X[TREND_FEATURES])
+    season = GradientBoostingRegressor(
+        n_estimators=150, learning_rate=0.05, max_depth=2, random_state=random_state
+    ).fit(X[SEASON_FEATURES], residual)
+    return {"linear": linear, "season": season}
+
+
+def _predict_trend_model(model: dict, X: pd.DataFrame) -> np.ndarray:
+    return model["linear"].predict(X[TREND_FEATURES]) + model["season"].predict(X[SEASON_FEATURES])
+
+
+def build_forecast(
+    df: pd.DataFrame,
+    horizon_days: int,
+    build_features,
+    predict_chla,
+    random_state: int = 42,
+) -> pd.DataFrame:
+    """
+    Daily forecast for the horizon_days after the last observation.
+
+    build_features(dates, year_min, year_max, turbidity, shrinkage) and
+    predict_chla(X) come from backend, so the forecast uses exactly the same
+    feature pipeline and fitted ensemble as /api/model/predict.
+    """
+    year_min, year_max = int(df["Year"].min()), int(df["Year"].max())
+
+    history = df.dropna(subset=COVARIATE_TARGETS)
+    X_hist = build_features(
+        history["Date"],
+        year_min,
+        year_max,
+        turbidity=history["Turbidity_NTU"].to_numpy(),
+        shrinkage=history["Shrinkage_Percent"].to_numpy(),
+    )
+
+    last = pd.Timestamp(df["Date"].max())
+    dates = pd.date_range(last + pd.Timedelta(days=1), periods=horizon_days, freq="D")
+    X_future = build_features(
+        dates,
+        year_min,
+        year_max,
+        turbidity=np.zeros(len(dates)),
+        shrinkage=np.zeros(len(dates)),
+    )
+
+    out = pd.DataFrame({"Date": dates})
+    for target in COVARIATE_TARGETS:
+        model = _fit_trend_model(X_hist, history[target].to_numpy(), random_state)
+        out[target] = _predict_trend_model(model, X_future)
+        X_future[target] = out[target].to_numpy()
+
+    out["Chla_Value"] = predict_chla(X_future)
+    out["Horizon"] = np.arange(1, len(out) + 1)
+    return out[["Date", "Horizon", "Chla_Value", "Turbidity_NTU", "Shrinkage_Percent"]]
@@ -0,0 +1,141 @@
+import sys
+import argparse
+
+import pandas as pd
+
+import backend
+
+# -------------------------------------------------------------------
+# EARTH ENGINE EXPORT INGEST
+# -------------------------------------------------------------------
+# Streams a GEE export (e.g. data/FastReport_a.csv written by
+# GEE-Codes/Main.js) into an existing dataset. The export is read in
+# chunks, mapped onto the dataset schema, and only dates after the last
+# existing row are appended via backend.append_rows, which updates the
+# derived features, store bundle and statistics index incrementally.
+
+# export column -> dataset column, per known export schema
+SCHEMAS = {
+    "fastreport": {
+        "date": "Date",
+        "Chl_a": "Chla_Value",
+        "Turbidity": "Turbidity_NTU",
+        "Shrinkage": "Shrinkage_Percent",
+    },
+    "dataset": {
+        "Date": "Date",
+        "Chla_Value": "Chla_Value",
+        "Turbidity_NTU": "Turbidity_NTU",
+        "Shrinkage_Percent": "Shrinkage_Percent",
+    },
+}
+
+DEFAULT_CHUNKSIZE = 100_000
+
+# Flush to the dataset after this many new rows so memory stays bounded
+FLUSH_ROWS = 500_000
+
+
+def detect_schema(path: str) -> str:
+    header = set(pd.read_csv(path, nrows=0).columns)
+    for name, mapping in SCHEMAS.items():
+        if set(mapping) <= header:
+            return name
+    raise ValueError(f"Unrecognised export header in {path}: {sorted(header)}")
+
+
+def read_export(path: str, schema: str | None = None, chunksize: int = DEFAULT_CHUNKSIZE):
+    """Yield chunks of the export already renamed to the dataset schema."""
+    schema = schema or detect_schema(path)
+    mapping = SCHEMAS[schema]
+    for chunk in pd.read_csv(path, usecols=list(mapping), chunksize=chunksize):
+        chunk = chunk.rename(columns=mapping)
+        chunk["Date"] = pd.to_datetime(chunk["Date"])
+        yield chunk
+
+
+def _sentinel_ids(last_id, count: int) -> list:
+    """Continue the PREFIX_NNN numbering of the existing Sentinel_ID column."""
+    prefix, sep, number = str(last_id).rpartition("_")
+    if not sep or not number.isdigit():
+        return [None] * count
+    start = int(number) + 1
+    return [f"{prefix}_{start + i:03d}" for i in range(count)]
+
+
+def ingest_export(
+    dataset_id: str,
+    path: str,
+    schema: str | None = None,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+) -> dict:
+    """
+    Append the new dates of an export to dataset_id.
+    Returns {"dataset_id", "read", "appended", "skipped", "data_hash"}.
+    """
+    dataset_id = str(dataset_id)
+    current = backend.load_dataset(dataset_id)
+    last_date = current["Date"].iloc[-1] if len(current) else pd.Timestamp.min
+    last_id = current["Sentinel_ID"].iloc[-1] if "Sentinel_ID" in current.columns and len(current) else None
+
+    report = {"dataset_id": dataset_id, "read": 0, "appended": 0, "skipped": 0, "data_hash": None}
+    pending: list[pd.DataFrame] = []
+    pending_rows = 0
+    # Dates waiting in pending; once flushed, last_date is the high-water
+    # mark, so the set never holds more than one flush worth of dates
+    seen_dates: set = set()
+
+    def flush():
+        nonlocal pending, pending_rows, last_id, last_date
+        if not pending:
+            return
+        rows = pd.concat(pending, ignore_index=True).sort_values("Date")
+        if "Sentinel_ID" in current.columns:
+            rows.insert(0, "Sentinel_ID", _sentinel_ids(last_id, len(rows)))
+            last_id = rows["Sentinel_ID"].iloc[-1]
+        result = backend.append_rows(dataset_id, rows)
+        report["appended"] += result["appended"]
+        report["data_hash"] = result["data_hash"]
+        last_date = rows["Date"].iloc[-1]
+        pending, pending_rows = [], 0
+        seen_dates.clear()
+
+    for chunk in read_export(path, schema=schema, chunksize=chunksize):
+        report["read"] += len(chunk)
+        chunk = chunk.dropna(subset=["Date"])
+        chunk = chunk[chunk["Date"] > last_date]
+        chunk = chunk.drop_duplicates(subset="Date", keep="first")
+        chunk = chunk[~chunk["Date"].isin(seen_dates)]
+        seen_dates.update(chunk["Date"])
+
+        if not chunk.empty:
+            pending.append(chunk)
+            pending_rows += len(chunk)
+        if pending_rows >= FLUSH_ROWS:
+            flush()
+    flush()
+
+    report["skipped"] = report["read"] - report["appended"]
+    if report["data_hash"] is None:
+        report["data_hash"] = backend.dataset_hash(dataset_id)
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Append a GEE export to a dataset.")
+    parser.add_argument("dataset_id", help="Target dataset id, e.g. 1")
+    parser.add_argument("export", help="Path to the exported CSV")
+    parser.add_argument("--schema", choices=sorted(SCHEMAS), default=None)
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE)
+    args = parser.parse_args(argv)
+
+    report = ingest_export(args.dataset_id, args.export, schema=args.schema, chunksize=args.chunksize)
+    print(
+        f"✔ Dataset {report['dataset_id']}: read {report['read']} rows, "
+        f"appended {report['appended']}, skipped {report['skipped']}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,165 @@
+import os
+import time
+import uuid
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import backend
+import model_registry
+import tracing
+
+# -------------------------------------------------------------------
+# BACKGROUND TRAINING JOBS
+# -------------------------------------------------------------------
+# Model fits run in a small process pool so Flask threads never block on
+# GridSearchCV. Jobs are de-duplicated per registry key (dataset id + data
+# hash + config hash): a second request for the same fit gets the job that
+# is already in flight instead of starting another one.
+
+# Each fit already uses every core (n_jobs=-1), so keep the pool small.
+MAX_TRAIN_WORKERS = int(os.environ.get("NEREUS_TRAIN_WORKERS", "1"))
+
+# How many finished jobs to remember for polling
+MAX_JOB_HISTORY = 256
+
+_EXECUTOR: ProcessPoolExecutor | None = None
+_JOBS: dict[str, dict] = {}
+_INFLIGHT: dict[str, str] = {}  # registry key -> job id
+_LOCK = threading.Lock()
+
+
+def _executor() -> ProcessPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        # spawn: forking a multi-threaded server process is not safe
+        _EXECUTOR = ProcessPoolExecutor(
+            max_workers=MAX_TRAIN_WORKERS,
+            mp_context=mp.get_context("spawn"),
+        )
+    return _EXECUTOR
+
+
+def _run_training(dataset_id: str, force: bool) -> tuple:
+    """
+    Runs inside a worker process. The fit is persisted by the registry.
+    Returns (metrics, stages timed in the worker).
+    """
+    with tracing.capture() as trace:
+        metrics = backend.train_and_evaluate_model(dataset_id, force=force)
+    return metrics, trace.stages
+
+
+def _public(job: dict) -> dict:
+    return {k: v for k, v in job.items() if not k.startswith("_")}
+
+
+def _trim_history() -> None:
+    finished = [j for j in _JOBS.values() if j["status"] in ("done", "failed")]
+    excess = len(finished) - MAX_JOB_HISTORY
+    if excess > 0:
+        finished.sort(key=lambda j: j["finished_at"])
+        for job in finished[:excess]:
+            _JOBS.pop(job["id"], None)
+
+
+def _on_done(job_id: str, future) -> None:
+    exc = future.exception()
+    result, stages = future.result() if exc is None else (None, [])
+    with _LOCK:
+        job = _JOBS.get(job_id)
+    if job is None:
+        return
+
+    if exc is None:
+        # Pick up the estimators the worker process just persisted before
+        # the job reads as done: a client that sees "done" asks for the
+        # model next and must not queue another fit. Unpickling is slow,
+        # so it happens outside _LOCK (pollers keep getting "running").
+        model_registry.load_entry(job["dataset_id"])
+
+    with _LOCK:
+        if exc is None:
+            job["status"] = "done"
+            job["result"] = result
+        else:
+            job["status"] = "failed"
+            job["error"] = f"{type(exc).__name__}: {exc}"
+        _INFLIGHT.pop(job["key"], None)
+        job["finished_at"] = time.time()
+        job.pop("_future", None)
+        _trim_history()
+
+    tracing.inc("nereus_training_jobs_total", status=job["status"])
+    tracing.observe("nereus_training_job_seconds", job["finished_at"] - job["submitted_at"])
+    tracing.replay(stages)
+
+
+def _job_counts() -> dict:
+    with _LOCK:
+        counts = {"queued": 0, "running": 0}
+        for job in _JOBS.values():
+            future = job.get("_future")
+            if future is not None:
+                counts["running" if future.running() else "queued"] += 1
+        return counts
+
+
+tracing.expose_gauge("nereus_training_jobs", "status", _job_counts,
+                     "Training jobs waiting for or running in the worker pool")
+tracing.describe("nereus_training_jobs_total", "counter", "Finished training jobs by status")
+tracing.describe("nereus_training_job_seconds", "histogram",
+                 "Training job time from submission to completion (queue + fit)")
+
+
+def submit_training(dataset_id: str, force: bool = False) -> dict:
+    """
+    Queue a model fit for dataset_id and return the job dict. If an
+    identical fit is already queued or running, that job is returned.
+    """
+    dataset_id = str(dataset_id)
+    key = backend.model_cache_key(dataset_id)
+
+    with _LOCK:
+        job_id = _INFLIGHT.get(key)
+        if job_id is not None:
+            return _public(_JOBS[job_id])
+
+        job_id = uuid.uuid4().hex
+        job = {
+            "id": job_id,
+            "dataset_id": dataset_id,
+            "key": key,
+            "status": "queued",
+            "submitted_at": time.time(),
+            "finished_at": None,
+            "result": None,
+            "error": None,
+        }
+        _JOBS[job_id] = job
+        _INFLIGHT[key] = job_id
+
+        future = _executor().submit(_run_training, dataset_id, force)
+        job["_future"] = future
+
+    future.add_done_callback(lambda f: _on_done(job_id, f))
+    return get_job(job_id)
+
+
+def get_job(job_id: str) -> dict | None:
+    """Current state of a job, or None if unknown / expired."""
+    with _LOCK:
+        job = _JOBS.get(job_id)
+        if job is None:
+            return None
+        future = job.get("_future")
+        if job["status"] == "queued" and future is not None and future.running():
+            job["status"] = "running"
+        return _public(job)
+
+
+def shutdown(wait: bool = True) -> None:
+    global _EXECUTOR
+    if _EXECUTOR is not None:
+        _EXECUTOR.shutdown(wait=wait, cancel_futures=not wait)
+        _EXECUTOR = None
@@ -0,0 +1,215 @@
+import os
+import json
+import asyncio
+import time
+import hashlib
+import logging
+import threading
+from typing import AsyncIterator, Callable, Iterator
+
+import disk_lru
+import tracing
+
+# -------------------------------------------------------------------
+# LLM RESPONSE CACHE + REQUEST COALESCING
+# -------------------------------------------------------------------
+# Analyses are cached on disk by a content hash of (provider, model, full
+# prompt); the prompt embeds the dataset context, so new data means a new
+# key. Entries expire after TTL seconds and the oldest-used entries are
+# evicted beyond MAX_ENTRIES.
+#
+# Concurrent requests for the same key share one upstream call: the first
+# request starts a background "flight" that reads the upstream stream, and
+# every request (including the first) replays the flight's chunks as they
+# arrive. A client disconnecting therefore never cancels the call for the
+# others, and the finished text is written to the cache. astream() is the
+# asyncio flavour: waiting for the next chunk holds no thread.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = os.environ.get(
+    "NEREUS_LLM_CACHE_DIR", os.path.join(BASE_DIR, "artifacts", "llm")
+)
+TTL_SECONDS = float(os.environ.get("NEREUS_LLM_CACHE_TTL", str(24 * 3600)))
+MAX_ENTRIES = int(os.environ.get("NEREUS_LLM_CACHE_SIZE", "256"))
+
+STATS = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+tracing.expose_counters("nereus_llm_cache_total", "result", STATS,
+                        "LLM response cache lookups by result")
+
+log = logging.getLogger(__name__)
+
+_LOCK = threading.Lock()
+_FLIGHTS: dict[str, "_Flight"] = {}
+
+
+def cache_key(*parts: str) -> str:
+    blob = json.dumps(parts).encode()
+    return hashlib.sha256(blob).hexdigest()
+
+
+def _path(key: str) -> str:
+    return os.path.join(CACHE_DIR, f"{key}.json")
+
+
+def get(key: str) -> str | None:
+    """Cached text for key, or None if missing / expired."""
+    path = _path(key)
+    try:
+        with open(path) as f:
+            entry = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if time.time() - entry["created"] > TTL_SECONDS:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        return None
+    os.utime(path)  # mtime = last use, for eviction
+    return entry["text"]
+
+
+def put(key: str, text: str) -> None:
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = _path(key)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"created": time.time(), "text": text}, f)
+    os.replace(tmp, path)
+    _evict()
+
+
+def _evict() -> None:
+    disk_lru.prune(CACHE_DIR, "*.json", MAX_ENTRIES)
+
+
+class _Flight:
+    """One in-progress upstream call whose chunks any number of readers replay."""
+
+    def __init__(self):
+        self.chunks: list[str] = []
+        self.done = False
+        self.error: str | None = None
+        self.cond = threading.Condition()
+        self.waiters: list[tuple] = []  # (loop, future) of astream readers
+
+    def _notify(self) -> None:
+        """Wake every reader; call with self.cond held."""
+        self.cond.notify_all()
+        for loop, fut in self.waiters:
+            loop.call_soon_threadsafe(_resolve, fut)
+        self.waiters.clear()
+
+    def run(self, key: str, upstream: Callable[[], Iterator[str]]) -> None:
+        try:
+            for chunk in upstream():
+                with self.cond:
+                    self.chunks.append(chunk)
+                    self._notify()
+        except Exception as exc:
+            with self.cond:
+                self.error = f"{type(exc).__name__}: {exc}"
+            with _LOCK:
+                STATS["errors"] += 1
+        else:
+            # The answer is complete: failing to cache it must not fail the
+            # readers of this flight
+            try:
+                put(key, "".join(self.chunks))
+            except Exception:
+                log.exception("Could not write LLM cache entry %s", key)
+        finally:
+            with _LOCK:
+                _FLIGHTS.pop(key, None)
+            with self.cond:
+                self.done = True
+                self._notify()
+
+    def follow(self) -> Iterator[str]:
+        i = 0
+        while True:
+            with self.cond:
+                while i >= len(self.chunks) and not self.done:
+                    self.cond.wait()
+                new = self.chunks[i:]
+                finished = self.done
+                error = self.error
+            i += len(new)
+            yield from new
+            if finished:
+                if error:
+                    raise RuntimeError(error)
+                return
+
+    async def afollow(self) -> AsyncIterator[str]:
+        loop = asyncio.get_running_loop()
+        i = 0
+        while True:
+            with self.cond:
+                waiter = None
+                if i >= len(self.chunks) and not self.done:
+                    waiter = loop.create_future()
+                    self.waiters.append((loop, waiter))
+                new = self.chunks[i:]
+                finished = self.done
+                error = self.error
+            if waiter is not None:
+                await waiter
+                continue
+            i += len(new)
+            for chunk in new:
+                yield chunk
+            if finished:
+                if error:
+                    raise RuntimeError(error)
+                return
+
+
+def _resolve(fut: asyncio.Future) -> None:
+    if not fut.done():
+        fut.set_result(None)
+
+
+def _text_or_flight(key: str, upstream: Callable[[], Iterator[str]]) -> "str | _Flight":
+    text = get(key)
+    if text is not None:
+        with _LOCK:
+            STATS["hits"] += 1
+        return text
+
+    with _LOCK:
+        flight = _FLIGHTS.get(key)
+        if flight is None:
+            # A flight may have finished between get() and taking the lock
+            text = get(key)
+            if text is not None:
+                STATS["hits"] += 1
+                return text
+        if flight is not None:
+            STATS["coalesced"] += 1
+        else:
+            STATS["misses"] += 1
+            flight = _FLIGHTS[key] = _Flight()
+            threading.Thread(target=flight.run, args=(key, upstream), daemon=True).start()
+    return flight
+
+
+def stream(key: str, upstream: Callable[[], Iterator[str]]) -> Iterator[str]:
+    """
+    Chunks for key: the cached text if present, else the (possibly shared)
+    in-flight upstream call.
+    """
+    found = _text_or_flight(key, upstream)
+    if isinstance(found, str):
+        return iter([found])
+    return found.follow()
+
+
+async def astream(key: str, upstream: Callable[[], Iterator[str]]) -> AsyncIterator[str]:
+    """stream() for asyncio callers."""
+    found = await asyncio.to_thread(_text_or_flight, key, upstream)
+    if isinstance(found, str):
+        yield found
+        return
+    async for chunk in found.afollow():
+        yield chunk
@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+import httpx
+import numpy as np
+
+# -------------------------------------------------------------------
+# LOAD TEST: FLASK (server.py) VS ASGI (asgi_server.py)
+# -------------------------------------------------------------------
+# Simulates N concurrent dashboard sessions against one or more running
+# servers and reports throughput and latency per request type:
+#
+#   plot      GET /api/plot/<kind>, revalidated with If-None-Match
+#   summary   GET /api/summary
+#   analyze   POST /api/analyze?stream=1, read to the end (long-lived)
+#
+#   python loadtest.py --spawn                      # starts both servers
+#   python loadtest.py --target flask=http://127.0.0.1:8040 \
+#                      --target asgi=http://127.0.0.1:8041
+#
+# --spawn runs each server in a subprocess with the fake LLM provider and a
+# zero cache TTL, so analyses stream for real (coalesced) on every request.
+# The load generator is itself CPU-hungry: on small machines give the
+# servers their own cores (or run loadtest.py from another host).
+
+PLOT_KINDS = [
+    "correlation", "ndci", "turbidity", "shrinkage",
+    "violin/ndci", "violin/turbidity", "violin/shrinkage",
+    "box/ndci", "box/turbidity", "box/shrinkage",
+]
+MIX = {"plot": 0.7, "summary": 0.1, "analyze": 0.2}
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+# Flask as deployed (gunicorn, one worker, a fixed thread pool) vs one
+# uvicorn process. Both are single processes, so the comparison is per core.
+SPAWN_COMMANDS = {
+    "flask": [sys.executable, "-m", "gunicorn", "-w", "1", "--threads", "{threads}",
+              "-b", "127.0.0.1:{port}", "--log-level", "warning", "server:app"],
+    "asgi": [sys.executable, "-m", "uvicorn", "asgi_server:app",
+             "--host", "127.0.0.1", "--port", "{port}", "--log-level", "warning"],
+}
+
+
+async def _session(client: httpx.AsyncClient, dataset_id: str, deadline: float, samples: dict) -> None:
+    etags: dict[str, str] = {}
+    rng = random.Random()
+    while time.perf_counter() < deadline:
+        scenario = rng.choices(list(MIX), weights=list(MIX.values()))[0]
+        start = time.perf_counter()
+        try:
+            if scenario == "plot":
+                kind = rng.choice(PLOT_KINDS)
+                headers = {"If-None-Match": etags[kind]} if kind in etags else {}
+                resp = await client.get(f"/api/plot/{kind}", params={"id": dataset_id}, headers=headers)
+                if "etag" in resp.headers:
+                    etags[kind] = resp.headers["etag"]
+                ok = resp.status_code in (200, 304)
+            elif scenario == "summary":
+                resp = await client.get("/api/summary", params={"id": dataset_id})
+                ok = resp.status_code == 200
+            else:
+                async with client.stream("POST", "/api/analyze", params={"stream": "1"}, json={"id": dataset_id}) as resp:
+                    body = b"".join([chunk async for chunk in resp.aiter_bytes()])
+                ok = resp.status_code == 200 and b"event: done" in body
+        except httpx.HTTPError:
+            ok = False
+        samples[scenario].append((time.perf_counter() - start, ok))
+
+
+async def run_target(base_url: str, concurrency: int, duration: float, dataset_id: str) -> dict:
+    samples = {name: [] for name in MIX}
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        # Warm the caches so the test measures serving, not first renders
+        for kind in PLOT_KINDS:
+            await client.get(f"/api/plot/{kind}", params={"id": dataset_id})
+
+        start = time.perf_counter()
+        deadline = start + duration
+        await asyncio.gather(*[_session(client, dataset_id, deadline, samples) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - start
+
+    report = {"url": base_url, "concurrency": concurrency, "seconds": round(elapsed, 2), "requests": {}}
+    total = 0
+    for name, rows in samples.items():
+        if not rows:
+            continue
+        lat = np.array([r[0] for r in rows]) * 1000
+        total += len(rows)
+        report["requests"][name] = {
+            "count": len(rows),
+            "errors": sum(1 for r in rows if not r[1]),
+            "p50_ms": round(float(np.percentile(lat, 50)), 1),
+            "p95_ms": round(float(np.percentile(lat, 95)), 1),
+            "p99_ms": round(float(np.percentile(lat, 99)), 1),
+            "max_ms": round(float(lat.max()), 1),
+        }
+    report["throughput_rps"] = round(total / elapsed, 1)
+    return report
+
+
+def _spawn(name: str, port: int, threads: int, env: dict) -> subprocess.Popen:
+    cmd = [part.format(port=port, threads=threads) for part in SPAWN_COMMANDS[name]]
+    return subprocess.Popen(cmd, cwd=BASE_DIR, env=env, stdout=subprocess.DEVNULL)
+
+
+def _wait_ready(base_url: str, timeout: float = 60) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/api/datasets", timeout=5).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"Server at {base_url} did not come up")
+
+
+def print_report(name: str, report: dict) -> None:
+    print(f"\n{name}  {report['url']}  concurrency={report['concurrency']}  "
+          f"{report['throughput_rps']} req/s over {report['seconds']}s")
+    print(f"  {'request':<10}{'count':>8}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for req, row in report["requests"].items():
+        print(f"  {req:<10}{row['count']:>8}{row['errors']:>8}{row['p50_ms']:>10}"
+              f"{row['p95_ms']:>10}{row['p99_ms']:>10}{row['max_ms']:>10}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Load-test the Flask and ASGI servers")
+    parser.add_argument("--target", action="append", default=[], metavar="NAME=URL",
+                        help="Server to test (repeatable)")
+    parser.add_argument("--spawn", action="store_true",
+                        help="Start the Flask and ASGI servers locally and test both")
+    parser.add_argument("--port", type=int, default=8140, help="First port used by --spawn")
+    parser.add_argument("--flask-threads", type=int, default=16,
+                        help="gunicorn --threads for the spawned Flask server")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument("--dataset", default="1")
+    parser.add_argument("--json", help="Also write the reports to this file")
+    args = parser.parse_args(argv)
+
+    targets = dict(t.split("=", 1) for t in args.target)
+    procs = []
+    if args.spawn:
+        env = dict(
+            os.environ,
+            NEREUS_LLM_PROVIDER="fake",
+            NEREUS_LLM_CACHE_TTL="0",
+            NEREUS_LLM_CACHE_DIR=tempfile.mkdtemp(prefix="nereus-llm-"),
+        )
+        for i, name in enumerate(SPAWN_COMMANDS):
+            port = args.port + i
+            procs.append(_spawn(name, port, args.flask_threads, env))
+            targets[name] = f"http://127.0.0.1:{port}"
+    if not targets:
+        parser.error("give at least one --target or use --spawn")
+
+    reports = {}
+    try:
+        for name, url in targets.items():
+            _wait_ready(url)
+            reports[name] = asyncio.run(run_target(url, args.concurrency, args.duration, args.dataset))
+            print_report(name, reports[name])
+    finally:
+        for proc in procs:
+            proc.terminate()
+            proc.wait()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
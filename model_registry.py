@@ -0,0 +1,165 @@
+import os
+import json
+import time
+import hashlib
+import threading
+
+import joblib
+
+# -------------------------------------------------------------------
+# PERSISTENT MODEL REGISTRY
+# -------------------------------------------------------------------
+# One entry per dataset, keyed by (dataset id, CSV content hash,
+# hyperparameter config hash). Each entry is a dict holding the fitted
+# RF / GB estimators, the chosen params and the metrics, and is written
+# to <MODELS_DIR>/<dataset_id>.joblib so it survives restarts.
+#
+# Entries are loaded from disk on first lookup (unpickling the estimators
+# imports sklearn, which server startup should not pay for);
+# load_registry() loads them all up front. A lookup that misses re-reads
+# the file if it changed since it was last read, e.g. because another
+# server process (or a training worker) fitted the model meanwhile.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MODELS_DIR = os.environ.get(
+    "NEREUS_MODELS_DIR", os.path.join(BASE_DIR, "artifacts", "models")
+)
+
+_REGISTRY: dict[str, dict] = {}
+_LOCK = threading.Lock()
+# dataset id -> (mtime_ns, size) of the file when last read, None if missing
+_LOADED: dict[str, tuple | None] = {}
+
+
+def config_hash(config: dict) -> str:
+    """Stable hash of a JSON-serialisable config dict."""
+    blob = json.dumps(config, sort_keys=True, default=str).encode()
+    return hashlib.sha256(blob).hexdigest()
+
+
+def registry_key(dataset_id: str, data_hash: str, cfg_hash: str) -> str:
+    return f"{dataset_id}:{data_hash[:16]}:{cfg_hash[:16]}"
+
+
+def _entry_path(dataset_id: str) -> str:
+    return os.path.join(MODELS_DIR, f"{dataset_id}.joblib")
+
+
+def _file_stamp(dataset_id: str) -> tuple | None:
+    try:
+        st = os.stat(_entry_path(dataset_id))
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def load_entry(dataset_id: str) -> dict | None:
+    """(Re)load one dataset's entry from disk, e.g. after a worker process fit it."""
+    dataset_id = str(dataset_id)
+    stamp = _file_stamp(dataset_id)
+    try:
+        entry = joblib.load(_entry_path(dataset_id))
+    except Exception:
+        # Missing / corrupt / incompatible pickle: it will be retrained.
+        with _LOCK:
+            _LOADED[dataset_id] = stamp
+        return None
+    with _LOCK:
+        _REGISTRY[dataset_id] = entry
+        _LOADED[dataset_id] = stamp
+    return entry
+
+
+def load_registry() -> int:
+    """Load every persisted entry from MODELS_DIR. Returns the count loaded."""
+    if not os.path.isdir(MODELS_DIR):
+        return 0
+
+    loaded = 0
+    for name in sorted(os.listdir(MODELS_DIR)):
+        if not name.endswith(".joblib"):
+            continue
+        if load_entry(name[: -len(".joblib")]) is not None:
+            loaded += 1
+    return loaded
+
+
+def get_model(dataset_id: str, data_hash: str, cfg_hash: str) -> dict | None:
+    """Return the registry entry if it matches the current data and config."""
+    dataset_id = str(dataset_id)
+    key = registry_key(dataset_id, data_hash, cfg_hash)
+    with _LOCK:
+        entry = _REGISTRY.get(dataset_id)
+        loaded = dataset_id in _LOADED
+        last_stamp = _LOADED.get(dataset_id)
+    if entry is not None and entry["key"] == key:
+        return entry
+    # Miss: only touch the disk when the file is new or changed
+    if not loaded or _file_stamp(dataset_id) != last_stamp:
+        entry = load_entry(dataset_id)
+    if entry is None or entry["key"] != key:
+        return None
+    return entry
+
+
+def save_model(
+    dataset_id: str,
+    data_hash: str,
+    cfg_hash: str,
+    rf_model,
+    gb_model,
+    params: dict,
+    metrics: dict,
+    **extra,
+) -> dict:
+    """
+    Store a freshly fitted model in memory and on disk (atomic replace).
+    Extra keyword arguments (e.g. forecast=...) are stored in the entry.
+    """
+    dataset_id = str(dataset_id)
+    entry = {
+        "key": registry_key(dataset_id, data_hash, cfg_hash),
+        "dataset_id": dataset_id,
+        "data_hash": data_hash,
+        "config_hash": cfg_hash,
+        "rf_model": rf_model,
+        "gb_model": gb_model,
+        "params": params,
+        "metrics": metrics,
+        "trained_at": time.time(),
+        **extra,
+    }
+    _persist(entry)
+    return entry
+
+
+def update_entry(entry: dict, **fields) -> dict:
+    """Add / replace fields of an existing entry and persist it."""
+    entry = dict(entry, **fields)
+    _persist(entry)
+    return entry
+
+
+def _persist(entry: dict) -> None:
+    os.makedirs(MODELS_DIR, exist_ok=True)
+    path = _entry_path(entry["dataset_id"])
+    tmp = f"{path}.{os.getpid()}.tmp"
+    joblib.dump(entry, tmp)
+    os.replace(tmp, path)
+
+    stamp = _file_stamp(entry["dataset_id"])
+    with _LOCK:
+        _REGISTRY[entry["dataset_id"]] = entry
+        _LOADED[entry["dataset_id"]] = stamp
+
+
+def clear_registry(dataset_id: str | None = None) -> None:
+    """Drop cached entries (and their files). Mostly for maintenance."""
+    with _LOCK:
+        ids = [str(dataset_id)] if dataset_id is not None else list(_REGISTRY)
+        for ds_id in ids:
+            _REGISTRY.pop(ds_id, None)
+            try:
+                os.remove(_entry_path(ds_id))
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,181 @@
+import os
+import io
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+import backend
+import disk_lru
+import renderer
+import tracing
+
+# -------------------------------------------------------------------
+# RENDERED PLOT CACHE
+# -------------------------------------------------------------------
+# PNG bytes are cached in a bounded in-memory LRU and on disk, keyed by
+# (plot kind, dataset id, data hash, render params). The key hash doubles
+# as a strong ETag: the same key always renders the same image, so a
+# matching If-None-Match can be answered without touching matplotlib.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PLOTS_DIR = os.environ.get(
+    "NEREUS_PLOTS_DIR", os.path.join(BASE_DIR, "artifacts", "plots")
+)
+
+MAX_MEMORY_ENTRIES = int(os.environ.get("NEREUS_PLOT_CACHE_SIZE", "64"))
+MAX_DISK_ENTRIES = int(os.environ.get("NEREUS_PLOT_DISK_SIZE", "512"))
+
+_MEMORY: "OrderedDict[str, dict]" = OrderedDict()
+_LOCK = threading.Lock()
+_RENDER_LOCKS: dict[str, threading.Lock] = {}
+
+STATS = {"memory_hits": 0, "disk_hits": 0, "renders": 0}
+tracing.expose_counters("nereus_plot_cache_total", "result", STATS,
+                        "Plot cache lookups by result (renders are misses)")
+
+
+def _data_state(kind: str, dataset_id: str) -> str:
+    # The accuracy chart depends on the trained model, not just the CSV
+    if kind == "model_accuracy":
+        return backend.model_cache_key(dataset_id)
+    return backend.dataset_hash(dataset_id)
+
+
+def plot_etag(kind: str, dataset_id: str) -> str:
+    """Strong ETag for the current rendering of (kind, dataset_id)."""
+    if kind not in backend.PLOT_FUNCTIONS:
+        raise ValueError(f"Unknown plot kind: {kind}")
+    dataset_id = str(dataset_id)
+    key = {
+        "kind": kind,
+        "dataset_id": dataset_id,
+        "data": _data_state(kind, dataset_id),
+        "render": backend.PLOT_RENDER_PARAMS,
+    }
+    blob = json.dumps(key, sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:32]
+
+
+def _disk_path(etag: str) -> str:
+    return os.path.join(PLOTS_DIR, f"{etag}.png")
+
+
+def _remember(etag: str, entry: dict) -> None:
+    with _LOCK:
+        _MEMORY[etag] = entry
+        _MEMORY.move_to_end(etag)
+        while len(_MEMORY) > MAX_MEMORY_ENTRIES:
+            _MEMORY.popitem(last=False)
+
+
+def _prune_disk() -> None:
+    disk_lru.prune(PLOTS_DIR, "*.png", MAX_DISK_ENTRIES)
+
+
+def _lookup(etag: str) -> dict | None:
+    with _LOCK:
+        entry = _MEMORY.get(etag)
+        if entry is not None:
+            _MEMORY.move_to_end(etag)
+            STATS["memory_hits"] += 1
+            return entry
+
+    path = _disk_path(etag)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        mtime = os.path.getmtime(path)
+    except FileNotFoundError:
+        return None
+
+    entry = {"etag": etag, "data": data, "last_modified": mtime}
+    _remember(etag, entry)
+    with _LOCK:
+        STATS["disk_hits"] += 1
+    return entry
+
+
+def _store(etag: str, data: bytes) -> dict:
+    os.makedirs(PLOTS_DIR, exist_ok=True)
+    path = _disk_path(etag)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    _prune_disk()
+
+    entry = {"etag": etag, "data": data, "last_modified": time.time()}
+    _remember(etag, entry)
+    with _LOCK:
+        STATS["renders"] += 1
+    return entry
+
+
+def is_cached(kind: str, dataset_id: str) -> bool:
+    """True if the current rendering of (kind, dataset_id) is in memory or on disk."""
+    etag = plot_etag(kind, dataset_id)
+    with _LOCK:
+        if etag in _MEMORY:
+            return True
+    return os.path.exists(_disk_path(etag))
+
+
+def get_plot(kind: str, dataset_id: str, force: bool = False) -> dict:
+    """
+    Return {"etag", "data", "last_modified"} for a plot, rendering it only
+    if neither the memory LRU nor the disk cache has it (or force=True).
+    """
+    dataset_id = str(dataset_id)
+    etag = plot_etag(kind, dataset_id)
+
+    entry = None if force else _lookup(etag)
+    if entry is not None:
+        return entry
+
+    with _LOCK:
+        render_lock = _RENDER_LOCKS.setdefault(etag, threading.Lock())
+
+    with render_lock:
+        # Someone else may have rendered it while we waited
+        entry = None if force else _lookup(etag)
+        if entry is None:
+            entry = _store(etag, renderer.render(kind, dataset_id))
+
+    with _LOCK:
+        _RENDER_LOCKS.pop(etag, None)
+    return entry
+
+
+def get_plots(dataset_id: str, kinds: list[str] | None = None) -> dict[str, dict]:
+    """
+    Batch version of get_plot: every cache miss for the dataset is rendered
+    concurrently in one renderer.render_many call.
+    """
+    dataset_id = str(dataset_id)
+    kinds = list(backend.PLOT_FUNCTIONS) if kinds is None else list(kinds)
+
+    etags = {kind: plot_etag(kind, dataset_id) for kind in kinds}
+    entries = {kind: _lookup(etag) for kind, etag in etags.items()}
+
+    missing = [kind for kind, entry in entries.items() if entry is None]
+    if missing:
+        rendered = renderer.render_many(dataset_id, missing)
+        for kind in missing:
+            entries[kind] = _store(etags[kind], rendered[kind])
+    return entries
+
+
+def get_plot_bytes(kind: str, dataset_id: str) -> io.BytesIO:
+    """Same as get_plot, but shaped like the backend.plot_* return value."""
+    return io.BytesIO(get_plot(kind, dataset_id)["data"])
+
+
+def clear_cache(disk: bool = False) -> None:
+    with _LOCK:
+        _MEMORY.clear()
+    if disk and os.path.isdir(PLOTS_DIR):
+        for name in os.listdir(PLOTS_DIR):
+            if name.endswith(".png"):
+                os.remove(os.path.join(PLOTS_DIR, name))
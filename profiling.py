@@ -0,0 +1,264 @@
+import os
+import re
+import sys
+import json
+import time
+import uuid
+import hmac
+import pstats
+import cProfile
+import threading
+import contextvars
+from collections import Counter
+from urllib.parse import parse_qsl, urlencode
+
+import disk_lru
+
+# -------------------------------------------------------------------
+# PER-REQUEST PROFILING (OPT-IN)
+# -------------------------------------------------------------------
+# A request carrying an allow-listed token, as "X-Profile: <token>" or
+# "?profile=<token>", runs its handler under cProfile plus a stack sampler
+# and the result is stored on disk:
+#
+#   <id>.pstats      cProfile data (python -m pstats, snakeviz, ...)
+#   <id>.collapsed   sampled stacks, one "frame;frame;frame count" per line
+#                    (flamegraph.pl, speedscope, inferno)
+#   <id>.json        route, status, duration and the top functions
+#
+# The response carries X-Profile-Id; /api/profiles/<id> returns the files
+# (same token required). Only the last MAX_PROFILES profiles are kept, and
+# one request is profiled at a time; others run normally.
+#
+#   NEREUS_PROFILE_TOKENS=tok1,tok2   allow-list; profiling is off when empty
+#
+# The handler's own threads are profiled (for the ASGI server, the work it
+# offloads too). Plot renders in the renderer process pool only show up as
+# the wait for the result; set NEREUS_RENDER_WORKERS=0 to see inside them.
+# Streamed response bodies are produced after the profile is saved.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+PROFILES_DIR = os.environ.get(
+    "NEREUS_PROFILES_DIR", os.path.join(BASE_DIR, "artifacts", "profiles")
+)
+MAX_PROFILES = int(os.environ.get("NEREUS_PROFILES_SIZE", "50"))
+SAMPLE_INTERVAL = float(os.environ.get("NEREUS_PROFILE_INTERVAL_MS", "5")) / 1000
+TOKENS = [t.strip() for t in os.environ.get("NEREUS_PROFILE_TOKENS", "").split(",") if t.strip()]
+
+PROFILE_HEADER = "X-Profile"
+PROFILE_QUERY = "profile"
+TOP_FUNCTIONS = 25
+
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_ACTIVE = threading.Lock()  # held by the one request being profiled
+_CURRENT: contextvars.ContextVar = contextvars.ContextVar("nereus_profile", default=None)
+
+
+def enabled() -> bool:
+    return bool(TOKENS)
+
+
+def allowed(token: str | None) -> bool:
+    """True if token is on the allow-list (constant-time compare)."""
+    if not token:
+        return False
+    return any(hmac.compare_digest(token.encode(), t.encode()) for t in TOKENS)
+
+
+def strip_token(path: str) -> str:
+    """path?query without the PROFILE_QUERY parameter (the token is a secret)."""
+    path, sep, query = path.partition("?")
+    pairs = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if k != PROFILE_QUERY]
+    return f"{path}?{urlencode(pairs)}" if pairs else path
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class _Sampler:
+    """Samples one thread's Python stack every SAMPLE_INTERVAL seconds."""
+
+    def __init__(self, thread_id: int, counts: Counter):
+        self.thread_id = thread_id
+        self.counts = counts
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True, name="nereus-profiler")
+
+    def _run(self) -> None:
+        while not self.stop.wait(SAMPLE_INTERVAL):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+        return False
+
+
+class ProfileSession:
+    """
+    One profiled request. Use it as a context manager around the code to
+    profile, possibly several times from different threads (one at a time);
+    then save().
+    """
+
+    def __init__(self, method: str, path: str, route: str):
+        self.id = uuid.uuid4().hex
+        self.meta = {"id": self.id, "method": method, "path": strip_token(path), "route": route,
+                     "started_at": time.time()}
+        self.profile = cProfile.Profile()
+        self.samples: Counter = Counter()
+        self._sampler = None
+        self._profiled = False
+        self._start = time.perf_counter()
+
+    def __enter__(self):
+        self._sampler = _Sampler(threading.get_ident(), self.samples).__enter__()
+        self._profiled = True
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.profile.disable()
+        self._sampler.__exit__()
+        return False
+
+    def call(self, fn, *args):
+        with self:
+            return fn(*args)
+
+    def _top(self, stats: pstats.Stats) -> list[dict]:
+        rows = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        return [
+            {
+                "function": f"{name} ({os.path.basename(path)}:{line})",
+                "calls": nc,
+                "tottime": round(tt, 6),
+                "cumtime": round(ct, 6),
+            }
+            for (path, line, name), (cc, nc, tt, ct, _callers) in rows[:TOP_FUNCTIONS]
+        ]
+
+    def save(self, status: int) -> str:
+        """Write the profile files and prune old ones; returns the id."""
+        os.makedirs(PROFILES_DIR, exist_ok=True)
+        stats = None
+        if self._profiled:  # nothing to dump if no work was profiled
+            stats = pstats.Stats(self.profile)
+            stats.dump_stats(_path(self.id, "pstats"))
+        with open(_path(self.id, "collapsed"), "w") as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+
+        self.meta.update(
+            status=int(status),
+            duration_ms=round((time.perf_counter() - self._start) * 1000, 1),
+            samples=sum(self.samples.values()),
+            sample_interval_ms=SAMPLE_INTERVAL * 1000,
+            top=self._top(stats) if stats is not None else [],
+        )
+        tmp = f"{_path(self.id, 'json')}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f, indent=2)
+        os.replace(tmp, _path(self.id, "json"))
+        _prune()
+        return self.id
+
+
+# ------------------ REQUEST LIFECYCLE ------------------ #
+
+def begin(token: str | None, method: str, path: str, route: str) -> ProfileSession | None:
+    """
+    A session if token is allowed and no other request is being profiled,
+    else None.
+    """
+    if not enabled() or not allowed(token):
+        return None
+    if not _ACTIVE.acquire(blocking=False):
+        return None
+    return ProfileSession(method, path, route)
+
+
+def activate(session: ProfileSession) -> contextvars.Token:
+    """Make session current() in this context (for code that offloads work)."""
+    return _CURRENT.set(session)
+
+
+def deactivate(token: contextvars.Token) -> None:
+    try:
+        _CURRENT.reset(token)
+    except ValueError:
+        # Called from a child task (streamed responses send from one)
+        _CURRENT.set(None)
+
+
+def current() -> ProfileSession | None:
+    return _CURRENT.get()
+
+
+def end(session: ProfileSession, status: int) -> str:
+    """Save the session and let the next request be profiled."""
+    try:
+        return session.save(status)
+    finally:
+        _ACTIVE.release()
+
+
+# ------------------ STORAGE ------------------ #
+
+def _path(profile_id: str, ext: str) -> str:
+    return os.path.join(PROFILES_DIR, f"{profile_id}.{ext}")
+
+
+def _prune() -> None:
+    # The .json is written last: it stands for the whole profile
+    for path in disk_lru.prune(PROFILES_DIR, "*.json", MAX_PROFILES):
+        profile_id = os.path.basename(path)[:-len(".json")]
+        for ext in ("pstats", "collapsed"):
+            try:
+                os.remove(_path(profile_id, ext))
+            except FileNotFoundError:
+                pass
+
+
+def profile_path(profile_id: str, ext: str) -> str | None:
+    """Path of a stored profile file, or None if unknown / pruned."""
+    if not _ID_RE.match(profile_id) or ext not in ("json", "pstats", "collapsed"):
+        return None
+    path = _path(profile_id, ext)
+    return path if os.path.exists(path) else None
+
+
+def get_profile(profile_id: str) -> dict | None:
+    path = profile_path(profile_id, "json")
+    if path is None:
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:  # pruned meanwhile
+        return None
+
+
+def list_profiles() -> list[dict]:
+    """Stored profiles, newest first (without the top-functions table)."""
+    try:
+        names = [n for n in os.listdir(PROFILES_DIR) if n.endswith(".json")]
+    except FileNotFoundError:
+        return []
+    out = []
+    for name in names:
+        meta = get_profile(name[:-len(".json")])
+        if meta is not None:
+            out.append({k: v for k, v in meta.items() if k != "top"})
+    return sorted(out, key=lambda m: m["started_at"], reverse=True)
@@ -0,0 +1,98 @@
+import os
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor
+
+import backend
+import model_registry
+import tracing
+
+# -------------------------------------------------------------------
+# PARALLEL PLOT RENDERING
+# -------------------------------------------------------------------
+# The backend.plot_* functions build Figure + Agg canvases (no pyplot), and
+# this module runs them in a process pool so the charts of one dashboard
+# render on separate cores. NEREUS_RENDER_WORKERS=0 renders in-process.
+
+RENDER_WORKERS = int(
+    os.environ.get("NEREUS_RENDER_WORKERS", str(min(4, os.cpu_count() or 1)))
+)
+
+_EXECUTOR: ProcessPoolExecutor | None = None
+_LOCK = threading.Lock()
+
+
+def _init_worker() -> None:
+    backend.apply_plot_theme()
+
+
+def _executor() -> ProcessPoolExecutor:
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ProcessPoolExecutor(
+                max_workers=RENDER_WORKERS,
+                mp_context=mp.get_context("spawn"),
+                initializer=_init_worker,
+            )
+        return _EXECUTOR
+
+
+def _render(kind: str, dataset_id: str) -> bytes:
+    if kind == "model_accuracy" and backend.peek_trained_model(dataset_id) is None:
+        # The model may have been trained after this worker started
+        model_registry.load_entry(dataset_id)
+    with tracing.stage("plot_render"):
+        return backend.PLOT_FUNCTIONS[kind](dataset_id).getvalue()
+
+
+def _render_traced(kind: str, dataset_id: str) -> tuple:
+    """Runs inside a worker process: (PNG bytes, stages timed there)."""
+    with tracing.capture() as trace:
+        data = _render(kind, dataset_id)
+    return data, trace.stages
+
+
+def _result(future) -> bytes:
+    data, stages = future.result()
+    tracing.replay(stages)
+    return data
+
+
+def render(kind: str, dataset_id: str) -> bytes:
+    """Render one plot to PNG bytes."""
+    if kind not in backend.PLOT_FUNCTIONS:
+        raise ValueError(f"Unknown plot kind: {kind}")
+    dataset_id = str(dataset_id)
+    with tracing.inflight("render"):
+        if RENDER_WORKERS <= 0:
+            return _render(kind, dataset_id)
+        return _result(_executor().submit(_render_traced, kind, dataset_id))
+
+
+def render_many(dataset_id: str, kinds: list[str] | None = None) -> dict[str, bytes]:
+    """
+    Render several plots for one dataset concurrently.
+    Defaults to all eleven charts in backend.PLOT_FUNCTIONS.
+    """
+    dataset_id = str(dataset_id)
+    kinds = list(backend.PLOT_FUNCTIONS) if kinds is None else list(kinds)
+    for kind in kinds:
+        if kind not in backend.PLOT_FUNCTIONS:
+            raise ValueError(f"Unknown plot kind: {kind}")
+
+    with tracing.inflight("render"):
+        if RENDER_WORKERS <= 0:
+            return {kind: _render(kind, dataset_id) for kind in kinds}
+
+        pool = _executor()
+        futures = {kind: pool.submit(_render_traced, kind, dataset_id) for kind in kinds}
+        return {kind: _result(fut) for kind, fut in futures.items()}
+
+
+def shutdown(wait: bool = True) -> None:
+    global _EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is not None:
+            _EXECUTOR.shutdown(wait=wait, cancel_futures=not wait)
+            _EXECUTOR = None
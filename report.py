@@ -0,0 +1,251 @@
+import os
+import io
+import re
+import json
+import time
+import hashlib
+import threading
+from xml.sax.saxutils import escape
+
+import pandas as pd
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import cm
+from reportlab.lib.utils import ImageReader
+from reportlab.platypus import (
+    Image, KeepTogether, PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle,
+)
+
+import backend
+import analysis
+import disk_lru
+import plot_cache
+import stats_index
+import tracing
+
+# -------------------------------------------------------------------
+# PDF REPORTS
+# -------------------------------------------------------------------
+# One report per dataset, assembled from what the server already has:
+# summary / correlation / yearly tables from the statistics index, the
+# cached plot PNGs (plot_cache; only missing ones are rendered), the
+# precomputed forecast and the cached LLM analysis. Nothing here trains a
+# model or calls the LLM; missing parts are noted in the report instead.
+#
+# Finished PDFs are cached on disk under a hash of every input (data hash,
+# plot ETags, model key, analysis text, REPORT_VERSION), so repeat exports
+# are a file send.
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+REPORTS_DIR = os.environ.get(
+    "NEREUS_REPORTS_DIR", os.path.join(BASE_DIR, "artifacts", "reports")
+)
+MAX_REPORTS = int(os.environ.get("NEREUS_REPORTS_SIZE", "64"))
+
+# Bump when the layout changes so cached reports are rebuilt
+REPORT_VERSION = 2
+FORECAST_STEP_DAYS = 30  # one forecast row per month in the table
+
+PLOT_CAPTIONS = {
+    "correlation": "Correlation matrix",
+    "ndci": "Chlorophyll (NDCI) trend",
+    "turbidity": "Turbidity trend",
+    "shrinkage": "Shrinkage trend",
+    "violin_ndci": "Chlorophyll distribution per year",
+    "violin_turbidity": "Turbidity distribution per year",
+    "violin_shrinkage": "Shrinkage distribution per year",
+    "box_ndci": "Chlorophyll overall distribution and outliers",
+    "box_turbidity": "Turbidity overall distribution and outliers",
+    "box_shrinkage": "Shrinkage overall distribution and outliers",
+    "model_accuracy": "Model accuracy",
+}
+
+_LOCK = threading.Lock()
+_BUILD_LOCKS: dict[str, threading.Lock] = {}
+
+
+def _plot_kinds(trained: bool) -> list[str]:
+    return [k for k in backend.PLOT_FUNCTIONS if trained or k != "model_accuracy"]
+
+
+def _inputs(dataset_id: str) -> dict:
+    """Everything the report content depends on (cheap: hashes and cached text)."""
+    trained = backend.peek_trained_model(dataset_id) is not None
+    text = analysis.cached_analysis(dataset_id)
+    return {
+        "version": REPORT_VERSION,
+        "dataset_id": dataset_id,
+        "data": backend.dataset_hash(dataset_id),
+        "plots": {k: plot_cache.plot_etag(k, dataset_id) for k in _plot_kinds(trained)},
+        "model": backend.model_cache_key(dataset_id) if trained else None,
+        "analysis": hashlib.sha256(text.encode()).hexdigest() if text else None,
+    }
+
+
+def report_key(dataset_id: str) -> str:
+    """Content hash of the report for the current state of dataset_id."""
+    blob = json.dumps(_inputs(str(dataset_id)), sort_keys=True).encode()
+    return hashlib.sha256(blob).hexdigest()[:32]
+
+
+def _report_path(key: str) -> str:
+    return os.path.join(REPORTS_DIR, f"{key}.pdf")
+
+
+def _prune() -> None:
+    disk_lru.prune(REPORTS_DIR, "*.pdf", MAX_REPORTS)
+
+
+def get_report(dataset_id: str) -> tuple[str, str]:
+    """
+    (path, key) of the PDF for dataset_id, building it only if no report
+    with the same content hash is cached. Concurrent exports share a build.
+    """
+    dataset_id = str(dataset_id)
+    key = report_key(dataset_id)
+    path = _report_path(key)
+    if os.path.exists(path):
+        os.utime(path)  # mtime = last use, for pruning
+        return path, key
+
+    with _LOCK:
+        build_lock = _BUILD_LOCKS.setdefault(key, threading.Lock())
+    with build_lock:
+        if not os.path.exists(path):
+            data = build_report(dataset_id)
+            os.makedirs(REPORTS_DIR, exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+            _prune()
+    with _LOCK:
+        _BUILD_LOCKS.pop(key, None)
+    return path, key
+
+
+# ------------------ LAYOUT ------------------ #
+
+_STYLES = getSampleStyleSheet()
+_TABLE_STYLE = TableStyle([
+    ("FONT", (0, 0), (-1, -1), "Helvetica", 8),
+    ("FONT", (0, 0), (-1, 0), "Helvetica-Bold", 8),
+    ("FONT", (0, 0), (0, -1), "Helvetica-Bold", 8),
+    ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#e8eef4")),
+    ("GRID", (0, 0), (-1, -1), 0.25, colors.grey),
+    ("ALIGN", (1, 1), (-1, -1), "RIGHT"),
+])
+
+
+def _table(frame, index_label: str = "") -> Table:
+    header = [index_label] + [str(c) for c in frame.columns]
+    rows = [[str(i)] + [f"{v:.3f}" if isinstance(v, float) else str(v) for v in row]
+            for i, row in zip(frame.index, frame.itertuples(index=False))]
+    table = Table([header] + rows, repeatRows=1, hAlign="LEFT")
+    table.setStyle(_TABLE_STYLE)
+    return table
+
+
+def _section(title: str) -> Paragraph:
+    return Paragraph(escape(title), _STYLES["Heading2"])
+
+
+def _note(text: str) -> Paragraph:
+    return Paragraph(escape(text), _STYLES["Italic"])
+
+
+def _figure(png: bytes, caption: str, width: float) -> KeepTogether:
+    img_w, img_h = ImageReader(io.BytesIO(png)).getSize()
+    return KeepTogether([
+        Image(io.BytesIO(png), width=width, height=width * img_h / img_w),
+        Paragraph(escape(caption), _STYLES["Italic"]),
+        Spacer(1, 0.4 * cm),
+    ])
+
+
+def _markdown_paragraphs(text: str) -> list:
+    """Just enough Markdown (headings, bullets, **bold**) for LLM output."""
+    out = []
+    for block in re.split(r"\n\s*\n", text.strip()):
+        for line in block.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            heading = re.match(r"^#+\s*(.*)", line)
+            body = escape(heading.group(1) if heading else line)
+            body = re.sub(r"\*\*(.+?)\*\*", r"<b>\1</b>", body)
+            if heading:
+                out.append(Paragraph(body, _STYLES["Heading3"]))
+            elif re.match(r"^[-*•]\s+", line):
+                out.append(Paragraph(re.sub(r"^[-*•]\s+", "", body), _STYLES["Normal"], bulletText="•"))
+            else:
+                out.append(Paragraph(body, _STYLES["Normal"]))
+        out.append(Spacer(1, 0.2 * cm))
+    return out
+
+
+@tracing.timed("pdf_build")
+def build_report(dataset_id: str) -> bytes:
+    """Lay out and render the PDF for dataset_id."""
+    dataset_id = str(dataset_id)
+    trained = backend.peek_trained_model(dataset_id) is not None
+    stats = backend.get_stats_index(dataset_id)
+    df = backend.load_dataset(dataset_id)
+    plots = plot_cache.get_plots(dataset_id, _plot_kinds(trained))
+
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(
+        buf, pagesize=A4,
+        leftMargin=2 * cm, rightMargin=2 * cm, topMargin=2 * cm, bottomMargin=2 * cm,
+        title=f"NEREUS report: {backend.dataset_label(dataset_id)}",
+    )
+    story = [
+        Paragraph(f"NEREUS Water-Quality Report: {escape(backend.dataset_label(dataset_id))}", _STYLES["Title"]),
+        Paragraph(
+            f"Dataset {escape(dataset_id)}: {stats['rows']} observations, "
+            f"{df['Date'].min():%Y-%m-%d} to {df['Date'].max():%Y-%m-%d}. "
+            f"Data hash {backend.dataset_hash(dataset_id)[:12]}; "
+            f"generated {time.strftime('%Y-%m-%d %H:%M UTC', time.gmtime())}.",
+            _STYLES["Normal"],
+        ),
+        Spacer(1, 0.5 * cm),
+    ]
+
+    story += [_section("Summary statistics"), _table(stats_index.describe_frame(stats).round(3))]
+    nulls = ", ".join(f"{col}: {n}" for col, n in stats_index.null_counts(stats).items())
+    story += [Spacer(1, 0.2 * cm), _note(f"Missing values: {nulls}"), Spacer(1, 0.4 * cm)]
+
+    story += [_section("Correlation matrix"), _table(stats_index.corr_frame(stats).round(3)),
+              Spacer(1, 0.4 * cm)]
+
+    if "Year" in stats["groups"]:
+        yearly = pd.DataFrame({
+            col: stats_index.group_frame(stats, "Year", col)["mean"]
+            for col in stats["summary_cols"]
+        })
+        story += [_section("Yearly means"), _table(yearly, "Year"), Spacer(1, 0.4 * cm)]
+
+    story += [_section("Forecast")]
+    if trained:
+        config = backend.model_config(dataset_id)
+        forecast = backend.get_forecast(dataset_id, config["forecast"]["horizon_days"])
+        rows = forecast.iloc[FORECAST_STEP_DAYS - 1::FORECAST_STEP_DAYS]
+        rows = rows.set_index(rows["Date"].dt.strftime("%Y-%m-%d"))
+        story += [_table(rows[["Horizon", "Chla_Value", "Turbidity_NTU", "Shrinkage_Percent"]], "Date")]
+    else:
+        story += [_note("The model for this dataset has not been trained yet; train it to include the forecast.")]
+
+    story += [PageBreak(), _section("Figures")]
+    for kind, entry in plots.items():
+        story.append(_figure(entry["data"], PLOT_CAPTIONS.get(kind, kind), doc.width))
+
+    story += [PageBreak(), _section("Analysis")]
+    text = analysis.cached_analysis(dataset_id)
+    if text:
+        story += _markdown_paragraphs(text)
+    else:
+        story += [_note("No analysis has been generated for the current data yet; run one from Ask NEREUS.")]
+
+    doc.build(story)
+    return buf.getvalue()
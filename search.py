@@ -0,0 +1,102 @@
+import math
+import itertools
+
+import numpy as np
+
+# -------------------------------------------------------------------
+# WARM-START SUCCESSIVE HALVING FOR THE RF STAGE
+# -------------------------------------------------------------------
+# Drop-in for the GridSearchCV call in backend._fit_stacked_model: same
+# fit() / best_estimator_ / best_params_ / best_score_ surface.
+#
+# n_estimators is treated as the resource. Every (max_depth,
+# min_samples_leaf) candidate gets one warm_start forest per fold; at each
+# rung the surviving forests grow to that many trees (only the new trees are
+# fitted), are scored on their fold, and the best 1/factor survive. The fold
+# splits are computed once and shared by all candidates and rungs.
+
+
+class WarmStartHalvingSearch:
+    def __init__(
+        self,
+        param_grid: dict,
+        cv,
+        rungs: list[int] | None = None,
+        factor: int = 3,
+        random_state: int = 42,
+        n_jobs: int = -1,
+    ):
+        self.param_grid = param_grid
+        self.cv = cv
+        self.rungs = rungs
+        self.factor = factor
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+
+    def _rungs(self) -> list[int]:
+        grid_trees = sorted(self.param_grid["rf__n_estimators"])
+        rungs = self.rungs or [max(1, grid_trees[0] // 4), grid_trees[0] // 2]
+        # The grid's own n_estimators values are always evaluated
+        return sorted(set(rungs) | set(grid_trees))
+
+    def fit(self, X, y):
+        from sklearn.ensemble import RandomForestRegressor
+        from sklearn.metrics import r2_score
+        from sklearn.pipeline import Pipeline
+
+        X_full, y_full = X, y
+        X = np.asarray(X)
+        y = np.asarray(y)
+        folds = list(self.cv.split(X, y))
+        grid_trees = set(self.param_grid["rf__n_estimators"])
+
+        other = {k: v for k, v in self.param_grid.items() if k != "rf__n_estimators"}
+        names = sorted(other)
+        candidates = [dict(zip(names, values)) for values in itertools.product(*(other[n] for n in names))]
+
+        forests = {
+            i: [
+                RandomForestRegressor(
+                    n_estimators=1,
+                    warm_start=True,
+                    random_state=self.random_state,
+                    n_jobs=self.n_jobs,
+                    **{k[len("rf__"):]: v for k, v in params.items()},
+                )
+                for _ in folds
+            ]
+            for i, params in enumerate(candidates)
+        }
+
+        alive = list(forests)
+        scores: dict[tuple, float] = {}  # (candidate, n_trees) -> mean fold r2
+        self.history_ = []
+        for rung in self._rungs():
+            rung_scores = {}
+            for i in alive:
+                fold_scores = []
+                for forest, (train_idx, val_idx) in zip(forests[i], folds):
+                    forest.set_params(n_estimators=rung)
+                    forest.fit(X[train_idx], y[train_idx])
+                    fold_scores.append(r2_score(y[val_idx], forest.predict(X[val_idx])))
+                rung_scores[i] = float(np.mean(fold_scores))
+                scores[(i, rung)] = rung_scores[i]
+            self.history_.append({"n_estimators": rung, "candidates": len(alive)})
+
+            keep = max(1, math.ceil(len(alive) / self.factor))
+            alive = sorted(alive, key=lambda i: rung_scores[i], reverse=True)[:keep]
+            forests = {i: forests[i] for i in alive}
+
+        # Best (candidate, n_estimators) among the grid's n_estimators values
+        best_i, best_trees = max(
+            ((i, t) for (i, t) in scores if t in grid_trees),
+            key=lambda k: scores[k],
+        )
+        self.best_params_ = dict(candidates[best_i], rf__n_estimators=best_trees)
+        self.best_score_ = scores[(best_i, best_trees)]
+
+        self.best_estimator_ = Pipeline(
+            [("rf", RandomForestRegressor(random_state=self.random_state, n_jobs=self.n_jobs))]
+        ).set_params(**self.best_params_)
+        self.best_estimator_.fit(X_full, y_full)
+        return self
@@ -0,0 +1,108 @@
+import os
+import time
+import sqlite3
+import threading
+
+# -------------------------------------------------------------------
+# PER-SESSION DATASET SELECTION
+# -------------------------------------------------------------------
+# /api/select used to mutate a module global, so users raced each other
+# and every gunicorn worker had its own "selected" dataset. Selections are
+# now stored per session id in a pluggable store:
+#
+#   NEREUS_SELECTION_STORE=memory                  (default, per process)
+#   NEREUS_SELECTION_STORE=sqlite:///path/to/db    (shared by all workers)
+#
+# NEREUS_DEFAULT_DATASET is used for sessions that never selected one.
+
+DEFAULT_DATASET = os.environ.get("NEREUS_DEFAULT_DATASET", "1")
+SELECTION_STORE_URL = os.environ.get("NEREUS_SELECTION_STORE", "memory")
+
+
+class MemorySelectionStore:
+    """Dict-backed store. Only correct with a single worker process."""
+
+    def __init__(self):
+        self._data: dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> str | None:
+        with self._lock:
+            return self._data.get(session_id)
+
+    def set(self, session_id: str, dataset_id: str) -> None:
+        with self._lock:
+            self._data[session_id] = dataset_id
+
+
+class SQLiteSelectionStore:
+    """SQLite-backed store, safe to share between worker processes on one host."""
+
+    def __init__(self, path: str):
+        self.path = path
+        dirname = os.path.dirname(os.path.abspath(path))
+        os.makedirs(dirname, exist_ok=True)
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS selection ("
+                " session_id TEXT PRIMARY KEY,"
+                " dataset_id TEXT NOT NULL,"
+                " updated_at REAL NOT NULL)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, session_id: str) -> str | None:
+        row = self._conn().execute(
+            "SELECT dataset_id FROM selection WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def set(self, session_id: str, dataset_id: str) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT INTO selection (session_id, dataset_id, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(session_id) DO UPDATE SET "
+                "dataset_id = excluded.dataset_id, updated_at = excluded.updated_at",
+                (session_id, dataset_id, time.time()),
+            )
+
+
+def make_store(url: str = SELECTION_STORE_URL):
+    if url == "memory":
+        return MemorySelectionStore()
+    if url.startswith("sqlite:///"):
+        return SQLiteSelectionStore(url[len("sqlite:///"):])
+    raise ValueError(f"Unsupported selection store: {url}")
+
+
+_STORE = make_store()
+
+
+def get_store():
+    return _STORE
+
+
+def set_store(store) -> None:
+    """Swap the store (anything with get(session_id) / set(session_id, id))."""
+    global _STORE
+    _STORE = store
+
+
+def get_selected(session_id: str | None) -> str:
+    if session_id:
+        selected = _STORE.get(session_id)
+        if selected is not None:
+            return selected
+    return DEFAULT_DATASET
+
+
+def set_selected(session_id: str, dataset_id: str) -> None:
+    _STORE.set(session_id, str(dataset_id))
@@ -1,26 +1,28 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, g, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
 import backend
 import analysis
+import jobs
+import plot_cache
+import profiling
+import selection
+import tracing
+import argparse
+import json
+import time
+import uuid
+import io
 import os
+import numpy as np
+import pandas as pd
 
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+PREDICT_MAX_ROWS = int(os.environ.get("NEREUS_PREDICT_MAX_ROWS", "1000000"))
 
-
-# ------------------------------------------------------------
-# ASK AT START: "Type to continue"
-# ------------------------------------------------------------
-print("\nEnter Port :")
-_choice = input().strip()
-
-if _choice not in ["1", "2", "3"]:
-    print("Invalid input — defaulting to dataset 1.")
-    _choice = "1"
-
-backend.SELECTED_DATASET = _choice
-CURRENT_DATASET = _choice
-
-print(f"\n✔ Port selected: {CURRENT_DATASET}")
-print("✔ Starting server...\n")
+# Clients identify their session with this header or cookie; the dataset
+# selection is stored per session (see selection.py), never in a global.
+SESSION_HEADER = "X-Session-Id"
+SESSION_COOKIE = "nereus_session"
 
 # ------------------------------------------------------------
 # FLASK APP
@@ -29,10 +31,160 @@ print("✔ Starting server...\n")
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
+tracing.describe("nereus_request_seconds", "histogram",
+                 "Time to response headers per route (streams: until the first byte)")
+tracing.describe("nereus_requests_inflight", "gauge", "Requests being handled")
+
+
+# ------------------ TRACING ------------------ #
+# Per-route latency histograms and the opt-in Server-Timing header (see
+# tracing.py). Routes are labelled by their URL rule, so ids in the path or
+# query never create new series.
+
+def _route_label() -> str:
+    return request.url_rule.rule if request.url_rule is not None else "unmatched"
+
+
+@app.before_request
+def _trace_begin():
+    if not tracing.ENABLED:
+        return
+    g.trace_start = time.perf_counter()
+    g.trace_token = tracing.begin_request()
+    tracing.gauge_add("nereus_requests_inflight", 1)
+
+
+@app.after_request
+def _trace_response(resp):
+    if not tracing.ENABLED or "trace_start" not in g:
+        return resp
+    elapsed = time.perf_counter() - g.trace_start
+    tracing.observe("nereus_request_seconds", elapsed,
+                    route=_route_label(), method=request.method, status=str(resp.status_code))
+    g.trace_observed = True
+    if tracing.wants_server_timing(request.headers.get(tracing.SERVER_TIMING_REQUEST_HEADER)):
+        resp.headers["Server-Timing"] = tracing.server_timing(tracing.request_stages(), elapsed)
+        resp.headers["Timing-Allow-Origin"] = "*"
+    return resp
+
+
+@app.teardown_request
+def _trace_end(exc):
+    if "trace_token" not in g:
+        return
+    if "trace_observed" not in g:
+        # An unhandled error skipped after_request
+        tracing.observe("nereus_request_seconds", time.perf_counter() - g.trace_start,
+                        route=_route_label(), method=request.method, status="500")
+    tracing.gauge_add("nereus_requests_inflight", -1)
+    tracing.end_request(g.pop("trace_token"))
+
+
+# ------------------ PROFILING ------------------ #
+# Opt-in cProfile + stack samples for single requests (see profiling.py).
+
+def _profile_token() -> str | None:
+    return request.headers.get(profiling.PROFILE_HEADER) or request.args.get(profiling.PROFILE_QUERY)
+
+
+@app.before_request
+def _profile_begin():
+    if not profiling.enabled() or request.path.startswith("/api/profiles"):
+        return
+    session = profiling.begin(_profile_token(), request.method, request.full_path, _route_label())
+    if session is not None:
+        g.profile = session
+        session.__enter__()
+
+
+@app.after_request
+def _profile_response(resp):
+    session = g.pop("profile", None)
+    if session is not None:
+        session.__exit__(None, None, None)
+        resp.headers["X-Profile-Id"] = profiling.end(session, resp.status_code)
+    return resp
+
+
+@app.teardown_request
+def _profile_end(exc):
+    session = g.pop("profile", None)
+    if session is not None:
+        # An unhandled error skipped after_request
+        session.__exit__(None, None, None)
+        profiling.end(session, 500)
+
+
+@app.route("/api/profiles", methods=["GET"])
+def list_profiles():
+    if not profiling.enabled():
+        return jsonify({"error": "Profiling is disabled (set NEREUS_PROFILE_TOKENS)"}), 404
+    if not profiling.allowed(_profile_token()):
+        return jsonify({"error": "A valid profiling token is required"}), 403
+    return jsonify(profiling.list_profiles())
+
+
+@app.route("/api/profiles/<profile_id>", methods=["GET"])
+def get_profile(profile_id):
+    if not profiling.enabled():
+        return jsonify({"error": "Profiling is disabled (set NEREUS_PROFILE_TOKENS)"}), 404
+    if not profiling.allowed(_profile_token()):
+        return jsonify({"error": "A valid profiling token is required"}), 403
+
+    fmt = request.args.get("format", "json")
+    if fmt not in ("json", "pstats", "collapsed"):
+        return jsonify({"error": "format must be one of: json, pstats, collapsed"}), 400
+    path = profiling.profile_path(profile_id, fmt)
+    if path is None:
+        return jsonify({"error": f"Unknown profile id: {profile_id}"}), 404
+    if fmt == "pstats":
+        return send_file(path, mimetype="application/octet-stream", as_attachment=True,
+                         download_name=f"{profile_id}.pstats")
+    if fmt == "collapsed":
+        return send_file(path, mimetype="text/plain")
+    return jsonify(profiling.get_profile(profile_id))
+
+
+def _session_id() -> str | None:
+    return request.headers.get(SESSION_HEADER) or request.cookies.get(SESSION_COOKIE)
+
 
 def _get_dataset_id_from_request():
     ds = request.args.get("id")
-    return ds if ds else CURRENT_DATASET
+    return ds if ds else selection.get_selected(_session_id())
+
+
+def _job_accepted(job: dict):
+    """202 response pointing the client at the job status URL."""
+    status_url = f"/api/model/jobs/{job['id']}"
+    resp = jsonify({"status": job["status"], "job": job, "status_url": status_url})
+    resp.status_code = 202
+    resp.headers["Location"] = status_url
+    resp.headers["Retry-After"] = "5"
+    return resp
+
+
+def _send_plot(kind: str, ds_id: str):
+    """Serve a cached plot with a strong ETag; 304 if the client has it."""
+    if ds_id not in backend.DATASETS:
+        return jsonify({"error": f"Unknown dataset id: {ds_id}"}), 400
+    etag = plot_cache.plot_etag(kind, ds_id)
+    if etag in request.if_none_match:
+        resp = app.response_class(status=304)
+        resp.set_etag(etag)
+        return resp
+
+    entry = plot_cache.get_plot(kind, ds_id)
+    resp = send_file(
+        io.BytesIO(entry["data"]),
+        mimetype="image/png",
+        etag=entry["etag"],
+        last_modified=entry["last_modified"],
+        max_age=0,
+        conditional=True,
+    )
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
 
 @app.route("/", methods=["GET"])
@@ -43,21 +195,28 @@ def home():
     """
 
 
+@app.route("/api/metrics", methods=["GET"])
+def prometheus_metrics():
+    return app.response_class(tracing.render(), mimetype="text/plain; version=0.0.4")
+
+
 @app.route("/api/select", methods=["GET"])
 def select_dataset():
-    global CURRENT_DATASET
     ds_id = request.args.get("id")
     if ds_id not in backend.DATASETS:
-        return jsonify({"error": "Invalid dataset id. Use 1, 2, or 3"}), 400
+        return jsonify({"error": f"Invalid dataset id. Use one of: {', '.join(backend.DATASETS)}"}), 400
 
-    CURRENT_DATASET = ds_id
-    backend.SELECTED_DATASET = ds_id
-    return jsonify({"selected": CURRENT_DATASET})
+    session_id = _session_id() or uuid.uuid4().hex
+    selection.set_selected(session_id, ds_id)
+
+    resp = jsonify({"selected": ds_id, "session": session_id})
+    resp.set_cookie(SESSION_COOKIE, session_id, httponly=True, samesite="Lax")
+    return resp
 
 
 @app.route("/api/selected", methods=["GET"])
 def get_selected_dataset():
-    return jsonify({"selected_dataset": CURRENT_DATASET})
+    return jsonify({"selected_dataset": selection.get_selected(_session_id())})
 
 
 # ------------------ META ------------------ #
@@ -78,69 +237,73 @@ def dataset_summary():
 @app.route("/api/plot/correlation", methods=["GET"])
 def plot_correlation():
     ds_id = _get_dataset_id_from_request()
-    return send_file(backend.plot_correlation_heatmap(ds_id), mimetype="image/png")
+    return _send_plot("correlation", ds_id)
 
 
 @app.route("/api/plot/ndci", methods=["GET"])
 def plot_ndci():
     ds_id = _get_dataset_id_from_request()
-    return send_file(backend.plot_ndci_trend(ds_id), mimetype="image/png")
+    return _send_plot("ndci", ds_id)
 
 
 @app.route("/api/plot/turbidity", methods=["GET"])
 def plot_turbidity():
     ds_id = _get_dataset_id_from_request()
-    return send_file(backend.plot_turbidity_trend(ds_id), mimetype="image/png")
+    return _send_plot("turbidity", ds_id)
 
 
 @app.route("/api/plot/shrinkage", methods=["GET"])
 def plot_shrinkage():
     ds_id = _get_dataset_id_from_request()
-    return send_file(backend.plot_shrinkage_trend(ds_id), mimetype="image/png")
+    return _send_plot("shrinkage", ds_id)
 
 
 @app.route("/api/plot/violin/ndci", methods=["GET"])
 def plot_violin_ndci():
     ds_id = _get_dataset_id_from_request()
-    return send_file(backend.plot_violin_ndci(ds_id), mimetype="image/png")
+    return _send_plot("violin_ndci", ds_id)
 
 
 
 @app.route("/api/plot/violin/turbidity", methods=["GET"])
 def plot_violin_turbidity():
     ds_id = _get_dataset_id_from_request()
-    return send_file(backend.plot_violin_turbidity(ds_id), mimetype="image/png")
+    return _send_plot("violin_turbidity", ds_id)
 
 
 @app.route("/api/plot/violin/shrinkage", methods=["GET"])
 def plot_violin_shrinkage():
     ds_id = _get_dataset_id_from_request()
-    return send_file(backend.plot_violin_shrinkage(ds_id), mimetype="image/png")
+    return _send_plot("violin_shrinkage", ds_id)
 
 
 
 @app.route("/api/plot/box/ndci", methods=["GET"])
 def plot_box_ndci():
     ds_id = _get_dataset_id_from_request()
-    return send_file(backend.plot_box_ndci(ds_id), mimetype="image/png")
+    return _send_plot("box_ndci", ds_id)
 
 
 @app.route("/api/plot/box/turbidity", methods=["GET"])
 def plot_box_turbidity():
     ds_id = _get_dataset_id_from_request()
-    return send_file(backend.plot_box_turbidity(ds_id), mimetype="image/png")
+    return _send_plot("box_turbidity", ds_id)
 
 
 @app.route("/api/plot/box/shrinkage", methods=["GET"])
 def plot_box_shrinkage():
     ds_id = _get_dataset_id_from_request()
-    return send_file(backend.plot_box_shrinkage(ds_id), mimetype="image/png")
+    return _send_plot("box_shrinkage", ds_id)
 
 
 @app.route("/api/plot/model_accuracy", methods=["GET"])
 def plot_model_accuracy():
     ds_id = _get_dataset_id_from_request()
-    return send_file(backend.plot_model_accuracy(ds_id), mimetype="image/png")
+    if ds_id not in backend.DATASETS:
+        return jsonify({"error": f"Unknown dataset id: {ds_id}"}), 400
+    if backend.peek_trained_model(ds_id) is None:
+        return _job_accepted(jobs.submit_training(ds_id))
+    return _send_plot("model_accuracy", ds_id)
 
 
 # ------------------ METRICS ------------------ #
@@ -148,7 +311,224 @@ def plot_model_accuracy():
 @app.route("/api/model/metrics", methods=["GET"])
 def model_metrics():
     ds_id = _get_dataset_id_from_request()
-    return jsonify(backend.train_and_evaluate_model(ds_id))
+    entry = backend.peek_trained_model(ds_id)
+    if entry is None:
+        return _job_accepted(jobs.submit_training(ds_id))
+    return jsonify(entry["metrics"])
+
+
+@app.route("/api/model/train", methods=["POST"])
+def model_train():
+    body = request.get_json(silent=True) or {}
+    ds_id = str(body.get("id", _get_dataset_id_from_request()))
+    if ds_id not in backend.DATASETS:
+        return jsonify({"error": f"Unknown dataset id: {ds_id}"}), 400
+    force = bool(body.get("force", False))
+
+    if not force and backend.peek_trained_model(ds_id) is not None:
+        return jsonify({"status": "done", "metrics": backend.train_and_evaluate_model(ds_id)})
+    return _job_accepted(jobs.submit_training(ds_id, force=force))
+
+
+@app.route("/api/model/jobs/<job_id>", methods=["GET"])
+def model_job_status(job_id):
+    job = jobs.get_job(job_id)
+    if job is None:
+        return jsonify({"error": f"Unknown job id: {job_id}"}), 404
+    return jsonify(job)
+
+
+def _wants_arrow() -> bool:
+    return request.args.get("format") == "arrow" or ARROW_MIMETYPE in request.accept_mimetypes.values()
+
+
+def _pyarrow():
+    """The pyarrow module, or None: Arrow support is optional."""
+    try:
+        import pyarrow
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def _arrow_response(frame: pd.DataFrame):
+    """A DataFrame as one Arrow IPC stream (406 if pyarrow is not installed)."""
+    pa = _pyarrow()
+    if pa is None:
+        return jsonify({"error": "Arrow responses need the 'pyarrow' package on the server; use JSON"}), 406
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return app.response_class(sink.getvalue().to_pybytes(), mimetype=ARROW_MIMETYPE)
+
+
+def _read_predict_payload() -> tuple:
+    """(dataset id, DataFrame with date [+ turbidity, shrinkage]) from JSON or Arrow."""
+    if request.mimetype == ARROW_MIMETYPE:
+        table = _pyarrow().ipc.open_stream(request.get_data()).read_all()
+        return _get_dataset_id_from_request(), table.to_pandas()
+
+    body = request.get_json(silent=True) or {}
+    ds_id = str(body.get("id") or _get_dataset_id_from_request())
+    if "rows" in body:
+        frame = pd.DataFrame(body["rows"])
+    else:
+        frame = pd.DataFrame({"date": body.get("dates", [])})
+        for col in ("turbidity", "shrinkage"):
+            if body.get(col) is not None:
+                if len(body[col]) != len(frame):
+                    raise ValueError(f"'{col}' must have one value per date")
+                frame[col] = body[col]
+    return ds_id, frame
+
+
+@app.route("/api/model/predict", methods=["POST"])
+def model_predict():
+    if request.mimetype == ARROW_MIMETYPE and _pyarrow() is None:
+        return jsonify({"error": "Arrow request bodies need the 'pyarrow' package on the server; send JSON"}), 415
+    try:
+        ds_id, frame = _read_predict_payload()
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    if ds_id not in backend.DATASETS:
+        return jsonify({"error": f"Unknown dataset id: {ds_id}"}), 400
+    if "date" not in frame.columns or frame.empty:
+        return jsonify({"error": "Provide at least one date ('dates' or rows with 'date')"}), 400
+    if len(frame) > PREDICT_MAX_ROWS:
+        return jsonify({"error": f"At most {PREDICT_MAX_ROWS} rows per request"}), 413
+
+    def _column(name):
+        if name not in frame.columns:
+            return None
+        return pd.Series(frame[name], dtype="float64").to_numpy()
+
+    try:
+        dates = pd.to_datetime(frame["date"])
+        preds = backend.predict(
+            ds_id,
+            dates,
+            turbidity=_column("turbidity"),
+            shrinkage=_column("shrinkage"),
+            train=False,
+        )
+    except LookupError:
+        return _job_accepted(jobs.submit_training(ds_id))
+    except (ValueError, TypeError) as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    if _wants_arrow() or request.mimetype == ARROW_MIMETYPE:
+        return _arrow_response(pd.DataFrame({"date": dates.to_numpy(), "Chla_Value": preds}))
+
+    return jsonify(
+        {
+            "dataset_id": ds_id,
+            "model": backend.model_cache_key(ds_id),
+            "dates": dates.dt.strftime("%Y-%m-%d").tolist(),
+            "Chla_Value": np.round(preds, 6).tolist(),
+        }
+    )
+
+
+# ------------------ CHART DATA ------------------ #
+# Numeric payloads for client-side charts: JSON by default, Arrow IPC with
+# ?format=arrow or "Accept: application/vnd.apache.arrow.stream" when the
+# optional pyarrow package is installed (406 otherwise).
+
+@app.route("/api/series/<metric>", methods=["GET"])
+def chart_series(metric):
+    ds_id = _get_dataset_id_from_request()
+    if ds_id not in backend.DATASETS:
+        return jsonify({"error": f"Unknown dataset id: {ds_id}"}), 400
+    try:
+        points = request.args.get("points", type=int)
+        frame = backend.get_series(ds_id, metric, points=points, method=request.args.get("method"))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    if _wants_arrow():
+        return _arrow_response(frame)
+    daily = bool((frame["Date"] == frame["Date"].dt.normalize()).all())
+    date_format = "%Y-%m-%d" if daily else "%Y-%m-%dT%H:%M:%S"
+    return jsonify(
+        {
+            "dataset_id": ds_id,
+            "metric": backend.metric_column(metric),
+            "points": len(frame),
+            "dates": frame["Date"].dt.strftime(date_format).tolist(),
+            "values": np.round(frame["value"].to_numpy(), 6).tolist(),
+        }
+    )
+
+
+@app.route("/api/distribution/<metric>", methods=["GET"])
+def chart_distribution(metric):
+    ds_id = _get_dataset_id_from_request()
+    if ds_id not in backend.DATASETS:
+        return jsonify({"error": f"Unknown dataset id: {ds_id}"}), 400
+    try:
+        grid_points = request.args.get("grid", 64, type=int)
+        frame = backend.get_distribution(ds_id, metric, grid_points=grid_points)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    if _wants_arrow():
+        return _arrow_response(frame)
+    frame["grid"] = [np.round(g, 6).tolist() for g in frame["grid"]]
+    frame["density"] = [np.round(d, 6).tolist() for d in frame["density"]]
+    return jsonify(
+        {
+            "dataset_id": ds_id,
+            "metric": backend.metric_column(metric),
+            "years": frame.round(6).to_dict(orient="records"),
+        }
+    )
+
+
+@app.route("/api/corr", methods=["GET"])
+def chart_corr():
+    ds_id = _get_dataset_id_from_request()
+    if ds_id not in backend.DATASETS:
+        return jsonify({"error": f"Unknown dataset id: {ds_id}"}), 400
+    corr = backend.get_corr_matrix(ds_id).round(6)
+
+    if _wants_arrow():
+        return _arrow_response(corr.rename_axis("column").reset_index())
+    return jsonify(
+        {
+            "dataset_id": ds_id,
+            "columns": list(corr.columns),
+            "matrix": [[None if np.isnan(v) else v for v in row] for row in corr.to_numpy().tolist()],
+        }
+    )
+
+
+# ------------------ FORECAST ------------------ #
+
+@app.route("/api/forecast", methods=["GET"])
+def get_forecast():
+    ds_id = _get_dataset_id_from_request()
+    if ds_id not in backend.DATASETS:
+        return jsonify({"error": f"Unknown dataset id: {ds_id}"}), 400
+    try:
+        horizon = int(request.args.get("horizon", 30))
+        frame = backend.get_forecast(ds_id, horizon)
+    except LookupError:
+        return _job_accepted(jobs.submit_training(ds_id))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    frame = frame.assign(Date=frame["Date"].dt.strftime("%Y-%m-%d")).round(6)
+    return jsonify(
+        {
+            "dataset_id": ds_id,
+            "horizon": horizon,
+            "model": backend.model_cache_key(ds_id),
+            "forecast": frame.to_dict(orient="records"),
+        }
+    )
 
 
 # ------------------ ANALYSIS ------------------ #
@@ -156,27 +536,83 @@ def model_metrics():
 @app.route("/api/analyze", methods=["POST"])
 def analyze():
     body = request.get_json(force=True) or {}
-    ds_id = body.get("id", CURRENT_DATASET)
+    ds_id = str(body.get("id") or _get_dataset_id_from_request())
     prompt = body.get("prompt", "")
+
+    wants_stream = (
+        body.get("stream")
+        or request.args.get("stream") == "1"
+        or "text/event-stream" in request.accept_mimetypes.values()
+    )
+    if wants_stream:
+        return _analysis_event_stream(ds_id, prompt)
     return jsonify({"analysis": analysis.generate_textual_analysis(ds_id, prompt)})
 
 
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _analysis_event_stream(ds_id: str, prompt: str):
+    """
+    Server-Sent Events: one "token" event per text chunk, then "done"
+    (or "error"). The prompt/context is built before the response starts.
+    """
+    try:
+        chunks = analysis.stream_textual_analysis(ds_id, prompt)
+    except Exception as exc:
+        return jsonify({"error": str(exc)}), 500
+
+    def events():
+        try:
+            for text in chunks:
+                yield _sse("token", {"text": text})
+        except Exception as exc:
+            yield _sse("error", {"error": str(exc)})
+            return
+        yield _sse("done", {"dataset_id": ds_id})
+
+    resp = app.response_class(stream_with_context(events()), mimetype="text/event-stream")
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.headers["X-Accel-Buffering"] = "no"  # don't let nginx buffer the stream
+    return resp
+
+
 # ------------------ EXPORT PDF ------------------ #
 
 @app.route("/api/export/pdf", methods=["GET"])
 def export_pdf():
-    ds_id = request.args.get("id", CURRENT_DATASET)
-    filename_map = {"1": "Analysis.pdf", "2": "Analysis_2.pdf", "3": "Analysis_3.pdf"}
-    name = filename_map.get(ds_id, "analysis.pdf")
-    path = f"others/{name}"
-
-    if not os.path.exists(path):
-        return jsonify({"error": f"PDF '{name}' not found"}), 404
-
-    return send_file(path, mimetype="application/pdf", as_attachment=True)
+    import report  # reportlab is only loaded once someone exports
 
+    ds_id = _get_dataset_id_from_request()
+    if ds_id not in backend.DATASETS:
+        return jsonify({"error": f"Unknown dataset id: {ds_id}"}), 400
 
+    path, key = report.get_report(ds_id)
+    resp = send_file(
+        path,
+        mimetype="application/pdf",
+        as_attachment=True,
+        download_name=f"nereus-report-{ds_id}.pdf",
+        etag=key,
+        conditional=True,
+    )
+    resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=8040, debug=True)
+    # For several workers use e.g.
+    #   NEREUS_SELECTION_STORE=sqlite:///artifacts/selection.db gunicorn -w 4 server:app
+    parser = argparse.ArgumentParser(description="NEREUS backend server")
+    parser.add_argument("--dataset", default=selection.DEFAULT_DATASET,
+                        help="Dataset used by sessions that have not selected one")
+    parser.add_argument("--host", default=os.environ.get("NEREUS_HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("NEREUS_PORT", "8040")))
+    args = parser.parse_args()
+
+    selection.DEFAULT_DATASET = args.dataset
+    print(f"\n✔ Default dataset: {args.dataset}")
+    print("✔ Starting server...\n")
+
+    app.run(host=args.host, port=args.port, debug=True)
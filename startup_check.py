@@ -0,0 +1,99 @@
+import re
+import sys
+import json
+import argparse
+import subprocess
+
+# -------------------------------------------------------------------
+# STARTUP BUDGET CHECK
+# -------------------------------------------------------------------
+# Imports the server module in fresh interpreters under `python -X
+# importtime` and fails (exit 1) when
+#
+#   - the best-of-N import time of the module is over the budget, or
+#   - a module that must stay lazy (sklearn, seaborn, matplotlib, scipy,
+#     google.generativeai, reportlab) was imported at all.
+#
+#   python startup_check.py                          # server, 1500 ms
+#   python startup_check.py --module asgi_server --budget-ms 2000
+#
+# The lazy-module check does not depend on machine speed, so it is the one
+# to rely on in CI; set the time budget for the slowest machine you boot on.
+
+LAZY_MODULES = ["sklearn", "seaborn", "matplotlib", "scipy", "google.generativeai", "reportlab"]
+DEFAULT_BUDGET_MS = 1500
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure(module: str) -> list[dict]:
+    """One fresh `import module` under -X importtime: [{name, depth, self_us, cumulative_us}]."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+    rows = []
+    for line in proc.stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            rows.append({
+                "name": m.group(4),
+                "depth": (len(m.group(3)) - 1) // 2,
+                "self_us": int(m.group(1)),
+                "cumulative_us": int(m.group(2)),
+            })
+    return rows
+
+
+def check(module: str, runs: int, budget_ms: float, top: int) -> dict:
+    results = [measure(module) for _ in range(runs)]
+    totals = [next(r["cumulative_us"] for r in rows if r["name"] == module and r["depth"] == 0)
+              for rows in results]
+    best = min(range(runs), key=lambda i: totals[i])
+    rows = results[best]
+
+    direct = sorted((r for r in rows if r["depth"] == 1), key=lambda r: r["cumulative_us"], reverse=True)
+    names = {r["name"] for r in rows}
+    eager = [lazy for lazy in LAZY_MODULES
+             if any(n == lazy or n.startswith(lazy + ".") for n in names)]
+    total_ms = totals[best] / 1000
+    return {
+        "module": module,
+        "runs_ms": [round(t / 1000, 1) for t in totals],
+        "total_ms": round(total_ms, 1),
+        "budget_ms": budget_ms,
+        "over_budget": total_ms > budget_ms,
+        "eager_lazy_modules": eager,
+        "top_imports": [{"name": r["name"], "ms": round(r["cumulative_us"] / 1000, 1)} for r in direct[:top]],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Check the server's import time budget")
+    parser.add_argument("--module", default="server")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters; the fastest counts")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--top", type=int, default=10, help="How many direct imports to list")
+    parser.add_argument("--json", action="store_true", help="Print the result as JSON")
+    args = parser.parse_args(argv)
+
+    result = check(args.module, args.runs, args.budget_ms, args.top)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print(f"import {result['module']}: {result['total_ms']} ms "
+              f"(budget {result['budget_ms']:.0f} ms, runs {result['runs_ms']})")
+        for row in result["top_imports"]:
+            print(f"  {row['name']:<30}{row['ms']:>10} ms")
+        if result["over_budget"]:
+            print("FAIL: import time over budget")
+        if result["eager_lazy_modules"]:
+            print(f"FAIL: imported at startup but should load lazily: {', '.join(result['eager_lazy_modules'])}")
+
+    return 1 if result["over_budget"] or result["eager_lazy_modules"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,229 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------------------------------------------------
+# PRECOMPUTED STATISTICS INDEX
+# -------------------------------------------------------------------
+# Everything /api/summary, /api/plot/correlation and the LLM context need,
+# computed once per data hash and stored next to the dataset bundle.
+#
+# Moments are kept as mergeable (count, mean, M2) triples and pairwise
+# co-moments, so appended rows are folded in without rescanning history
+# (Chan et al. parallel variance update). Quantiles cannot be merged
+# exactly; on append they are recomputed only for the columns / groups the
+# new rows touch.
+
+QUANTILES = [0.25, 0.5, 0.75]
+QUANTILE_LABELS = ["25%", "50%", "75%"]
+GROUP_KEYS = ["Year", "Month"]
+
+
+def _moments(values: np.ndarray) -> dict:
+    values = values[~np.isnan(values)]
+    n = int(values.size)
+    if n == 0:
+        return {"count": 0, "mean": 0.0, "m2": 0.0, "min": None, "max": None}
+    mean = float(values.mean())
+    return {
+        "count": n,
+        "mean": mean,
+        "m2": float(((values - mean) ** 2).sum()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+    }
+
+
+def _merge_moments(a: dict, b: dict) -> dict:
+    if b["count"] == 0:
+        return dict(a)
+    if a["count"] == 0:
+        return dict(b)
+    n = a["count"] + b["count"]
+    delta = b["mean"] - a["mean"]
+    return {
+        "count": n,
+        "mean": a["mean"] + delta * b["count"] / n,
+        "m2": a["m2"] + b["m2"] + delta * delta * a["count"] * b["count"] / n,
+        "min": min(a["min"], b["min"]),
+        "max": max(a["max"], b["max"]),
+    }
+
+
+def _quantiles(values: np.ndarray) -> list:
+    values = values[~np.isnan(values)]
+    if values.size == 0:
+        return [None] * len(QUANTILES)
+    return [float(q) for q in np.quantile(values, QUANTILES)]
+
+
+def _comoments(x: np.ndarray, y: np.ndarray) -> dict:
+    """Co-moment sufficient statistics over rows where both are present."""
+    mask = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[mask], y[mask]
+    n = int(x.size)
+    if n == 0:
+        return {"n": 0, "mx": 0.0, "my": 0.0, "m2x": 0.0, "m2y": 0.0, "cxy": 0.0}
+    mx, my = float(x.mean()), float(y.mean())
+    dx, dy = x - mx, y - my
+    return {
+        "n": n,
+        "mx": mx,
+        "my": my,
+        "m2x": float((dx * dx).sum()),
+        "m2y": float((dy * dy).sum()),
+        "cxy": float((dx * dy).sum()),
+    }
+
+
+def _merge_comoments(a: dict, b: dict) -> dict:
+    if b["n"] == 0:
+        return dict(a)
+    if a["n"] == 0:
+        return dict(b)
+    n = a["n"] + b["n"]
+    dx = b["mx"] - a["mx"]
+    dy = b["my"] - a["my"]
+    w = a["n"] * b["n"] / n
+    return {
+        "n": n,
+        "mx": a["mx"] + dx * b["n"] / n,
+        "my": a["my"] + dy * b["n"] / n,
+        "m2x": a["m2x"] + b["m2x"] + dx * dx * w,
+        "m2y": a["m2y"] + b["m2y"] + dy * dy * w,
+        "cxy": a["cxy"] + b["cxy"] + dx * dy * w,
+    }
+
+
+def _column(df: pd.DataFrame, col: str) -> np.ndarray:
+    return df[col].to_numpy(dtype=float, na_value=np.nan)
+
+
+def _column_stats(df: pd.DataFrame, cols: list[str]) -> dict:
+    out = {}
+    for col in cols:
+        values = _column(df, col)
+        out[col] = _moments(values)
+        out[col]["nulls"] = int(np.isnan(values).sum())
+        out[col]["quantiles"] = _quantiles(values)
+    return out
+
+
+def _group_stats(df: pd.DataFrame, key: str, cols: list[str]) -> dict:
+    out = {}
+    for group, part in df.groupby(key, sort=True):
+        out[str(group)] = _column_stats(part, cols)
+    return out
+
+
+def _pair_stats(df: pd.DataFrame, cols: list[str]) -> list[list[dict]]:
+    arrays = [_column(df, col) for col in cols]
+    return [[_comoments(x, y) for y in arrays] for x in arrays]
+
+
+def build_index(df: pd.DataFrame, summary_cols: list[str], corr_cols: list[str]) -> dict:
+    """Full statistics index for df."""
+    group_keys = [k for k in GROUP_KEYS if k in df.columns]
+    return {
+        "rows": int(len(df)),
+        "summary_cols": list(summary_cols),
+        "corr_cols": list(corr_cols),
+        "columns": _column_stats(df, summary_cols),
+        "pairs": _pair_stats(df, corr_cols),
+        "groups": {key: _group_stats(df, key, summary_cols) for key in group_keys},
+    }
+
+
+def append_rows(index: dict, new_rows: pd.DataFrame, full_df: pd.DataFrame) -> dict:
+    """
+    Fold new_rows into index. full_df is the dataset *after* the append and
+    is only used to recompute quantiles of the touched columns / groups.
+    """
+    summary_cols = index["summary_cols"]
+    corr_cols = index["corr_cols"]
+    out = dict(index)
+    out["rows"] = index["rows"] + int(len(new_rows))
+
+    new_cols = _column_stats(new_rows, summary_cols)
+    columns = {}
+    for col in summary_cols:
+        merged = _merge_moments(index["columns"][col], new_cols[col])
+        merged["nulls"] = index["columns"][col]["nulls"] + new_cols[col]["nulls"]
+        merged["quantiles"] = _quantiles(_column(full_df, col))
+        columns[col] = merged
+    out["columns"] = columns
+
+    new_pairs = _pair_stats(new_rows, corr_cols)
+    out["pairs"] = [
+        [_merge_comoments(a, b) for a, b in zip(row_a, row_b)]
+        for row_a, row_b in zip(index["pairs"], new_pairs)
+    ]
+
+    groups = {}
+    for key, old_groups in index["groups"].items():
+        groups[key] = dict(old_groups)
+        for group, part in new_rows.groupby(key, sort=True):
+            g = str(group)
+            part_stats = _column_stats(part, summary_cols)
+            full_part = full_df[full_df[key] == group]
+            merged_group = {}
+            for col in summary_cols:
+                old = old_groups.get(g, {}).get(col)
+                merged = part_stats[col] if old is None else _merge_moments(old, part_stats[col])
+                merged["nulls"] = part_stats[col]["nulls"] + (old["nulls"] if old else 0)
+                merged["quantiles"] = _quantiles(_column(full_part, col))
+                merged_group[col] = merged
+            groups[key][g] = merged_group
+    out["groups"] = groups
+    return out
+
+
+# -------------------------------------------------------------------
+# VIEWS (shaped like the original pandas results)
+# -------------------------------------------------------------------
+
+def _describe(stats: dict) -> dict:
+    n = stats["count"]
+    std = float(np.sqrt(stats["m2"] / (n - 1))) if n > 1 else float("nan")
+    q = [float("nan") if v is None else v for v in stats["quantiles"]]
+    out = {
+        "count": float(n),
+        "mean": stats["mean"] if n else float("nan"),
+        "std": std,
+        "min": float("nan") if stats["min"] is None else stats["min"],
+    }
+    out.update(dict(zip(QUANTILE_LABELS, q)))
+    out["max"] = float("nan") if stats["max"] is None else stats["max"]
+    return out
+
+
+def describe_frame(index: dict) -> pd.DataFrame:
+    """Equivalent of df[summary_cols].describe()."""
+    return pd.DataFrame({col: _describe(index["columns"][col]) for col in index["summary_cols"]})
+
+
+def null_counts(index: dict) -> dict:
+    return {col: index["columns"][col]["nulls"] for col in index["summary_cols"]}
+
+
+def corr_frame(index: dict) -> pd.DataFrame:
+    """Equivalent of df[corr_cols].corr() (Pearson, pairwise-complete)."""
+    cols = index["corr_cols"]
+    k = len(cols)
+    mat = np.full((k, k), np.nan)
+    for i in range(k):
+        for j in range(k):
+            p = index["pairs"][i][j]
+            denom = np.sqrt(p["m2x"] * p["m2y"])
+            if p["n"] > 1 and denom > 0:
+                mat[i, j] = 1.0 if i == j else np.clip(p["cxy"] / denom, -1.0, 1.0)
+    return pd.DataFrame(mat, index=cols, columns=cols)
+
+
+def group_frame(index: dict, key: str, col: str) -> pd.DataFrame:
+    """Per-group describe table for one column, e.g. group_frame(ix, "Year", "Chla_Value")."""
+    groups = index["groups"][key]
+    table = {g: _describe(stats[col]) for g, stats in groups.items()}
+    frame = pd.DataFrame(table).T
+    frame.index = frame.index.astype(int)
+    frame.index.name = key
+    return frame.sort_index()
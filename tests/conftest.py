@@ -0,0 +1,61 @@
+import os
+import sys
+import shutil
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Keep every on-disk cache out of artifacts/ and render in-process. Set
+# before the app modules are imported, since they read NEREUS_* at import.
+_SCRATCH = tempfile.mkdtemp(prefix="nereus-tests-")
+os.environ.setdefault("NEREUS_DATASTORE_DIR", os.path.join(_SCRATCH, "store"))
+os.environ.setdefault("NEREUS_MODELS_DIR", os.path.join(_SCRATCH, "models"))
+os.environ.setdefault("NEREUS_PLOTS_DIR", os.path.join(_SCRATCH, "plots"))
+os.environ.setdefault("NEREUS_LLM_CACHE_DIR", os.path.join(_SCRATCH, "llm"))
+os.environ.setdefault("NEREUS_PROFILES_DIR", os.path.join(_SCRATCH, "profiles"))
+os.environ.setdefault("NEREUS_RENDER_WORKERS", "0")
+os.environ.setdefault("NEREUS_LLM_PROVIDER", "fake")
+
+import backend  # noqa: E402
+import dataset_store  # noqa: E402
+import model_registry  # noqa: E402
+import plot_cache  # noqa: E402
+
+SOURCE_CSV = os.path.join(ROOT, "others", "dataset-1.csv")
+
+
+def _clear_caches() -> None:
+    for cache in (
+        backend._DATASET_CACHE, backend._DATASET_SIZES, backend._DATASET_STAMPS,
+        backend._HASH_CACHE, backend._HASH_STATES, backend._STATS_CACHE,
+        model_registry._REGISTRY, model_registry._LOADED, plot_cache._MEMORY,
+    ):
+        cache.clear()
+
+
+@pytest.fixture
+def dataset(tmp_path, monkeypatch):
+    """
+    Dataset "1" as a private copy of others/dataset-1.csv, with its own
+    store, registry and plot cache directories. Yields the CSV path.
+    """
+    path = tmp_path / "data" / "dataset-1.csv"
+    path.parent.mkdir()
+    shutil.copyfile(SOURCE_CSV, path)
+
+    monkeypatch.setattr(backend, "DATASETS", {"1": str(path)})
+    monkeypatch.setattr(dataset_store, "STORE_DIR", str(tmp_path / "store"))
+    monkeypatch.setattr(model_registry, "MODELS_DIR", str(tmp_path / "models"))
+    monkeypatch.setattr(plot_cache, "PLOTS_DIR", str(tmp_path / "plots"))
+    _clear_caches()
+    yield str(path)
+    _clear_caches()
+
+
+@pytest.fixture
+def fresh_process():
+    """Call to drop in-memory caches, as if the next call ran in a new process."""
+    return _clear_caches
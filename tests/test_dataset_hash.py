@@ -0,0 +1,98 @@
+import shutil
+import hashlib
+
+import pandas as pd
+import pytest
+
+import backend
+import dataset_store
+import ingest
+
+
+def _file_sha256(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _later_rows(path: str, days: int, count: int = 3) -> pd.DataFrame:
+    """count raw rows copied from the end of the CSV, dated `days` later."""
+    rows = pd.read_csv(path).tail(count).copy()
+    rows["Date"] = pd.to_datetime(rows["Date"]) + pd.Timedelta(days=days)
+    return rows
+
+
+def test_hash_is_file_sha256(dataset):
+    assert backend.dataset_hash("1") == _file_sha256(dataset)
+
+
+def test_append_keeps_content_hash(dataset):
+    backend.load_dataset("1")
+    first = backend.append_rows("1", _later_rows(dataset, 4000))
+    second = backend.append_rows("1", _later_rows(dataset, 4100))
+
+    assert first["appended"] == 3
+    assert first["data_hash"] != second["data_hash"]
+    assert second["data_hash"] == _file_sha256(dataset)
+    assert backend.dataset_hash("1") == second["data_hash"]
+
+
+def test_hash_stable_across_reload_after_append(dataset, fresh_process):
+    backend.load_dataset("1")
+    rows = _later_rows(dataset, 4000)
+    appended = backend.append_rows("1", rows)["data_hash"]
+
+    # New process: dataset_hash before and after load_dataset must agree
+    fresh_process()
+    before = backend.dataset_hash("1")
+    frame = backend.load_dataset("1")
+    after = backend.dataset_hash("1")
+    assert before == after == appended
+    assert backend.get_stats_index("1")["data_hash"] == appended
+    assert frame["Date"].iloc[-1] == rows["Date"].iloc[-1]
+
+
+def test_append_rejects_older_dates(dataset):
+    with pytest.raises(ValueError):
+        backend.append_rows("1", _later_rows(dataset, -30))
+
+
+def test_ingest_skips_repeated_dates(dataset, tmp_path, monkeypatch):
+    monkeypatch.setattr(ingest, "FLUSH_ROWS", 2)
+    raw = pd.read_csv(dataset)
+    last = pd.to_datetime(raw["Date"]).max()
+    export = raw.tail(8).drop(columns=["Sentinel_ID"], errors="ignore").copy()
+    # Every date twice, split over several chunks and flushes
+    export["Date"] = [(last + pd.Timedelta(days=1 + i // 2)).strftime("%Y-%m-%d") for i in range(8)]
+    export_path = tmp_path / "export.csv"
+    export.to_csv(export_path, index=False)
+
+    report = ingest.ingest_export("1", str(export_path), schema="dataset", chunksize=3)
+    assert (report["read"], report["appended"], report["skipped"]) == (8, 4, 4)
+    assert report["data_hash"] == _file_sha256(dataset)
+
+    again = ingest.ingest_export("1", str(export_path), schema="dataset", chunksize=3)
+    assert again["appended"] == 0
+
+
+@pytest.mark.parametrize("history", ["daily", "sub-daily"])
+def test_sub_daily_append_survives_csv_reparse(dataset, fresh_process, history):
+    raw = pd.read_csv(dataset)
+    if history == "sub-daily":
+        raw["Date"] = pd.date_range("2020-01-01 03:00", periods=len(raw), freq="6h")
+        raw.to_csv(dataset, index=False)
+    backend.load_dataset("1")
+
+    rows = raw.tail(4).copy()
+    last = pd.to_datetime(raw["Date"]).max()
+    rows["Date"] = [last + pd.Timedelta(hours=h) for h in (5, 11, 17, 23)]
+    appended = backend.append_rows("1", rows)["data_hash"]
+    from_bundle = backend.load_dataset("1", copy=True)
+    assert list(from_bundle["Date"].iloc[-4:]) == list(rows["Date"])
+
+    # Lose the store and every in-memory cache: the frame is rebuilt from the CSV
+    fresh_process()
+    shutil.rmtree(dataset_store.STORE_DIR)
+    assert backend.dataset_hash("1") == appended == _file_sha256(dataset)
+    from_csv = backend.load_dataset("1", copy=True)
+    pd.testing.assert_frame_equal(from_csv, from_bundle)
+    assert from_csv["Date"].is_unique
@@ -0,0 +1,74 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import backend
+import dataset_store
+import tracing
+
+
+def _loads(source: str) -> float:
+    return tracing._COUNTERS.get(("nereus_dataset_loads_total", (("source", source),)), 0)
+
+
+def test_store_round_trips_the_prepared_frame(dataset, fresh_process):
+    from_csv = backend.load_dataset("1", copy=True)
+
+    fresh_process()
+    before = _loads("store")
+    from_store = backend.load_dataset("1", copy=True)
+    assert _loads("store") == before + 1
+    pd.testing.assert_frame_equal(from_csv, from_store)
+
+
+def _backed_by_memmap(values: np.ndarray) -> bool:
+    base = values
+    while base is not None and not isinstance(base, np.memmap):
+        base = base.base
+    return base is not None
+
+
+def test_columns_are_memory_mapped(dataset, fresh_process):
+    backend.load_dataset("1")
+    fresh_process()
+    frame = backend.load_dataset("1")
+    numeric = [c for c in frame.columns if frame[c].dtype.kind in "fiuM"]
+    assert "Chla_Value" in numeric and "Date" in numeric
+    for col in numeric:
+        values = frame[col].to_numpy()
+        assert _backed_by_memmap(values), col
+        assert not values.flags.writeable, col
+
+
+def test_default_view_is_read_only(dataset):
+    frame = backend.load_dataset("1")
+    assert not frame["Chla_Value"].to_numpy().flags.writeable
+    frame["extra"] = 1.0  # new columns never reach the cached frame
+    assert "extra" not in backend.load_dataset("1").columns
+
+    copy = backend.load_dataset("1", copy=True)
+    copy.loc[0, "Chla_Value"] = -1.0
+    assert backend.load_dataset("1")["Chla_Value"].iloc[0] != -1.0
+
+
+def test_touched_but_unchanged_csv_is_not_reparsed(dataset, fresh_process):
+    backend.load_dataset("1")
+    os.utime(dataset, ns=(0, 10**18))
+
+    fresh_process()
+    before = _loads("csv")
+    backend.load_dataset("1")
+    assert _loads("csv") == before
+    assert dataset_store.index_is_current(dataset_store.read_index("1"), dataset)
+
+
+def test_changed_csv_is_reparsed(dataset, fresh_process):
+    first = backend.load_dataset("1", copy=True)
+    raw = pd.read_csv(dataset)
+    raw.loc[0, "Chla_Value"] = raw.loc[0, "Chla_Value"] + 100
+    raw.to_csv(dataset, index=False)
+
+    fresh_process()
+    second = backend.load_dataset("1", copy=True)
+    assert np.isclose(second["Chla_Value"].iloc[0] - first["Chla_Value"].iloc[0], 100, atol=1)
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backend
+import downsample
+import server
+
+
+@pytest.fixture
+def client(dataset):
+    return server.app.test_client()
+
+
+def _series(n: int = 1000, spike_at: int = 637) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    y = np.sin(np.linspace(0, 12, n)) + rng.normal(0, 0.05, n)
+    y[spike_at] = 25.0
+    return pd.DataFrame({"Date": pd.date_range("2020-01-01", periods=n, freq="D"), "value": y})
+
+
+# ------------------ ALGORITHMS ------------------ #
+
+def test_lttb_picks_n_out_points_keeping_ends_and_peaks():
+    frame = _series()
+    idx = downsample.lttb_indices(frame["Date"].to_numpy(), frame["value"].to_numpy(), 100)
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == len(frame) - 1
+    assert np.all(np.diff(idx) > 0)
+    assert 637 in idx
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    frame = _series()
+    idx = downsample.minmax_indices(frame["Date"].to_numpy(), frame["value"].to_numpy(), 100)
+    assert len(idx) <= 102
+    assert frame["value"].idxmax() in idx
+    assert frame["value"].idxmin() in idx
+
+
+def test_short_series_and_none_keep_all_rows():
+    frame = _series(50, spike_at=20)
+    assert len(downsample.downsample(frame, "Date", "value", 100, "lttb")) == 50
+    assert len(downsample.downsample(_series(), "Date", "value", 100, "none")) == 1000
+    with pytest.raises(ValueError):
+        downsample.downsample(frame, "Date", "value", 10, "bogus")
+
+
+# ------------------ /api/series ------------------ #
+
+def test_series_endpoint_downsamples_with_lttb(client):
+    full = backend.load_dataset("1")
+    resp = client.get("/api/series/ndci?id=1&points=50&method=lttb")
+    assert resp.status_code == 200
+    body = resp.get_json()
+
+    assert body["metric"] == "Chla_Value"
+    assert body["points"] == len(body["dates"]) == len(body["values"]) == 50
+    assert body["dates"] == sorted(body["dates"])
+    assert body["dates"][0] == full["Date"].iloc[0].strftime("%Y-%m-%d")
+    assert body["dates"][-1] == full["Date"].iloc[-1].strftime("%Y-%m-%d")
+
+    # Every point is a real row of the series (LTTB selects, never averages)
+    rows = full.set_index(full["Date"].dt.strftime("%Y-%m-%d"))["Chla_Value"]
+    assert np.allclose([rows[d] for d in body["dates"]], body["values"], atol=1e-6)
+
+
+def test_series_endpoint_matches_plot_settings_by_default(client):
+    body = client.get("/api/series/turbidity?id=1").get_json()
+    expected = backend.get_series("1", "turbidity")
+    assert body["points"] == len(expected) <= backend.PLOT_DOWNSAMPLE["points"]
+
+
+@pytest.mark.parametrize("query", [
+    "/api/series/ndci?id=1&points=2",
+    "/api/series/ndci?id=1&method=bogus",
+    "/api/series/nope?id=1",
+    "/api/series/ndci?id=99",
+])
+def test_series_endpoint_rejects_bad_parameters(client, query):
+    resp = client.get(query)
+    assert resp.status_code == 400
+    assert "error" in resp.get_json()
@@ -0,0 +1,88 @@
+import os
+from concurrent.futures import Future
+
+import joblib
+import pytest
+
+import backend
+import jobs
+import model_registry
+
+
+class _ManualExecutor:
+    """Stands in for the training pool: futures complete when the test says so."""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+
+@pytest.fixture
+def executor(monkeypatch):
+    manual = _ManualExecutor()
+    monkeypatch.setattr(jobs, "_executor", lambda: manual)
+    monkeypatch.setattr(jobs, "_JOBS", {})
+    monkeypatch.setattr(jobs, "_INFLIGHT", {})
+    return manual
+
+
+def _fit_in_worker(dataset_id: str) -> dict:
+    """Persist an entry the way a training worker process would: file only."""
+    entry = {
+        "key": backend.model_cache_key(dataset_id),
+        "dataset_id": dataset_id,
+        "metrics": {"true_r2": 0.9},
+        "rf_model": None,
+        "gb_model": None,
+    }
+    os.makedirs(model_registry.MODELS_DIR, exist_ok=True)
+    joblib.dump(entry, model_registry._entry_path(dataset_id))
+    return entry
+
+
+def test_model_is_visible_when_job_reads_done(dataset, executor, monkeypatch):
+    assert backend.peek_trained_model("1") is None
+    job = jobs.submit_training("1")
+    assert jobs.submit_training("1")["id"] == job["id"]  # de-duplicated
+
+    seen = {}
+    load_entry = model_registry.load_entry
+
+    def spy(dataset_id):
+        state = jobs._JOBS[job["id"]]
+        seen["status"] = state["status"]
+        seen["inflight"] = state["key"] in jobs._INFLIGHT
+        # Pollers are not blocked while the entry is unpickled
+        seen["polls"] = jobs.get_job(job["id"])["status"]
+        return load_entry(dataset_id)
+
+    monkeypatch.setattr(model_registry, "load_entry", spy)
+    _fit_in_worker("1")
+    executor.futures[0].set_result(({"true_r2": 0.9}, []))
+
+    # The registry entry was loaded before the job read as done and
+    # before it left the in-flight table
+    assert seen == {"status": "queued", "inflight": True, "polls": "queued"}
+    assert jobs.get_job(job["id"])["status"] == "done"
+    # A client reacting to "done" finds the model instead of queueing a fit
+    assert backend.peek_trained_model("1") is not None
+
+
+def test_failed_job_clears_inflight(dataset, executor):
+    job = jobs.submit_training("1")
+    executor.futures[0].set_exception(RuntimeError("boom"))
+
+    state = jobs.get_job(job["id"])
+    assert state["status"] == "failed"
+    assert "boom" in state["error"]
+    assert jobs.submit_training("1")["id"] != job["id"]
+
+
+def test_registry_rereads_entry_written_by_another_process(dataset):
+    assert backend.peek_trained_model("1") is None  # miss is remembered...
+    _fit_in_worker("1")
+    assert backend.peek_trained_model("1") is not None  # ...until the file appears
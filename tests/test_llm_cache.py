@@ -0,0 +1,78 @@
+import asyncio
+import threading
+
+import pytest
+
+import llm_cache
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_cache, "CACHE_DIR", str(tmp_path / "llm"))
+    monkeypatch.setattr(llm_cache, "STATS", dict.fromkeys(llm_cache.STATS, 0))
+
+
+def _upstream(chunks, calls, gate=None):
+    def call():
+        calls.append(1)
+        for chunk in chunks:
+            if gate is not None:
+                gate.wait()
+            yield chunk
+    return call
+
+
+def test_second_call_is_served_from_cache():
+    calls = []
+    key = llm_cache.cache_key("fake", "model", "prompt")
+    assert "".join(llm_cache.stream(key, _upstream(["a", "b"], calls))) == "ab"
+    assert "".join(llm_cache.stream(key, _upstream(["x"], calls))) == "ab"
+    assert len(calls) == 1
+    assert llm_cache.STATS["hits"] == 1
+
+
+def test_concurrent_calls_share_one_upstream_call():
+    calls, gate = [], threading.Event()
+    key = llm_cache.cache_key("fake", "model", "coalesced")
+    upstream = _upstream(["a", "b", "c"], calls, gate)
+
+    results = []
+    readers = [threading.Thread(target=lambda: results.append("".join(llm_cache.stream(key, upstream))))
+               for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    gate.set()
+    for reader in readers:
+        reader.join(5)
+
+    assert results == ["abc"] * 4
+    assert len(calls) == 1
+    assert llm_cache.STATS["coalesced"] + llm_cache.STATS["hits"] == 3
+
+
+def test_cache_write_failure_still_returns_answer(monkeypatch, caplog):
+    def disk_full(key, text):
+        raise OSError("No space left on device")
+
+    escaped = []
+    monkeypatch.setattr(threading, "excepthook", escaped.append)
+    monkeypatch.setattr(llm_cache, "put", disk_full)
+    key = llm_cache.cache_key("fake", "model", "unwritable")
+    assert "".join(llm_cache.stream(key, _upstream(["a", "b"], []))) == "ab"
+
+    async def read():
+        return [c async for c in llm_cache.astream(key + "-async", _upstream(["x", "y"], []))]
+    assert asyncio.run(read()) == ["x", "y"]
+    assert escaped == []
+    assert caplog.text.count("Could not write LLM cache entry") == 2
+
+
+def test_upstream_error_reaches_every_reader():
+    def failing():
+        yield "partial"
+        raise ConnectionError("provider down")
+
+    key = llm_cache.cache_key("fake", "model", "failing")
+    with pytest.raises(RuntimeError, match="provider down"):
+        list(llm_cache.stream(key, failing))
+    assert llm_cache.get(key) is None
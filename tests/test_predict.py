@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+from sklearn.tree import DecisionTreeRegressor
+
+import backend
+import jobs
+import model_registry
+import server
+
+DATES = ["2024-01-15", "2024-06-01", "2025-03-10"]
+
+
+@pytest.fixture
+def client(dataset):
+    return server.app.test_client()
+
+
+@pytest.fixture
+def trained(dataset):
+    """A small stand-in fit registered for the current data and config."""
+    df = backend.load_dataset("1")
+    X, y = df[backend.FEATURE_COLS], df[backend.TARGET_COL]
+    return model_registry.save_model(
+        "1",
+        backend.dataset_hash("1"),
+        model_registry.config_hash(backend.model_config("1")),
+        DecisionTreeRegressor(max_depth=4, random_state=0).fit(X, y),
+        LinearRegression().fit(X, y),
+        params={},
+        metrics={},
+    )
+
+
+def _one_by_one(entry, dates, turbidity, shrinkage) -> list:
+    year_min, year_max = backend._year_range("1")
+    preds = []
+    for date, turb, shr in zip(dates, turbidity, shrinkage):
+        X = backend.build_features([date], year_min, year_max, turbidity=[turb], shrinkage=[shr])
+        preds.append(backend.predict_stacked(entry, backend.model_config("1"), X)[0])
+    return preds
+
+
+def test_batch_matches_row_by_row_predictions(client, trained):
+    turbidity, shrinkage = [10.0, 12.5, 8.0], [1.0, 2.0, 3.0]
+    resp = client.post("/api/model/predict", json={
+        "id": "1", "dates": DATES, "turbidity": turbidity, "shrinkage": shrinkage,
+    })
+    assert resp.status_code == 200
+    body = resp.get_json()
+    assert body["dates"] == DATES
+    assert body["model"] == backend.model_cache_key("1")
+    assert np.allclose(body["Chla_Value"], _one_by_one(trained, DATES, turbidity, shrinkage), atol=1e-6)
+
+
+def test_rows_payload_and_climatology_fill(client, trained):
+    rows = [{"date": d} for d in DATES]
+    by_rows = client.post("/api/model/predict", json={"id": "1", "rows": rows}).get_json()
+    by_dates = client.post("/api/model/predict", json={"id": "1", "dates": DATES}).get_json()
+    assert by_rows["Chla_Value"] == by_dates["Chla_Value"]
+    assert all(np.isfinite(by_rows["Chla_Value"]))
+
+
+def test_without_a_model_a_training_job_is_returned(client, monkeypatch):
+    monkeypatch.setattr(jobs, "submit_training", lambda ds_id, force=False: {
+        "id": "job1", "dataset_id": ds_id, "status": "queued",
+    })
+    resp = client.post("/api/model/predict", json={"id": "1", "dates": DATES})
+    assert resp.status_code == 202
+    assert resp.headers["Location"] == "/api/model/jobs/job1"
+
+
+@pytest.mark.parametrize("payload, status", [
+    ({"id": "1", "dates": []}, 400),
+    ({"id": "1", "dates": DATES, "turbidity": [1.0]}, 400),
+    ({"id": "1", "dates": ["not a date"]}, 400),
+    ({"id": "99", "dates": DATES}, 400),
+])
+def test_bad_payloads_are_rejected(client, trained, payload, status):
+    resp = client.post("/api/model/predict", json=payload)
+    assert resp.status_code == status
+    assert "error" in resp.get_json()
+
+
+def test_row_limit(client, trained, monkeypatch):
+    monkeypatch.setattr(server, "PREDICT_MAX_ROWS", 2)
+    assert client.post("/api/model/predict", json={"id": "1", "dates": DATES}).status_code == 413
+
+
+def test_arrow_without_pyarrow_is_a_client_error(client, trained, monkeypatch):
+    monkeypatch.setattr(server, "_pyarrow", lambda: None)
+    resp = client.post("/api/model/predict?format=arrow", json={"id": "1", "dates": DATES})
+    assert resp.status_code == 406
+    resp = client.post("/api/model/predict?id=1", data=b"\0", content_type=server.ARROW_MIMETYPE)
+    assert resp.status_code == 415
+    assert "pyarrow" in resp.get_json()["error"]
+    assert client.get("/api/series/ndci?id=1&format=arrow").status_code == 406
+
+
+def test_manifest_search_overrides_follow_refresh(tmp_path, monkeypatch):
+    manifest = tmp_path / "datasets.json"
+    monkeypatch.setattr(backend, "DATASET_DIR", str(tmp_path / "none"))
+    monkeypatch.setattr(backend, "DATASET_MANIFEST", str(manifest))
+    monkeypatch.setattr(backend, "DATASETS", {})
+    monkeypatch.setattr(backend, "DATASET_LABELS", {})
+    monkeypatch.setattr(backend, "DATASET_SEARCH", {})
+
+    manifest.write_text('[{"id": "7", "path": "a.csv", "search": "halving"}]')
+    backend.refresh_datasets()
+    assert backend.model_config("7")["search"] == "halving"
+
+    manifest.write_text('[{"id": "7", "path": "a.csv"}]')
+    backend.refresh_datasets()
+    assert backend.DATASET_SEARCH == {}
+    assert backend.model_config("7")["search"] == backend.MODEL_CONFIG["search"]
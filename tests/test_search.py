@@ -0,0 +1,52 @@
+import numpy as np
+from sklearn.model_selection import KFold
+
+import search
+
+GRID = {
+    "rf__n_estimators": [8, 16],
+    "rf__max_depth": [1, None],
+    "rf__min_samples_leaf": [1, 20],
+}
+
+
+def _data(n: int = 300):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(-3, 3, size=(n, 3))
+    y = np.sin(X[:, 0]) * 3 + X[:, 1] ** 2 + rng.normal(0, 0.1, n)
+    return X, y
+
+
+def _search(**kwargs):
+    cv = KFold(n_splits=3, shuffle=True, random_state=0)
+    return search.WarmStartHalvingSearch(GRID, cv=cv, rungs=[2, 4], factor=2, n_jobs=1, **kwargs)
+
+
+def test_halving_prunes_candidates_per_rung():
+    result = _search().fit(*_data())
+    assert [h["n_estimators"] for h in result.history_] == [2, 4, 8, 16]
+    counts = [h["candidates"] for h in result.history_]
+    assert counts[0] == 4  # every (max_depth, min_samples_leaf) pair
+    assert counts == sorted(counts, reverse=True) and counts[-1] == 1
+
+
+def test_best_params_come_from_the_grid_and_fit_the_data():
+    X, y = _data()
+    result = _search().fit(X, y)
+    params = result.best_params_
+    assert set(params) == set(GRID)
+    assert all(params[name] in values for name, values in GRID.items())
+    # Depth-1 stumps cannot fit this surface
+    assert params["rf__max_depth"] is None
+    assert result.best_score_ > 0.8
+
+    rf = result.best_estimator_.named_steps["rf"]
+    assert rf.n_estimators == params["rf__n_estimators"]
+    assert result.best_estimator_.predict(X).shape == y.shape
+
+
+def test_search_is_deterministic():
+    X, y = _data()
+    first, second = _search().fit(X, y), _search().fit(X, y)
+    assert first.best_params_ == second.best_params_
+    assert first.best_score_ == second.best_score_
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backend
+import stats_index
+
+
+@pytest.fixture
+def frame(dataset):
+    """Dataset "1" with a few holes, so pairwise-complete counts differ."""
+    df = backend.load_dataset("1", copy=True)
+    rng = np.random.default_rng(0)
+    for col in backend.CORR_COLS[:2]:
+        df.loc[rng.choice(len(df), size=len(df) // 20, replace=False), col] = np.nan
+    return df
+
+
+def _incremental(df: pd.DataFrame, split: int) -> dict:
+    index = stats_index.build_index(df.iloc[:split], backend.SUMMARY_COLS, backend.CORR_COLS)
+    return stats_index.append_rows(index, df.iloc[split:], df)
+
+
+@pytest.mark.parametrize("fraction", [0.1, 0.6, 0.99])
+def test_append_matches_a_fresh_build(frame, fraction):
+    merged = _incremental(frame, int(len(frame) * fraction))
+    fresh = stats_index.build_index(frame, backend.SUMMARY_COLS, backend.CORR_COLS)
+
+    assert merged["rows"] == fresh["rows"] == len(frame)
+    assert stats_index.null_counts(merged) == stats_index.null_counts(fresh)
+    pd.testing.assert_frame_equal(stats_index.describe_frame(merged), stats_index.describe_frame(fresh))
+    pd.testing.assert_frame_equal(stats_index.corr_frame(merged), stats_index.corr_frame(fresh))
+    for key in fresh["groups"]:
+        for col in backend.SUMMARY_COLS:
+            pd.testing.assert_frame_equal(
+                stats_index.group_frame(merged, key, col),
+                stats_index.group_frame(fresh, key, col),
+            )
+
+
+def test_append_matches_pandas(frame):
+    merged = _incremental(frame, len(frame) // 2)
+
+    expected = frame[backend.SUMMARY_COLS].describe()
+    got = stats_index.describe_frame(merged)
+    for stat in ("count", "mean", "std", "min", "max"):
+        assert np.allclose(got.loc[stat], expected.loc[stat], rtol=1e-9), stat
+    # Variance straight from M2, not via std
+    for col in backend.SUMMARY_COLS:
+        stats = merged["columns"][col]
+        assert np.isclose(stats["m2"] / (stats["count"] - 1), frame[col].var(), rtol=1e-9), col
+
+    pd.testing.assert_frame_equal(
+        stats_index.corr_frame(merged), frame[backend.CORR_COLS].corr(), rtol=1e-9,
+    )
+
+    col = backend.SUMMARY_COLS[0]
+    by_year = frame.groupby("Year")[col].agg(["count", "mean", "std"])
+    got = stats_index.group_frame(merged, "Year", col)[["count", "mean", "std"]]
+    assert list(got.index) == list(by_year.index)
+    assert np.allclose(got.to_numpy(), by_year.to_numpy(), rtol=1e-9, equal_nan=True)
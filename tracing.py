@@ -0,0 +1,343 @@
+import os
+import time
+import bisect
+import threading
+import contextvars
+from typing import Callable, Iterator
+
+# -------------------------------------------------------------------
+# HOT-PATH TRACING + PROMETHEUS METRICS
+# -------------------------------------------------------------------
+# Lightweight in-process instrumentation:
+#
+#   stage(name)         context manager timing one stage of a request
+#                       (csv_parse, features, model_search, plot_render,
+#                       png_encode, llm_call, pdf_build, ...) into the
+#                       nereus_stage_seconds histogram
+#   timed(name)         the same, as a decorator
+#   inflight(name)      gauge of jobs currently running (render, llm, ...)
+#   observe, inc,       raw histogram, counter and gauge updates
+#   gauge_add
+#   expose_counters     publish an existing STATS dict (plot_cache, llm_cache)
+#   expose_gauge        publish a value computed at scrape time (job queue)
+#
+# render() returns everything in the Prometheus text format (server.py serves
+# it at /api/metrics). Stages timed inside a request are also collected per
+# request, for the opt-in Server-Timing response header.
+#
+# Work done in the renderer / training process pools is timed in the worker
+# with capture() and replayed in the server process with replay().
+#
+#   NEREUS_TRACING=0            disable (stage() returns a no-op, timed()
+#                               returns the function unchanged)
+#   NEREUS_SERVER_TIMING=request  add Server-Timing when the request sends
+#                               "X-Server-Timing: 1" (default); "always" or "off"
+#
+# Metrics are per process: with several gunicorn workers, scrape each one.
+
+ENABLED = os.environ.get("NEREUS_TRACING", "1") != "0"
+SERVER_TIMING = os.environ.get("NEREUS_SERVER_TIMING", "request")
+SERVER_TIMING_REQUEST_HEADER = "X-Server-Timing"
+
+# Histogram bucket upper bounds, in seconds
+BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0,
+)
+
+STAGE_METRIC = "nereus_stage_seconds"
+INFLIGHT_METRIC = "nereus_inflight"
+
+_HELP = {
+    STAGE_METRIC: ("histogram", "Time spent per hot-path stage"),
+    INFLIGHT_METRIC: ("gauge", "Jobs currently running, by kind"),
+}
+
+_LOCK = threading.Lock()
+_HISTOGRAMS: dict[tuple, list] = {}  # (name, labels) -> [bucket counts..., sum, count]
+_COUNTERS: dict[tuple, float] = {}
+_GAUGES: dict[tuple, float] = {}
+_EXPOSED_COUNTERS: list[tuple] = []  # (name, label, stats dict)
+_EXPOSED_GAUGES: list[tuple] = []  # (name, label, fn -> {label value: value})
+
+# Stages timed in the current request: list of (name, seconds), or None
+_REQUEST: contextvars.ContextVar = contextvars.ContextVar("nereus_request_stages", default=None)
+
+
+def describe(name: str, kind: str, help_text: str) -> None:
+    """Register the TYPE / HELP lines of a metric."""
+    _HELP[name] = (kind, help_text)
+
+
+def _key(name: str, labels: dict) -> tuple:
+    return name, tuple(sorted(labels.items()))
+
+
+# ------------------ RECORDING ------------------ #
+
+def observe(name: str, seconds: float, **labels) -> None:
+    """Add one sample to a histogram."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    i = bisect.bisect_left(BUCKETS, seconds)
+    with _LOCK:
+        hist = _HISTOGRAMS.get(key)
+        if hist is None:
+            hist = _HISTOGRAMS[key] = [0] * (len(BUCKETS) + 3)
+        hist[i] += 1  # index len(BUCKETS) is the +Inf bucket
+        hist[-2] += seconds
+        hist[-1] += 1
+
+
+def inc(name: str, value: float = 1, **labels) -> None:
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _LOCK:
+        _COUNTERS[key] = _COUNTERS.get(key, 0) + value
+
+
+def gauge_add(name: str, delta: float, **labels) -> None:
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _LOCK:
+        _GAUGES[key] = _GAUGES.get(key, 0) + delta
+
+
+def _record_stage(name: str, seconds: float) -> None:
+    observe(STAGE_METRIC, seconds, stage=name)
+    stages = _REQUEST.get()
+    if stages is not None:
+        stages.append((name, seconds))
+
+
+class _Stage:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record_stage(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _Inflight:
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        gauge_add(INFLIGHT_METRIC, 1, kind=self.name)
+        return self
+
+    def __exit__(self, *exc):
+        gauge_add(INFLIGHT_METRIC, -1, kind=self.name)
+        return False
+
+
+class _Null:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL = _Null()
+
+
+def stage(name: str):
+    """with stage("csv_parse"): ... times the block."""
+    return _Stage(name) if ENABLED else _NULL
+
+
+def inflight(name: str):
+    """with inflight("render"): ... counts the block in nereus_inflight."""
+    return _Inflight(name) if ENABLED else _NULL
+
+
+def timed(name: str) -> Callable:
+    """Decorator version of stage()."""
+    def decorate(fn):
+        if not ENABLED:
+            return fn
+
+        def wrapper(*args, **kwargs):
+            with _Stage(name):
+                return fn(*args, **kwargs)
+
+        wrapper.__name__ = fn.__name__
+        wrapper.__doc__ = fn.__doc__
+        wrapper.__wrapped__ = fn
+        return wrapper
+    return decorate
+
+
+def timed_iter(name: str, chunks: Iterator, inflight_kind: str | None = None) -> Iterator:
+    """
+    Time an iterator from the first next() to exhaustion as stage name,
+    plus "<name>_first" for the time to the first item.
+    """
+    if not ENABLED:
+        return chunks
+
+    def wrapper():
+        gauge = _Inflight(inflight_kind) if inflight_kind else _NULL
+        with gauge:
+            start = time.perf_counter()
+            first = True
+            try:
+                for item in chunks:
+                    if first:
+                        _record_stage(f"{name}_first", time.perf_counter() - start)
+                        first = False
+                    yield item
+            finally:
+                _record_stage(name, time.perf_counter() - start)
+    return wrapper()
+
+
+# ------------------ PER-REQUEST STAGES ------------------ #
+
+def begin_request() -> contextvars.Token:
+    """Start collecting the stages of the current request."""
+    return _REQUEST.set([])
+
+
+def request_stages() -> list:
+    return _REQUEST.get() or []
+
+
+def end_request(token: contextvars.Token) -> None:
+    try:
+        _REQUEST.reset(token)
+    except ValueError:
+        # Streamed responses may finish in a different context than they began
+        _REQUEST.set(None)
+
+
+class capture:
+    """
+    Collect the stages timed inside the block into .stages, for sending
+    back from a worker process (see replay).
+    """
+
+    def __enter__(self):
+        self.stages = []
+        self._token = _REQUEST.set(self.stages)
+        return self
+
+    def __exit__(self, *exc):
+        _REQUEST.reset(self._token)
+        return False
+
+
+def replay(stages: list) -> None:
+    """Record stages captured in another process as if they ran here."""
+    if not ENABLED:
+        return
+    for name, seconds in stages:
+        _record_stage(name, seconds)
+
+
+def wants_server_timing(header_value: str | None) -> bool:
+    if not ENABLED or SERVER_TIMING == "off":
+        return False
+    return SERVER_TIMING == "always" or header_value == "1"
+
+
+def server_timing(stages: list, total: float) -> str:
+    """Server-Timing header value: summed duration per stage, plus total."""
+    sums: dict[str, float] = {}
+    for name, seconds in stages:
+        sums[name] = sums.get(name, 0.0) + seconds
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in sums.items()]
+    parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+# ------------------ EXPORT ------------------ #
+
+def expose_counters(name: str, label: str, stats: dict, help_text: str) -> None:
+    """Publish a module's STATS dict as counter name{label=<key>}."""
+    describe(name, "counter", help_text)
+    _EXPOSED_COUNTERS.append((name, label, stats))
+
+
+def expose_gauge(name: str, label: str, fn: Callable[[], dict], help_text: str) -> None:
+    """Publish fn() -> {label value: value} as gauge name{label=...} at scrape time."""
+    describe(name, "gauge", help_text)
+    _EXPOSED_GAUGES.append((name, label, fn))
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels: tuple, extra: tuple = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (0.0.4)."""
+    samples: dict[str, list] = {}
+
+    with _LOCK:
+        histograms = {k: list(v) for k, v in _HISTOGRAMS.items()}
+        counters = dict(_COUNTERS)
+        gauges = dict(_GAUGES)
+
+    for (name, labels), hist in sorted(histograms.items()):
+        lines = samples.setdefault(name, [])
+        cumulative = 0
+        for bound, count in zip(BUCKETS + ("+Inf",), hist):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(labels, (('le', bound),))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {_number(hist[-2])}")
+        lines.append(f"{name}_count{_labels(labels)} {hist[-1]}")
+
+    for (name, labels), value in sorted(counters.items()):
+        samples.setdefault(name, []).append(f"{name}{_labels(labels)} {_number(value)}")
+    for name, label, stats in _EXPOSED_COUNTERS:
+        for key, value in sorted(dict(stats).items()):
+            samples.setdefault(name, []).append(f"{name}{_labels(((label, key),))} {_number(value)}")
+
+    for (name, labels), value in sorted(gauges.items()):
+        samples.setdefault(name, []).append(f"{name}{_labels(labels)} {_number(value)}")
+    for name, label, fn in _EXPOSED_GAUGES:
+        for key, value in sorted(fn().items()):
+            samples.setdefault(name, []).append(f"{name}{_labels(((label, key),))} {_number(value)}")
+
+    out = []
+    for name, lines in samples.items():
+        kind, help_text = _HELP.get(name, ("untyped", ""))
+        if help_text:
+            out.append(f"# HELP {name} {help_text}")
+        out.append(f"# TYPE {name} {kind}")
+        out.extend(lines)
+    return "\n".join(out) + "\n"
+
+
+def reset() -> None:
+    """Forget all recorded samples (exposed STATS dicts are left alone)."""
+    with _LOCK:
+        _HISTOGRAMS.clear()
+        _COUNTERS.clear()
+        _GAUGES.clear()
@@ -0,0 +1,201 @@
+import os
+import sys
+import time
+import argparse
+import multiprocessing as mp
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import backend
+import dataset_store
+import jobs
+import plot_cache
+
+# -------------------------------------------------------------------
+# CACHE WARM-UP
+# -------------------------------------------------------------------
+# Precomputes, for every dataset in the registry, what the first user would
+# otherwise wait for, into the same on-disk stores the server reads:
+#
+#   prepare   columnar bundle + statistics index (summary, correlation)
+#             -> dataset_store (NEREUS_DATASTORE_DIR)
+#   train     stacked model + forecast -> model registry (NEREUS_MODELS_DIR)
+#   plot:*    every chart in backend.PLOT_FUNCTIONS -> plot_cache disk cache
+#             (NEREUS_PLOTS_DIR)
+#
+#   python warmup.py                          # everything, all datasets
+#   python warmup.py --only-stale             # skip what is already current
+#   python warmup.py --datasets 1,2 --workers 4
+#
+# Run it with the same NEREUS_* settings as the server. Plots and prepare
+# steps run in a pool of --workers processes; fits run in their own pool
+# (--train-workers, default NEREUS_TRAIN_WORKERS) since each fit already
+# uses every core. Without --only-stale, models are refitted and plots
+# re-rendered; the dataset bundle is content-addressed and only built when
+# missing. Exit status is 1 if any step failed.
+
+
+def _prepare(dataset_id: str) -> str:
+    backend.load_dataset(dataset_id)  # builds / validates the store bundle
+    backend.get_basic_summary(dataset_id)
+    backend.get_corr_matrix(dataset_id)
+    return f"{backend.get_stats_index(dataset_id)['rows']} rows"
+
+
+def _train(dataset_id: str, force: bool) -> str:
+    metrics = backend.train_and_evaluate_model(dataset_id, force=force)
+    return f"r2 {metrics['true_r2']:.3f}"
+
+
+def _plot(dataset_id: str, kind: str, force: bool) -> str:
+    entry = plot_cache.get_plot(kind, dataset_id, force=force)
+    return f"{len(entry['data']) // 1024} KiB"
+
+
+def _timed(fn, *args) -> tuple:
+    """Runs inside a worker process: (detail, seconds)."""
+    start = time.perf_counter()
+    detail = fn(*args)
+    return detail, time.perf_counter() - start
+
+
+# ------------------ STALENESS ------------------ #
+
+def prepare_is_current(dataset_id: str) -> bool:
+    index = dataset_store.read_index(dataset_id)
+    if not dataset_store.index_is_current(index, backend.DATASETS[dataset_id]):
+        return False
+    stats = dataset_store.read_stats(index)
+    return stats is not None and stats.get("data_hash") == index["source_hash"]
+
+
+def plan(dataset_ids: list[str], only_stale: bool) -> dict[str, list[str]]:
+    """dataset id -> steps to run ("prepare", "train", "plot:<kind>")."""
+    steps = {}
+    for ds in dataset_ids:
+        todo = []
+        if not (only_stale and prepare_is_current(ds)):
+            todo.append("prepare")
+        if not (only_stale and backend.peek_trained_model(ds) is not None):
+            todo.append("train")
+        for kind in backend.PLOT_FUNCTIONS:
+            if not (only_stale and plot_cache.is_cached(kind, ds)):
+                todo.append(f"plot:{kind}")
+        steps[ds] = todo
+    return steps
+
+
+def _after(step: str) -> str | None:
+    """The step that must finish first (within the same dataset)."""
+    if step == "plot:model_accuracy":
+        return "train"
+    if step != "prepare":
+        return "prepare"
+    return None
+
+
+# ------------------ RUN ------------------ #
+
+def run(steps: dict[str, list[str]], workers: int, train_workers: int, force: bool, out=sys.stdout) -> list:
+    """Run the planned steps with dependencies; returns [(dataset, step, ok, detail, seconds)]."""
+    total = sum(len(s) for s in steps.values())
+    planned = {(ds, step) for ds, todo in steps.items() for step in todo}
+    pending = set(planned)
+    done_steps: set = set()
+    failed_steps: set = set()
+    results = []
+
+    # Workers render in-process: no nested render pool per worker
+    os.environ["NEREUS_RENDER_WORKERS"] = "0"
+    ctx = mp.get_context("spawn")
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=ctx)
+    train_pool = ProcessPoolExecutor(max_workers=train_workers, mp_context=ctx)
+    running = {}
+
+    def report(ds, step, ok, detail, seconds):
+        results.append((ds, step, ok, detail, seconds))
+        status = "ok" if ok else "FAILED"
+        print(f"[{len(results):>{len(str(total))}}/{total}] dataset {ds:<4} {step:<24} "
+              f"{status:<7}{seconds:7.1f}s  {detail}", file=out, flush=True)
+
+    def ready(ds, step):
+        # A dependency that was not planned is already current
+        dep = _after(step)
+        return dep is None or (ds, dep) not in planned or (ds, dep) in done_steps
+
+    def submit_ready():
+        for ds, step in sorted(pending):
+            dep = _after(step)
+            if dep is not None and (ds, dep) in failed_steps:
+                pending.discard((ds, step))
+                failed_steps.add((ds, step))
+                report(ds, step, False, f"skipped: {dep} failed", 0.0)
+            elif ready(ds, step):
+                pending.discard((ds, step))
+                if step == "prepare":
+                    fut = pool.submit(_timed, _prepare, ds)
+                elif step == "train":
+                    fut = train_pool.submit(_timed, _train, ds, force)
+                else:
+                    fut = pool.submit(_timed, _plot, ds, step.split(":", 1)[1], force)
+                running[(ds, step)] = fut
+
+    try:
+        submit_ready()
+        while running:
+            finished, _ = wait(list(running.values()), return_when=FIRST_COMPLETED)
+            for key, fut in list(running.items()):
+                if fut not in finished:
+                    continue
+                del running[key]
+                try:
+                    detail, seconds = fut.result()
+                except Exception as exc:
+                    failed_steps.add(key)
+                    report(*key, False, f"{type(exc).__name__}: {exc}", 0.0)
+                else:
+                    done_steps.add(key)
+                    report(*key, True, detail, seconds)
+            submit_ready()
+    finally:
+        pool.shutdown(cancel_futures=True)
+        train_pool.shutdown(cancel_futures=True)
+    return results
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Precompute models, statistics and plots for every dataset")
+    parser.add_argument("--datasets", help="Comma-separated dataset ids (default: all)")
+    parser.add_argument("--only-stale", action="store_true",
+                        help="Skip steps whose cached result matches the current data")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Processes for prepare / plot steps")
+    parser.add_argument("--train-workers", type=int, default=jobs.MAX_TRAIN_WORKERS,
+                        help="Processes for model fits")
+    args = parser.parse_args(argv)
+
+    backend.refresh_datasets()
+    dataset_ids = args.datasets.split(",") if args.datasets else list(backend.DATASETS)
+    unknown = [ds for ds in dataset_ids if ds not in backend.DATASETS]
+    if unknown:
+        parser.error(f"unknown dataset id(s): {', '.join(unknown)} (use {', '.join(backend.DATASETS)})")
+
+    steps = plan(dataset_ids, args.only_stale)
+    total = sum(len(s) for s in steps.values())
+    print(f"Warming {len(dataset_ids)} dataset(s): {total} step(s)"
+          + (" (stale only)" if args.only_stale else ""), flush=True)
+    if not total:
+        print("Everything is current.")
+        return 0
+
+    start = time.perf_counter()
+    results = run(steps, max(1, args.workers), max(1, args.train_workers), force=not args.only_stale)
+    failures = [r for r in results if not r[2]]
+    print(f"\n{len(results) - len(failures)} ok, {len(failures)} failed "
+          f"in {time.perf_counter() - start:.1f}s")
+    for ds, step, _ok, detail, _secs in failures:
+        print(f"  dataset {ds} {step}: {detail}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())